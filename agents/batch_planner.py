@@ -0,0 +1,295 @@
+from dataclasses import dataclass, field
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterable
+
+from agents.query_parser import ParsedQuery
+from tools.hubspot_tools import HubSpotTools, BATCH_SIZE, is_not_found
+
+# Calls the unplanned path spends per operation: one search before every update or delete
+SEQUENTIAL_CALLS = {
+    'create_contact': 1,
+    'update_contact': 2,
+    'search_contact': 1,
+    'delete_contact': 2,
+    'create_deal': 1,
+}
+# Past tense for the summary line when every operation has the same intent
+BATCH_VERBS = {
+    'create_contact': 'contacts created',
+    'update_contact': 'contacts updated',
+    'search_contact': 'contacts found',
+    'delete_contact': 'contacts deleted',
+    'create_deal': 'deals created',
+}
+
+
+def _calls(count: int) -> int:
+    return -(-count // BATCH_SIZE)
+
+
+@dataclass
+class BatchPlan:
+    """Operations grouped by object and verb, keyed by lowercased email.
+
+    Each dict maps an email to (index of the operation that owns the call,
+    properties). notes holds operations settled at plan time: ("error", message),
+    ("skipped", message) or ("merged", owner index, message) for ones folded
+    into another operation's call.
+    """
+    operations: List[ParsedQuery]
+    creates: Dict[str, Tuple[int, Dict[str, Any]]] = field(default_factory=dict)
+    updates: Dict[str, Tuple[int, Dict[str, Any]]] = field(default_factory=dict)
+    deletes: Dict[str, int] = field(default_factory=dict)
+    searches: Dict[str, List[int]] = field(default_factory=dict)
+    # Searches that come before any write to their email: answered from the pre-batch state
+    prior_searches: Dict[str, List[int]] = field(default_factory=dict)
+    deals: List[Tuple[int, Dict[str, Any]]] = field(default_factory=list)
+    notes: Dict[int, Tuple[Any, ...]] = field(default_factory=dict)
+    # Deleted after being created in this batch: "not found" is the expected outcome
+    created_then_deleted: set = field(default_factory=set)
+
+    @property
+    def lookups(self) -> List[str]:
+        """Emails whose contact ids are resolved up front, in one bulk read"""
+        return list(dict.fromkeys(list(self.deletes) + list(self.updates)))
+
+    def call_counts(self) -> Dict[str, int]:
+        """Upper bound on requests per endpoint (cached ids skip the bulk read)"""
+        return {
+            "batch/read prior lookups": _calls(len(self.prior_searches)),
+            "batch/read ids": _calls(len(self.lookups)),
+            "batch/archive contacts": _calls(len(self.deletes)),
+            "batch/create contacts": _calls(len(self.creates)),
+            "batch/update contacts": _calls(len(self.updates)),
+            "batch/create deals": _calls(len(self.deals)),
+            "batch/read lookups": _calls(len(self.searches)),
+        }
+
+    @property
+    def api_calls(self) -> int:
+        return sum(self.call_counts().values())
+
+    @property
+    def sequential_calls(self) -> int:
+        return sum(SEQUENTIAL_CALLS.get(operation.intent, 1) for operation in self.operations)
+
+    def describe(self) -> str:
+        """Dry-run summary: planned calls per endpoint and what was merged, dropped or rejected"""
+        lines = [f"📋 Plan for {len(self.operations)} operations: {self.api_calls} API calls "
+                 f"(vs {self.sequential_calls} one by one)"]
+        sizes = {
+            "batch/read prior lookups": len(self.prior_searches),
+            "batch/read ids": len(self.lookups),
+            "batch/archive contacts": len(self.deletes),
+            "batch/create contacts": len(self.creates),
+            "batch/update contacts": len(self.updates),
+            "batch/create deals": len(self.deals),
+            "batch/read lookups": len(self.searches),
+        }
+        for endpoint, calls in self.call_counts().items():
+            if calls:
+                lines.append(f"  • {endpoint}: {sizes[endpoint]} records in {calls} call(s)")
+        for index, note in sorted(self.notes.items()):
+            operation = self.operations[index]
+            lines.append(f"  ↳ #{index + 1} {operation.intent} {_target(operation)}: {note[-1]}")
+        return "\n".join(lines)
+
+
+def _target(operation: ParsedQuery) -> str:
+    if operation.intent == 'create_deal':
+        return operation.properties.get('dealname') or 'deal'
+    return operation.email or 'N/A'
+
+
+class BatchPlanner:
+    """Turns a batch of parsed operations into the fewest HubSpot batch calls.
+
+    plan() walks the operations in order and, per email, folds an update into
+    an earlier create or update, drops creates and updates that a later delete
+    cancels, and rejects updates to contacts deleted earlier in the batch.
+    execute() answers lookups that precede every write to their email first,
+    then resolves every needed id in one bulk read and runs deletes, creates,
+    updates and deal creates as one batch each (deletes first, so a delete
+    followed by a create of the same email recreates it); the remaining
+    lookups run last and see the batch's writes.
+    """
+
+    def __init__(self, tools: HubSpotTools, mirror_write: Optional[Callable[[dict], Any]] = None,
+                 mirror_delete: Optional[Callable[[str], Any]] = None,
+                 local_lookup: Optional[Callable[[str], Optional[dict]]] = None):
+        self.tools = tools
+        self.mirror_write = mirror_write or (lambda contact: None)
+        self.mirror_delete = mirror_delete or (lambda contact_id: None)
+        self.local_lookup = local_lookup or (lambda email: None)
+
+    def plan(self, operations: Iterable[ParsedQuery]) -> BatchPlan:
+        plan = BatchPlan(operations=[])
+        for operation in operations:
+            # A list command contributes one operation per contact
+            for single in (operation.entities or (operation,)):
+                plan.operations.append(single)
+                self._add(plan, len(plan.operations) - 1, single)
+        return plan
+
+    def _add(self, plan: BatchPlan, index: int, operation: ParsedQuery):
+        intent = operation.intent
+        properties = dict(operation.properties)
+        if intent == 'create_deal':
+            plan.deals.append((index, properties))
+            return
+        if intent not in SEQUENTIAL_CALLS:
+            plan.notes[index] = ("error", f"Could not process HubSpot request: {operation.text}")
+            return
+        if not operation.email:
+            plan.notes[index] = ("error", "No email address found in request")
+            return
+
+        key = operation.email.lower()
+        if intent == 'search_contact':
+            written = key in plan.creates or key in plan.updates or key in plan.deletes
+            (plan.searches if written else plan.prior_searches).setdefault(key, []).append(index)
+        elif intent == 'create_contact':
+            if key in plan.creates:
+                plan.notes[index] = ("error", "Contact already created earlier in this batch")
+            else:
+                plan.creates[key] = (index, properties)
+        elif intent == 'update_contact':
+            if not properties:
+                plan.notes[index] = ("error", "No properties found to update")
+            elif key in plan.creates:
+                owner, pending = plan.creates[key]
+                pending.update(properties)
+                plan.notes[index] = ("merged", owner, f"merged into create of {operation.email}")
+            elif key in plan.deletes:
+                plan.notes[index] = ("error", "No contact found (deleted earlier in this batch)")
+            elif key in plan.updates:
+                owner, pending = plan.updates[key]
+                pending.update(properties)
+                plan.notes[index] = ("merged", owner, f"merged with earlier update of {operation.email}")
+            else:
+                plan.updates[key] = (index, properties)
+        elif intent == 'delete_contact':
+            if key in plan.updates:
+                owner, _ = plan.updates.pop(key)
+                plan.notes[owner] = ("skipped", "cancelled by a later delete")
+            if key in plan.creates:
+                owner, _ = plan.creates.pop(key)
+                plan.notes[owner] = ("skipped", "cancelled by a later delete")
+                if key not in plan.deletes:
+                    plan.created_then_deleted.add(key)
+            if key in plan.deletes:
+                plan.notes[index] = ("merged", plan.deletes[key], "merged with earlier delete")
+            else:
+                plan.deletes[key] = index
+
+    def execute(self, plan: BatchPlan) -> List[Dict[str, Any]]:
+        """Run the plan; returns one {"index", "status", "target", "detail"} row per operation"""
+        outcomes: Dict[int, Tuple[str, str]] = {}
+        self._search(plan.prior_searches, outcomes)
+        # A failed read is reported as such, not as a missing contact
+        errors: Dict[str, str] = {}
+        ids = self.tools.resolve_contact_ids(plan.lookups, errors) if plan.lookups else {}
+
+        def unresolved(key: str) -> Tuple[str, str]:
+            if key in errors:
+                return ("error", f"Could not look up contact: {errors[key]}")
+            return ("error", "No contact found")
+
+        deletes = []
+        for key, index in plan.deletes.items():
+            if ids.get(key):
+                deletes.append((index, ids[key]))
+            elif key in plan.created_then_deleted and key not in errors:
+                outcomes[index] = ("success", "created and deleted within this batch")
+            else:
+                outcomes[index] = unresolved(key)
+        for (index, contact_id), outcome in zip(deletes, self.tools.archive_contacts_batch(
+                [contact_id for _, contact_id in deletes]) if deletes else []):
+            if outcome["status"] == "success":
+                self.mirror_delete(contact_id)
+                outcomes[index] = ("success", f"deleted (ID {contact_id})")
+            else:
+                outcomes[index] = ("error", outcome["error"])
+
+        creates = list(plan.creates.values())
+        for (index, _), outcome in zip(creates, self.tools.create_contacts_batch(
+                [properties for _, properties in creates]) if creates else []):
+            outcomes[index] = self._written(outcome, "created")
+
+        updates = []
+        for key, (index, properties) in plan.updates.items():
+            if ids.get(key):
+                updates.append((index, ids[key], properties))
+            else:
+                outcomes[index] = unresolved(key)
+        for (index, _, properties), outcome in zip(updates, self.tools.update_contacts_batch(
+                [{"id": contact_id, "properties": properties} for _, contact_id, properties in updates]) if updates else []):
+            outcomes[index] = self._written(outcome, f"updated {', '.join(properties)}")
+
+        for (index, _), outcome in zip(plan.deals, self.tools.create_deals_batch(
+                [properties for _, properties in plan.deals]) if plan.deals else []):
+            if outcome["status"] == "success":
+                outcomes[index] = ("success", f"Deal created (ID {outcome['result'].get('id')})")
+            else:
+                outcomes[index] = ("error", outcome["error"])
+
+        self._search(plan.searches, outcomes)
+
+        rows = []
+        for index, operation in enumerate(plan.operations):
+            note = plan.notes.get(index)
+            if note is None:
+                status, detail = outcomes[index]
+            elif note[0] == "merged":
+                status, detail = outcomes.get(note[1]) or plan.notes[note[1]][:2]
+                detail = note[2] if status == "success" else detail
+            else:
+                status, detail = note
+            rows.append({"index": index, "status": status, "target": _target(operation), "detail": detail})
+        return rows
+
+    def _search(self, searches: Dict[str, List[int]], outcomes: Dict[int, Tuple[str, str]]):
+        """Answer searches from the local mirror, reading the rest in one bulk read"""
+        found = {key: self.local_lookup(key) for key in searches}
+        missing = [key for key, contact in found.items() if contact is None]
+        failed: Dict[str, str] = {}
+        for key, outcome in zip(missing, self.tools.read_contacts_batch_by_email(missing) if missing else []):
+            if outcome["status"] == "success":
+                found[key] = outcome["result"]
+            elif not is_not_found(outcome):
+                failed[key] = outcome["error"]
+        for key, indices in searches.items():
+            for index in indices:
+                if key in failed:
+                    outcomes[index] = ("error", f"Could not look up contact: {failed[key]}")
+                else:
+                    outcomes[index] = _found(found.get(key))
+
+    def _written(self, outcome: Dict[str, Any], done: str) -> Tuple[str, str]:
+        if outcome["status"] != "success":
+            return ("error", outcome["error"])
+        self.mirror_write(outcome["result"])
+        return ("success", f"{done} (ID {outcome['result'].get('id')})" if done == "created" else done)
+
+
+def _found(contact: Optional[dict]) -> Tuple[str, str]:
+    if not contact:
+        return ("error", "No contact found")
+    properties = contact.get('properties', {})
+    name = f"{properties.get('firstname') or ''} {properties.get('lastname') or ''}".strip() or 'N/A'
+    return ("success", f"ID {contact.get('id')}, {name}, phone {properties.get('phone') or 'N/A'}")
+
+
+def format_rows(plan: BatchPlan, rows: List[Dict[str, Any]]) -> str:
+    """Compact per-operation result table: a summary line, then one line per operation"""
+    done = sum(1 for row in rows if row["status"] != "error")
+    icon = "✅" if done == len(rows) else "⚠️" if done else "❌"
+    intents = {operation.intent for operation in plan.operations}
+    if len(intents) == 1 and next(iter(intents)) in BATCH_VERBS:
+        summary = f"{icon} {done}/{len(rows)} {BATCH_VERBS[next(iter(intents))]}"
+    else:
+        summary = f"{icon} {done}/{len(rows)} operations completed"
+    lines = [summary]
+    for row in rows:
+        mark = {"success": "✅", "skipped": "➖"}.get(row["status"], "❌")
+        lines.append(f"  {mark} {row['target']} — {row['detail']}")
+    return "\n".join(lines)
@@ -1,28 +1,122 @@
 from tools.email_tools import EmailTools
-from utils.config_loader import ConfigLoader
+from tools.notification_outbox import NotificationOutbox, get_shared_outbox
+from agents.notification_coalescer import NotificationCoalescer
+from utils.config_loader import get_shared_config
+from typing import Optional, Tuple, List
+import atexit
 
 class EmailAgent:
     def __init__(self):
-        self.config = ConfigLoader()
-        self.email_tools = EmailTools()
+        self.config = get_shared_config()
+        self.email_tools = EmailTools(self.config)
+        self._outbox = None
+        self._coalescer = None
     
-    def send_notification(self, action_details: str, recipient_email: str) -> str:
-        """Send email notification for CRM action"""
-        try:
+    @property
+    def outbox(self) -> Optional[NotificationOutbox]:
+        """Durable background outbox, or None when email.outbox_enabled is false"""
+        email_config = self.config.get_email_config()
+        if not email_config.get('outbox_enabled', True):
+            return None
+        if self._outbox is None:
+            self._outbox = get_shared_outbox(
+                self.config.resolve_path(email_config.get('outbox_path', 'notification_outbox.db')),
+                send=self.email_tools.send_email,
+                workers=int(email_config.get('outbox_workers', 2)),
+                max_attempts=int(email_config.get('outbox_max_attempts', 5)),
+                retry_base=float(email_config.get('outbox_retry_base', 2.0)),
+                retry_max=float(email_config.get('outbox_retry_max', 300.0))
+            )
+        return self._outbox
+    
+    @property
+    def coalescer(self) -> Optional[NotificationCoalescer]:
+        """Per-recipient digest buffer, or None unless email.digest_window (seconds) is set above 0"""
+        email_config = self.config.get_email_config()
+        window = float(email_config.get('digest_window', 0))
+        if window <= 0:
+            return None
+        if self._coalescer is None:
+            self._coalescer = NotificationCoalescer(
+                self._send_digest,
+                window=window,
+                max_actions=int(email_config.get('digest_max_actions', 50))
+            )
+            # Buffered actions reach the durable outbox even on a normal exit mid-window
+            atexit.register(self._coalescer.flush_all)
+        return self._coalescer
+    
+    def _compose(self, actions: List[str]) -> Tuple[str, str]:
+        if len(actions) == 1:
             subject = "CRM Action Completed"
             body = f"""
             Dear User,
             
             The following CRM action has been completed:
             
-            {action_details}
+            {actions[0]}
             
             Best regards,
             Your AI Automation System
             """
+            return subject, body
+        
+        subject = f"CRM Actions Completed ({len(actions)})"
+        listed = "\n\n            ".join(f"{number}. {action}" for number, action in enumerate(actions, 1))
+        body = f"""
+            Dear User,
             
+            The following {len(actions)} CRM actions have been completed:
+            
+            {listed}
+            
+            Best regards,
+            Your AI Automation System
+            """
+        return subject, body
+    
+    def _send_digest(self, recipient_email: str, actions: List[str]):
+        """Hand a coalesced digest to the outbox (or SMTP directly when the outbox is off)"""
+        subject, body = self._compose(actions)
+        outbox = self.outbox
+        if outbox is None:
+            self.email_tools.send_email(recipient_email, subject, body)
+        else:
+            outbox.enqueue(recipient_email, subject, body)
+    
+    def send_notification(self, action_details: str, recipient_email: str) -> str:
+        """Send email notification for CRM action"""
+        try:
+            subject, body = self._compose([action_details])
             result = self.email_tools.send_email(recipient_email, subject, body)
             return result.get('message', 'Email sent successfully')
             
         except Exception as e:
-            return f"Error sending email notification: {str(e)}"
\ No newline at end of file
+            return f"Error sending email notification: {str(e)}"
+    
+    def queue_notification(self, action_details: str, recipient_email: str, urgent: bool = False) -> str:
+        """Hand the notification to the digest buffer or outbox and return without waiting on SMTP"""
+        try:
+            coalescer = self.coalescer
+            if coalescer is not None:
+                coalescer.add(recipient_email, action_details, urgent=urgent)
+                if urgent:
+                    return f"Email to {recipient_email} queued for delivery"
+                return f"Email to {recipient_email} added to the next digest"
+            
+            outbox = self.outbox
+            if outbox is None:
+                return self.send_notification(action_details, recipient_email)
+            subject, body = self._compose([action_details])
+            outbox.enqueue(recipient_email, subject, body)
+            return f"Email to {recipient_email} queued for delivery"
+            
+        except Exception as e:
+            return f"Error queueing email notification: {str(e)}"
+    
+    def flush_notifications(self, timeout: float = 10.0) -> bool:
+        """Send buffered digests and wait for queued notifications to go out, e.g. before the REPL exits"""
+        if self._coalescer is not None:
+            self._coalescer.flush_all()
+        outbox = self._outbox
+        return outbox.wait_until_empty(timeout) if outbox is not None else True
\ No newline at end of file
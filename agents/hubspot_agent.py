@@ -1,225 +1,334 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from tools.hubspot_tools import HubSpotTools
-from utils.config_loader import ConfigLoader
-import re
+from tools.hubspot_tools import HubSpotTools, HubSpotAPIError
+from tools.crm_mirror import CrmMirror, ARCHIVE_SWEEP_INTERVAL
+from utils.config_loader import get_shared_config
+from utils.llm import get_shared_llm
+from agents.query_parser import ParsedQuery, parse_query
+from agents.llm_extraction import (LLMExtractor, BATCH_MAX_ITEMS, BATCH_PROMPT_TOKENS, apply_extraction,
+                                   needs_extraction)
+from agents.batch_planner import BatchPlanner, format_rows
+from tools.extraction_cache import get_shared_extraction_cache
+from typing import Optional, Union, List, Dict, Any
+import asyncio
+
 
 class HubSpotAgent:
     def __init__(self):
-        self.config = ConfigLoader()
-        self.llm = self._setup_llm()
-        self.hubspot_tools = HubSpotTools()
+        self.config = get_shared_config()
+        self.hubspot_tools = HubSpotTools(self.config)
+        self._async_hubspot_tools = None
+        self._extractor = None
+        self.mirror = self._setup_mirror()
+        self.config.subscribe('hubspot', self._on_hubspot_config_changed)
+    
+    def _on_hubspot_config_changed(self, hubspot_config: dict):
+        """Reopen the mirror only if its path changed; the tools rebuild their own clients"""
+        mirror_path = hubspot_config.get('mirror_path')
+        mirror_path = self.config.resolve_path(mirror_path) if mirror_path else None
+        if mirror_path != (self.mirror.db_path if self.mirror is not None else None):
+            self.mirror = self._setup_mirror()
+        else:
+            self.mirror_max_staleness = float(hubspot_config.get('mirror_max_staleness', 300))
+            if self.mirror is not None:
+                self.mirror.archive_sweep_interval = float(
+                    hubspot_config.get('mirror_archive_sweep_interval', ARCHIVE_SWEEP_INTERVAL))
+    
+    def _setup_mirror(self) -> Optional[CrmMirror]:
+        """Open the local CRM mirror if hubspot.mirror_path is configured"""
+        hubspot_config = self.config.get_hubspot_config()
+        self.mirror_max_staleness = float(hubspot_config.get('mirror_max_staleness', 300))
+        mirror_path = hubspot_config.get('mirror_path')
+        if not mirror_path:
+            return None
+        return CrmMirror(self.config.resolve_path(mirror_path),
+                         float(hubspot_config.get('mirror_archive_sweep_interval', ARCHIVE_SWEEP_INTERVAL)))
+    
+    def _search_mirror(self, email: str) -> Optional[dict]:
+        """Answer a lookup locally when the mirror was synced within the staleness bound"""
+        if self.mirror is None or not self.mirror.is_fresh('contacts', self.mirror_max_staleness):
+            return None
+        contact = self.mirror.find_contact_by_email(email)
+        if contact:
+            print("📦 Answered from local mirror")
+        return contact
+    
+    def _mirror_write(self, contact: Optional[dict]):
+        if self.mirror is not None and contact and contact.get('id'):
+            self.mirror.upsert_records('contacts', [contact], merge=True)
+    
+    def _mirror_delete(self, contact_id: str):
+        if self.mirror is not None:
+            self.mirror.delete('contacts', contact_id)
+    
+    @property
+    def llm(self):
+        """Shared ChatOpenAI client; langchain is imported and the client built on first use"""
+        return get_shared_llm(self.config.get_openai_config())
+    
+    @property
+    def async_hubspot_tools(self):
+        """Async client, created on first use by aprocess_request (httpx is only imported then)"""
+        if self._async_hubspot_tools is None:
+            from tools.async_hubspot_tools import AsyncHubSpotTools
+            self._async_hubspot_tools = AsyncHubSpotTools(self.config)
+        return self._async_hubspot_tools
+    
+    @property
+    def extraction_enabled(self) -> bool:
+        return self._extractor is not None or bool(self.config.get_openai_config().get('extraction_fallback', False))
     
-    def _setup_llm(self) -> ChatOpenAI:
-        """Setup OpenAI LLM"""
+    @property
+    def extractor(self) -> Optional[LLMExtractor]:
+        """LLM fallback for requests the regexes miss; None unless openai.extraction_fallback is set"""
+        if self._extractor is None and self.extraction_enabled:
+            openai_config = self.config.get_openai_config()
+            cache = get_shared_extraction_cache(
+                self.config.resolve_path(openai_config.get('extraction_cache_path', 'extraction_cache.db')),
+                max_size=int(openai_config.get('extraction_cache_size', 10000))
+            )
+            self._extractor = LLMExtractor(self.llm, cache)
+        return self._extractor
+    
+    @extractor.setter
+    def extractor(self, extractor: Optional[LLMExtractor]):
+        self._extractor = extractor
+    
+    def resolve(self, parsed: ParsedQuery) -> ParsedQuery:
+        """Fill in intent and fields with the LLM fallback when the regex parse came up short"""
+        if self.extraction_enabled and needs_extraction(parsed):
+            return self.extractor.resolve(parsed)
+        return parsed
+    
+    def resolve_many(self, commands: List[str]) -> List[Dict[str, Any]]:
+        """Parse many commands, sending the ones the regexes miss to the LLM in packed, concurrent batches.
+        
+        Returns one {"index", "status", "query"} entry per command, in input order, where
+        "query" is the (possibly LLM-completed) ParsedQuery and status is "parsed",
+        "extracted", "unrecognized" or "error" (with "error" holding the message).
+        """
+        results = []
+        for index, command in enumerate(commands):
+            parsed = parse_query(command)
+            results.append({"index": index, "status": "parsed" if parsed.intent else "unrecognized", "query": parsed})
+        
+        missing = [entry for entry in results if needs_extraction(entry["query"])]
+        if not missing or not self.extraction_enabled:
+            return results
+        
         openai_config = self.config.get_openai_config()
-        return ChatOpenAI(
-            api_key=openai_config.get('api_key'),
-            model=openai_config.get('model', 'gpt-4'),
-            temperature=0
+        extractions = self.extractor.extract_many(
+            [entry["query"].text for entry in missing],
+            max_tokens=int(openai_config.get('extraction_batch_tokens', BATCH_PROMPT_TOKENS)),
+            max_items=int(openai_config.get('extraction_batch_size', BATCH_MAX_ITEMS)),
+            max_concurrency=int(openai_config.get('extraction_concurrency', 4))
         )
+        for entry, extraction in zip(missing, extractions):
+            if extraction["status"] == "success":
+                entry["query"] = apply_extraction(entry["query"], extraction["intent"], extraction["entity"],
+                                                  extraction["properties"])
+                entry["status"] = "extracted"
+            elif extraction["status"] == "error":
+                entry["status"] = "error"
+                entry["error"] = extraction["error"]
+        return results
+    
+    def _classify_request(self, request: str) -> Optional[str]:
+        """Map a request to the CRM operation it asks for"""
+        return parse_query(request).intent
     
-    def process_request(self, request: str) -> str:
-        """Process HubSpot operation request"""
+    def process_request(self, request: Union[str, ParsedQuery]) -> str:
+        """Process HubSpot operation request (raw text or a query the orchestrator already parsed)"""
         try:
-            print(f"🔍 Processing HubSpot request: '{request}'")
+            parsed = request if isinstance(request, ParsedQuery) else parse_query(request)
+            print(f"🔍 Processing HubSpot request: '{parsed.text}'")
             
-            # Extract email from request
-            email_match = re.search(r'[\w\.-]+@[\w\.-]+', request)
-            email = email_match.group(0) if email_match else None
-            
-            if not email:
+            if not parsed.email:
                 return "❌ No email address found in request"
             
-            # Check operation type
-            request_lower = request.lower()
-            
-            if 'create' in request_lower and 'contact' in request_lower:
-                return self._handle_create_contact(request, email)
+            parsed = self.resolve(parsed)
+            if parsed.is_multi:
+                return self._handle_many(parsed)
+            handler = self._handlers.get(parsed.intent)
+            if handler is None:
+                return f"Could not process HubSpot request: {parsed.text}"
+            return handler(self, parsed)
                 
-            elif 'update' in request_lower and 'contact' in request_lower:
-                return self._handle_update_contact(request, email)
-                    
-            elif any(keyword in request_lower for keyword in ['find', 'search', 'lookup']):
-                return self._handle_search_contact(email)
-                    
-            elif any(keyword in request_lower for keyword in ['delete', 'remove']):
-                return self._handle_delete_contact(email)
-                    
-            elif 'create' in request_lower and 'deal' in request_lower:
-                properties = self._extract_deal_properties(request)
-                result = self.hubspot_tools.create_deal(properties)
-                return f"Deal created successfully"
-                
-            else:
-                return f"Could not process HubSpot request: {request}"
+        except Exception as e:
+            return f"Error processing HubSpot request: {str(e)}"
+    
+    async def aprocess_request(self, request: Union[str, ParsedQuery]) -> str:
+        """Process HubSpot operation request without blocking the event loop"""
+        try:
+            parsed = request if isinstance(request, ParsedQuery) else parse_query(request)
+            print(f"🔍 Processing HubSpot request: '{parsed.text}'")
+            
+            if not parsed.email:
+                return "❌ No email address found in request"
+            
+            # A cache hit is a dict lookup, but a miss is a blocking LLM call
+            parsed = await asyncio.to_thread(self.resolve, parsed)
+            if parsed.is_multi:
+                return await self._ahandle_many(parsed)
+            handler = self._async_handlers.get(parsed.intent)
+            if handler is None:
+                return f"Could not process HubSpot request: {parsed.text}"
+            return await handler(self, parsed)
                 
         except Exception as e:
             return f"Error processing HubSpot request: {str(e)}"
     
-    def _handle_create_contact(self, request: str, email: str) -> str:
+    def _created(self, result: dict) -> str:
+        self._mirror_write(result)
+        return f"✅ Contact created successfully"
+    
+    def _updated(self, result: dict) -> str:
+        self._mirror_write(result)
+        return f"✅ Contact updated successfully"
+    
+    def _found(self, email: str, contact: Optional[dict]) -> str:
+        if contact:
+            return self._format_contact(contact)
+        return f"❌ No contact found with email: {email}"
+    
+    def _deleted(self, contact_id: str) -> str:
+        self._mirror_delete(contact_id)
+        return f"✅ Contact deleted successfully"
+    
+    def _failed(self, action: str, email: str, error: Exception) -> str:
+        """Outcome for a failed operation; a 404 means the addressed contact does not exist"""
+        if isinstance(error, HubSpotAPIError) and error.status_code == 404:
+            return f"❌ No contact found with email: {email}"
+        return f"❌ Failed to {action} contact: {str(error)}"
+    
+    def _handle_create_contact(self, parsed: ParsedQuery) -> str:
         """Handle contact creation"""
         try:
-            properties = self._extract_contact_properties(request, email)
+            properties = dict(parsed.properties)
             print(f"📝 Creating contact with properties: {properties}")
-            
-            result = self.hubspot_tools.create_contact(properties)
-            return f"✅ Contact created successfully"
+            return self._created(self.hubspot_tools.create_contact(properties))
         except Exception as e:
-            return f"❌ Failed to create contact: {str(e)}"
+            return self._failed('create', parsed.email, e)
     
-    def _handle_update_contact(self, request: str, email: str) -> str:
+    def _handle_update_contact(self, parsed: ParsedQuery) -> str:
         """Handle contact update"""
+        email = parsed.email
         try:
-            print(f"🔄 Looking for contact with email: {email}")
-            
-            # Search for contact
-            contact = self.hubspot_tools.search_contact(email)
-            if not contact:
-                return f"❌ No contact found with email: {email}"
-            
-            contact_id = contact.get('id')
-            print(f"✅ Contact found! ID: {contact_id}")
-            
-            # Extract update properties
-            properties = self._extract_update_properties(request, email)
-            print(f"📝 Updating contact with properties: {properties}")
+            properties = dict(parsed.properties)
+            print(f"📝 Updating contact {email} with properties: {properties}")
             
             if not properties:
                 return "❌ No properties found to update"
             
-            # Perform update
-            result = self.hubspot_tools.update_contact(contact_id, properties)
-            return f"✅ Contact updated successfully"
+            # Address the contact by email: one request, no dependency on the search index
+            return self._updated(self.hubspot_tools.update_contact_by_email(email, properties))
         except Exception as e:
-            return f"❌ Failed to update contact: {str(e)}"
+            return self._failed('update', email, e)
     
-    def _handle_search_contact(self, email: str) -> str:
+    def _handle_search_contact(self, parsed: ParsedQuery) -> str:
         """Handle contact search"""
+        email = parsed.email
         try:
             print(f"🔎 Searching for contact: {email}")
-            
-            contact = self.hubspot_tools.search_contact(email)
-            if contact:
-                contact_id = contact.get('id')
-                properties = contact.get('properties', {})
-                return f"✅ Contact found!\nID: {contact_id}\nEmail: {properties.get('email', 'N/A')}\nFirst Name: {properties.get('firstname', 'N/A')}\nLast Name: {properties.get('lastname', 'N/A')}\nPhone: {properties.get('phone', 'N/A')}"
-            else:
-                return f"❌ No contact found with email: {email}"
+            return self._found(email, self._search_mirror(email) or self.hubspot_tools.search_contact(email))
         except Exception as e:
-            return f"❌ Failed to search contact: {str(e)}"
+            return self._failed('search', email, e)
     
-    def _handle_delete_contact(self, email: str) -> str:
+    def _handle_delete_contact(self, parsed: ParsedQuery) -> str:
         """Handle contact deletion"""
+        email = parsed.email
         try:
             print(f"🗑️ Looking for contact to delete: {email}")
             
-            contact = self.hubspot_tools.search_contact(email)
-            if not contact:
-                return f"❌ No contact found with email: {email}"
+            contact_id = self.hubspot_tools.resolve_contact_id(email)
+            if not contact_id:
+                return self._found(email, None)
             
-            contact_id = contact.get('id')
             print(f"✅ Contact found! Deleting ID: {contact_id}")
             
-            result = self.hubspot_tools.delete_contact(contact_id)
-            return f"✅ Contact deleted successfully"
+            self.hubspot_tools.delete_contact(contact_id)
+            return self._deleted(contact_id)
         except Exception as e:
-            return f"❌ Failed to delete contact: {str(e)}"
+            return self._failed('delete', email, e)
     
-    def _extract_contact_properties(self, request: str, email: str = None) -> dict:
-        properties = {}
-        if email:
-            properties['email'] = email
-        
-        print(f"🔍 Analyzing request: '{request}'")
-        
-        # Extract first name
-        first_name_match = re.search(r'first\s*name\s*(?:is|:)?\s*(\w+)', request, re.IGNORECASE)
-        if first_name_match:
-            properties['firstname'] = first_name_match.group(1)
-            print(f"✅ First name extracted: {first_name_match.group(1)}")
-            
-        # Extract last name  
-        last_name_match = re.search(r'last\s*name\s*(?:is|:)?\s*(\w+)', request, re.IGNORECASE)
-        if last_name_match:
-            properties['lastname'] = last_name_match.group(1)
-            print(f"✅ Last name extracted: {last_name_match.group(1)}")
-            
-        # Extract phone number
-        phone_patterns = [
-            r'phone\s*number\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)',
-            r'phone\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)',
-            r'phone\s*[:]?\s*(\d+)',
-        ]
-        
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, request, re.IGNORECASE)
-            if phone_match:
-                phone_number = phone_match.group(1).strip()
-                phone_number = re.sub(r'[^\d]', '', phone_number)
-                if phone_number:
-                    properties['phone'] = phone_number
-                    print(f"✅ Phone number extracted: {phone_number}")
-                break
-        
-        # Fallback: Look for any 5+ digit number
-        if 'phone' not in properties:
-            number_match = re.search(r'(\d{5,})', request)
-            if number_match:
-                properties['phone'] = number_match.group(1)
-                print(f"✅ Phone number found via fallback: {number_match.group(1)}")
-        
-        print(f"🎯 Final properties: {properties}")
-        return properties
+    def _handle_create_deal(self, parsed: ParsedQuery) -> str:
+        """Handle deal creation"""
+        self.hubspot_tools.create_deal(dict(parsed.properties))
+        return f"Deal created successfully"
     
-    def _extract_update_properties(self, request: str, email: str = None) -> dict:
-        """Special extraction for update operations"""
-        properties = {}
-        
-        print(f"🔍 Analyzing UPDATE request: '{request}'")
-        
-        # Extract phone number for update
-        phone_patterns = [
-            r'phone\s*number\s*to\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)',
-            r'phone\s*to\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)',
-            r'phone\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)',
-        ]
-        
-        for pattern in phone_patterns:
-            phone_match = re.search(pattern, request, re.IGNORECASE)
-            if phone_match:
-                phone_number = phone_match.group(1).strip()
-                phone_number = re.sub(r'[^\d]', '', phone_number)
-                if phone_number:
-                    properties['phone'] = phone_number
-                    print(f"✅ Update - Phone number extracted: {phone_number}")
-                break
-        
-        # Extract first name update
-        first_name_match = re.search(r'first\s*name\s*to\s*(?:is|:)?\s*(\w+)', request, re.IGNORECASE)
-        if first_name_match:
-            properties['firstname'] = first_name_match.group(1)
-            print(f"✅ Update - First name extracted: {first_name_match.group(1)}")
-        
-        # Extract last name update  
-        last_name_match = re.search(r'last\s*name\s*to\s*(?:is|:)?\s*(\w+)', request, re.IGNORECASE)
-        if last_name_match:
-            properties['lastname'] = last_name_match.group(1)
-            print(f"✅ Update - Last name extracted: {last_name_match.group(1)}")
-        
-        print(f"🎯 Update properties: {properties}")
-        return properties
+    def _format_contact(self, contact: dict) -> str:
+        contact_id = contact.get('id')
+        properties = contact.get('properties', {})
+        return f"✅ Contact found!\nID: {contact_id}\nEmail: {properties.get('email', 'N/A')}\nFirst Name: {properties.get('firstname', 'N/A')}\nLast Name: {properties.get('lastname', 'N/A')}\nPhone: {properties.get('phone', 'N/A')}"
     
-    def _extract_deal_properties(self, request: str) -> dict:
-        properties = {}
-        
-        if 'deal' in request.lower():
-            deal_match = re.search(r'deal\s*(?:for|with|:)?\s*([^,.]+)', request, re.IGNORECASE)
-            if deal_match:
-                properties['dealname'] = deal_match.group(1).strip()
-        
-        amount_match = re.search(r'\$?(\d+(?:,\d+)*(?:\.\d+)?)', request)
-        if amount_match:
-            properties['amount'] = amount_match.group(1).replace(',', '')
-            
-        return properties
\ No newline at end of file
+    async def _ahandle_create_contact(self, parsed: ParsedQuery) -> str:
+        try:
+            return self._created(await self.async_hubspot_tools.create_contact(dict(parsed.properties)))
+        except Exception as e:
+            return self._failed('create', parsed.email, e)
+    
+    async def _ahandle_update_contact(self, parsed: ParsedQuery) -> str:
+        email = parsed.email
+        try:
+            properties = dict(parsed.properties)
+            if not properties:
+                return "❌ No properties found to update"
+            return self._updated(await self.async_hubspot_tools.update_contact_by_email(email, properties))
+        except Exception as e:
+            return self._failed('update', email, e)
+    
+    async def _ahandle_search_contact(self, parsed: ParsedQuery) -> str:
+        email = parsed.email
+        try:
+            return self._found(email, self._search_mirror(email) or await self.async_hubspot_tools.search_contact(email))
+        except Exception as e:
+            return self._failed('search', email, e)
+    
+    async def _ahandle_delete_contact(self, parsed: ParsedQuery) -> str:
+        email = parsed.email
+        try:
+            contact_id = await self.async_hubspot_tools.resolve_contact_id(email)
+            if not contact_id:
+                return self._found(email, None)
+            await self.async_hubspot_tools.delete_contact(contact_id)
+            return self._deleted(contact_id)
+        except Exception as e:
+            return self._failed('delete', email, e)
+    
+    async def _ahandle_create_deal(self, parsed: ParsedQuery) -> str:
+        await self.async_hubspot_tools.create_deal(dict(parsed.properties))
+        return f"Deal created successfully"
+    
+    def planner(self) -> BatchPlanner:
+        return BatchPlanner(self.hubspot_tools, self._mirror_write, self._mirror_delete, self._search_mirror)
+    
+    def run_batch(self, queries: List[ParsedQuery], dry_run: bool = False) -> str:
+        """Plan a batch of operations into the fewest API calls, then run it (or only describe it)"""
+        planner = self.planner()
+        plan = planner.plan(queries)
+        print(f"📦 {len(plan.operations)} operations planned as {plan.api_calls} API calls "
+              f"(vs {plan.sequential_calls} one by one)")
+        if dry_run:
+            return plan.describe()
+        return format_rows(plan, planner.execute(plan))
+    
+    def _handle_many(self, parsed: ParsedQuery) -> str:
+        """Run a list command for every contact through the batch planner"""
+        return self.run_batch([parsed])
+    
+    async def _ahandle_many(self, parsed: ParsedQuery) -> str:
+        return await asyncio.to_thread(self._handle_many, parsed)
+    
+    # Intent name (see agents.query_parser.INTENT_RULES) -> handler
+    _handlers = {
+        'create_contact': _handle_create_contact,
+        'update_contact': _handle_update_contact,
+        'search_contact': _handle_search_contact,
+        'delete_contact': _handle_delete_contact,
+        'create_deal': _handle_create_deal,
+    }
+    _async_handlers = {
+        'create_contact': _ahandle_create_contact,
+        'update_contact': _ahandle_update_contact,
+        'search_contact': _ahandle_search_contact,
+        'delete_contact': _ahandle_delete_contact,
+        'create_deal': _ahandle_create_deal,
+    }
\ No newline at end of file
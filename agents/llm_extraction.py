@@ -0,0 +1,343 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from types import MappingProxyType
+from typing import Dict, Any, Optional, List, Tuple
+
+from agents.query_parser import EMAIL_PATTERN, INTENT_RULES, ParsedQuery
+from tools.extraction_cache import ExtractionCache
+
+# Fields the LLM may fill in per entity; anything else it returns is dropped
+ENTITY_FIELDS = {
+    'contact': ('email', 'firstname', 'lastname', 'phone'),
+    'deal': ('dealname', 'amount'),
+}
+FIELD_DESCRIPTIONS = {
+    'email': "Email address of the contact",
+    'firstname': "Contact's first name",
+    'lastname': "Contact's last name",
+    'phone': "Phone or mobile number, digits only",
+    'dealname': "Name of the deal",
+    'amount': "Deal amount as a plain number, no currency symbol or separators",
+}
+SYSTEM_PROMPT = (
+    "You read requests to a HubSpot CRM assistant. Pick the operation the request asks for "
+    "('none' if it asks for none of them) and copy out only the fields it mentions. "
+    "For updates, give only the fields being changed."
+)
+BATCH_SYSTEM_PROMPT = SYSTEM_PROMPT + (
+    " You will get a numbered list of requests; return one result per request, "
+    "with its number as the index."
+)
+# Prompt-size estimate used to pack batches: ~4 characters per token, plus numbering per item
+CHARS_PER_TOKEN = 4
+ITEM_OVERHEAD_TOKENS = 8
+# Input-token budget per batched call, leaving room for the structured reply
+BATCH_PROMPT_TOKENS = 6000
+# Caps the reply size too: every item costs ~40 output tokens
+BATCH_MAX_ITEMS = 40
+
+# Emails, numbers and capitalized names (not sentence-initial) become slots in the cache key
+SLOT_PATTERN = re.compile(
+    rf"(?P<email>{EMAIL_PATTERN.pattern})"
+    r"|(?P<number>(?<!\w)\+?\(?\$?\d[\d\s\-\(\)\.,]*\d|(?<!\w)\$?\d)"
+    r"|(?P<name>(?<=[^\w])[A-Z][a-zA-Z]*(?:\s+[A-Z][a-zA-Z]*)*)"
+)
+_NON_DIGITS = re.compile(r'[^\d]')
+# How a cached field is rebuilt from a slot value
+_TRANSFORMS = {
+    'raw': lambda value: value,
+    'digits': lambda value: _NON_DIGITS.sub('', value),
+    'amount': lambda value: value.replace('$', '').replace(',', ''),
+    'first_word': lambda value: value.split()[0],
+    'last_word': lambda value: value.split()[-1],
+}
+
+
+def normalize_query(text: str) -> Tuple[str, Dict[str, List[str]]]:
+    """Split a query into its template (lowercased, slots abstracted) and the slot values"""
+    slots: Dict[str, List[str]] = {'email': [], 'number': [], 'name': []}
+    parts, position = [], 0
+    for match in SLOT_PATTERN.finditer(text):
+        parts.append(text[position:match.start()].lower())
+        parts.append(f"<{match.lastgroup}>")
+        slots[match.lastgroup].append(match.group(0))
+        position = match.end()
+    parts.append(text[position:].lower())
+    return ' '.join(''.join(parts).split()), slots
+
+
+def _slot_reference(value: str, slots: Dict[str, List[str]]) -> Optional[List[Any]]:
+    for kind, values in slots.items():
+        for index, slot in enumerate(values):
+            for transform, apply in _TRANSFORMS.items():
+                if apply(slot) == value:
+                    return [kind, index, transform]
+    return None
+
+
+def _generalize(intent: Optional[str], properties: Dict[str, str], slots: Dict[str, List[str]]) -> Dict[str, Any]:
+    """Cache entry for a template: each field points at a slot, or is a literal when no slot holds it"""
+    fields = {field: _slot_reference(value, slots) or ['literal', value] for field, value in properties.items()}
+    return {'intent': intent, 'fields': fields}
+
+
+def _instantiate(entry: Dict[str, Any], slots: Dict[str, List[str]]) -> Dict[str, str]:
+    properties = {}
+    for field, reference in entry['fields'].items():
+        if reference[0] == 'literal':
+            properties[field] = reference[1]
+        else:
+            kind, index, transform = reference
+            properties[field] = _TRANSFORMS[transform](slots[kind][index])
+    return properties
+
+
+def extraction_schema() -> Dict[str, Any]:
+    """JSON schema handed to with_structured_output()"""
+    fields = {field: {"type": "string", "description": description}
+              for field, description in FIELD_DESCRIPTIONS.items()}
+    return {
+        "title": "crm_request",
+        "description": "The CRM operation a request asks for and the fields it mentions",
+        "type": "object",
+        "properties": {
+            "intent": {"type": "string", "enum": [rule.name for rule in INTENT_RULES] + ["none"]},
+            **fields,
+        },
+        "required": ["intent"],
+    }
+
+
+def batch_extraction_schema() -> Dict[str, Any]:
+    """Schema for one call answering a numbered list of requests"""
+    item = extraction_schema()
+    properties = dict(item["properties"], index={"type": "integer", "description": "Number of the request in the list"})
+    return {
+        "title": "crm_requests",
+        "description": "One extraction per numbered request",
+        "type": "object",
+        "properties": {
+            "results": {
+                "type": "array",
+                "items": {"type": "object", "properties": properties, "required": ["index", "intent"]},
+            },
+        },
+        "required": ["results"],
+    }
+
+
+def pack_batches(texts: List[str], max_tokens: int = BATCH_PROMPT_TOKENS,
+                 max_items: int = BATCH_MAX_ITEMS) -> List[List[int]]:
+    """Group text positions, in order, into batches whose estimated prompt fits max_tokens"""
+    budget = max_tokens - len(BATCH_SYSTEM_PROMPT) // CHARS_PER_TOKEN
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for position, text in enumerate(texts):
+        cost = len(text) // CHARS_PER_TOKEN + ITEM_OVERHEAD_TOKENS
+        if current and (used + cost > budget or len(current) >= max_items):
+            batches.append(current)
+            current, used = [], 0
+        current.append(position)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def apply_extraction(parsed: ParsedQuery, intent: str, entity: str, properties: Dict[str, str]) -> ParsedQuery:
+    return replace(parsed, intent=intent, entity=entity, properties=MappingProxyType(properties))
+
+
+def needs_extraction(parsed: ParsedQuery) -> bool:
+    """True when the regex parser found no intent, or an intent but none of its fields"""
+    if parsed.intent is None:
+        return True
+    rule = next((rule for rule in INTENT_RULES if rule.name == parsed.intent), None)
+    return rule is not None and rule.extract is not None and not parsed.properties
+
+
+class LLMExtractor:
+    """Structured-output LLM fallback for requests the regex parser can't read.
+
+    Results are cached per normalized template, so a phrasing costs one LLM
+    call and every later query shaped like it ("set <name>'s mobile to
+    <number>") is filled in from the cache. Failed calls are not cached.
+    """
+
+    def __init__(self, llm, cache: ExtractionCache):
+        self.llm = llm
+        self.cache = cache
+        self._structured = None
+        self._structured_batch = None
+        self._lock = threading.Lock()
+        self._stats = {"llm_calls": 0, "llm_errors": 0, "unrecognized": 0, "batch_calls": 0, "batched_items": 0}
+
+    def _count(self, **increments: int):
+        with self._lock:
+            for name, increment in increments.items():
+                self._stats[name] += increment
+
+    def _structured_llm(self):
+        if self._structured is None:
+            self._structured = self.llm.with_structured_output(extraction_schema())
+        return self._structured
+
+    def _structured_batch_llm(self):
+        if self._structured_batch is None:
+            self._structured_batch = self.llm.with_structured_output(batch_extraction_schema())
+        return self._structured_batch
+
+    def _validate(self, response: Any) -> Tuple[Optional[str], Optional[str], Dict[str, str]]:
+        """Keep a known intent and that entity's non-empty fields, normalized like the regex path"""
+        response = dict(response or {})
+        rule = next((rule for rule in INTENT_RULES if rule.name == response.get('intent')), None)
+        if rule is None:
+            return None, None, {}
+        properties = {}
+        for field in ENTITY_FIELDS.get(rule.entity, ()):
+            value = str(response.get(field) or '').strip()
+            if field == 'phone':
+                value = _NON_DIGITS.sub('', value)
+            elif field == 'amount':
+                value = value.replace('$', '').replace(',', '')
+            if value:
+                properties[field] = value
+        return rule.name, rule.entity, properties
+
+    def _remember(self, template: str, slots: Dict[str, List[str]], response: Any) -> Dict[str, Any]:
+        intent, entity, properties = self._validate(response)
+        entry = dict(_generalize(intent, properties, slots), entity=entity)
+        self.cache.put(template, entry)
+        if intent is None:
+            self._count(unrecognized=1)
+        return entry
+
+    def extract(self, text: str) -> Optional[Tuple[str, str, Dict[str, str]]]:
+        """(intent, entity, properties) for a query, or None if it asks for no CRM operation"""
+        template, slots = normalize_query(text)
+        entry = self.cache.get(template)
+        if entry is None:
+            try:
+                response = self._structured_llm().invoke([("system", SYSTEM_PROMPT), ("human", text)])
+            except Exception as e:
+                self._count(llm_errors=1)
+                print(f"⚠️ LLM extraction failed: {e}")
+                return None
+            self._count(llm_calls=1)
+            entry = self._remember(template, slots, response)
+        if entry['intent'] is None:
+            return None
+        return entry['intent'], entry['entity'], _instantiate(entry, slots)
+
+    def _ask_batch(self, texts: List[str]) -> Dict[int, Any]:
+        """One LLM call for a list of requests; returns reply by 1-based position"""
+        if len(texts) == 1:
+            return {1: self._structured_llm().invoke([("system", SYSTEM_PROMPT), ("human", texts[0])])}
+        numbered = '\n'.join(f"{number}. {text}" for number, text in enumerate(texts, 1))
+        response = dict(self._structured_batch_llm().invoke([("system", BATCH_SYSTEM_PROMPT), ("human", numbered)]))
+        self._count(batch_calls=1, batched_items=len(texts))
+        replies = {}
+        for item in response.get('results') or []:
+            item = dict(item)
+            if isinstance(item.get('index'), int) and 1 <= item['index'] <= len(texts):
+                replies.setdefault(item['index'], item)
+        return replies
+
+    def _extract_batch(self, batch: List[Tuple[str, Dict[str, List[str]], str]]
+                       ) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """Extract (template, slots, text) items in one call; returns entries and errors by template.
+
+        A failed call is split in half and retried, and items the model left out
+        are asked again, so one bad command only fails itself.
+        """
+        entries: Dict[str, Dict[str, Any]] = {}
+        errors: Dict[str, str] = {}
+        try:
+            replies = self._ask_batch([text for _, _, text in batch])
+            self._count(llm_calls=1)
+        except Exception as e:
+            self._count(llm_errors=1)
+            replies, error = {}, str(e)
+        else:
+            error = "No extraction returned"
+
+        missing = []
+        for number, (template, slots, text) in enumerate(batch, 1):
+            if number in replies:
+                entries[template] = self._remember(template, slots, replies[number])
+            else:
+                missing.append((template, slots, text))
+        if len(missing) == 1 and len(batch) == 1:
+            errors[missing[0][0]] = error
+        elif missing:
+            # Retry whatever is left; halve it when nothing came back so each retry makes progress
+            middle = len(missing) // 2 if len(missing) == len(batch) else len(missing)
+            for part in (missing[:middle], missing[middle:]):
+                if part:
+                    part_entries, part_errors = self._extract_batch(part)
+                    entries.update(part_entries)
+                    errors.update(part_errors)
+        return entries, errors
+
+    def extract_many(self, texts: List[str], max_tokens: int = BATCH_PROMPT_TOKENS,
+                     max_items: int = BATCH_MAX_ITEMS, max_concurrency: int = 4) -> List[Dict[str, Any]]:
+        """Extract many commands in as few LLM calls as the token budget allows.
+
+        Cache hits and repeated templates need no call; the remaining distinct
+        templates are packed into numbered batches run max_concurrency at a
+        time. Returns one {"index", "status", "intent", "entity", "properties"}
+        entry per text, in input order; status is "success", "unrecognized" or
+        "error" (with "error" holding the message).
+        """
+        normalized = [normalize_query(text) for text in texts]
+        entries: Dict[str, Dict[str, Any]] = {}
+        pending: Dict[str, Tuple[str, Dict[str, List[str]], str]] = {}
+        for (template, slots), text in zip(normalized, texts):
+            if template in entries or template in pending:
+                continue
+            entry = self.cache.get(template)
+            if entry is None:
+                pending[template] = (template, slots, text)
+            else:
+                entries[template] = entry
+
+        errors: Dict[str, str] = {}
+        items = list(pending.values())
+        batches = [[items[position] for position in batch]
+                   for batch in pack_batches([text for _, _, text in items], max_tokens, max_items)]
+        if batches:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(batches)))) as pool:
+                for batch_entries, batch_errors in pool.map(self._extract_batch, batches):
+                    entries.update(batch_entries)
+                    errors.update(batch_errors)
+
+        results = []
+        for index, (template, slots) in enumerate(normalized):
+            if template in errors:
+                results.append({"index": index, "status": "error", "error": errors[template]})
+                continue
+            entry = entries[template]
+            if entry['intent'] is None:
+                results.append({"index": index, "status": "unrecognized"})
+            else:
+                results.append({"index": index, "status": "success", "intent": entry['intent'],
+                                "entity": entry['entity'], "properties": _instantiate(entry, slots)})
+        return results
+
+    def resolve(self, parsed: ParsedQuery) -> ParsedQuery:
+        """parsed with the LLM's intent and fields filled in, or unchanged if the LLM finds none"""
+        extraction = self.extract(parsed.text)
+        if extraction is None:
+            return parsed
+        intent, entity, properties = extraction
+        print(f"🤖 LLM extraction: {intent} {properties}")
+        return apply_extraction(parsed, intent, entity, properties)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["cache"] = self.cache.get_stats()
+        return stats
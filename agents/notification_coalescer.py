@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Dict, Any, List, Callable
+
+
+class NotificationCoalescer:
+    """Buffer CRM action notices per recipient and hand them on as one digest.
+
+    A recipient's buffer is flushed when its oldest action is `window`
+    seconds old, when it holds `max_actions` actions, or immediately for an
+    urgent action. deliver(recipient, actions) is called outside the lock;
+    a digest it fails to take is put back and retried on the next flush.
+    Buffers live in memory until flushed, so call flush_all() before exiting.
+    """
+
+    def __init__(self, deliver: Callable[[str, List[str]], Any], window: float = 30.0, max_actions: int = 50):
+        self.deliver = deliver
+        self.window = window
+        self.max_actions = max_actions
+        self._buffers: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._stats = {"actions": 0, "digests": 0, "urgent_flushes": 0, "size_flushes": 0, "window_flushes": 0,
+                       "failed_handoffs": 0}
+        self._timer = threading.Thread(target=self._flush_expired, name="notification-coalescer", daemon=True)
+        self._timer.start()
+
+    @staticmethod
+    def _normalize(recipient: str) -> str:
+        return recipient.strip().lower()
+
+    def add(self, recipient: str, action: str, urgent: bool = False):
+        """Buffer one action for recipient, flushing now if urgent or the buffer is full"""
+        key = self._normalize(recipient)
+        with self._wakeup:
+            buffer = self._buffers.get(key)
+            if buffer is None:
+                buffer = {"recipient": recipient, "actions": [], "flush_at": time.monotonic() + self.window}
+                self._buffers[key] = buffer
+                self._wakeup.notify()
+            buffer["actions"].append(action)
+            self._stats["actions"] += 1
+            if urgent:
+                self._stats["urgent_flushes"] += 1
+            elif len(buffer["actions"]) >= self.max_actions:
+                self._stats["size_flushes"] += 1
+            else:
+                return
+            del self._buffers[key]
+            self._stats["digests"] += 1
+        try:
+            self.deliver(buffer["recipient"], buffer["actions"])
+        except Exception:
+            self._restore(buffer)
+            raise
+
+    def _restore(self, buffer: Dict[str, Any]):
+        """Put back a digest that could not be handed off, ahead of actions buffered since"""
+        key = self._normalize(buffer["recipient"])
+        with self._wakeup:
+            newer = self._buffers.get(key)
+            if newer is not None:
+                buffer["actions"].extend(newer["actions"])
+            buffer["flush_at"] = time.monotonic() + self.window
+            self._buffers[key] = buffer
+            self._stats["digests"] -= 1
+            self._stats["failed_handoffs"] += 1
+            self._wakeup.notify()
+
+    def _hand_off(self, buffer: Dict[str, Any]) -> bool:
+        try:
+            self.deliver(buffer["recipient"], buffer["actions"])
+            return True
+        except Exception as e:
+            print(f"❌ Failed to hand off digest for {buffer['recipient']}: {e} (kept for the next flush)")
+            self._restore(buffer)
+            return False
+
+    def _take_expired(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        expired = [key for key, buffer in self._buffers.items() if buffer["flush_at"] <= now]
+        taken = [self._buffers.pop(key) for key in expired]
+        self._stats["window_flushes"] += len(taken)
+        self._stats["digests"] += len(taken)
+        return taken
+
+    def _flush_expired(self):
+        while True:
+            with self._wakeup:
+                taken = self._take_expired()
+                while not taken and not self._stopping:
+                    next_flush = min((buffer["flush_at"] for buffer in self._buffers.values()), default=None)
+                    self._wakeup.wait(None if next_flush is None else max(next_flush - time.monotonic(), 0.0))
+                    taken = self._take_expired()
+                if self._stopping and not taken:
+                    return
+            for buffer in taken:
+                self._hand_off(buffer)
+
+    def flush_all(self) -> int:
+        """Deliver every buffered digest now; returns how many were sent (failed ones stay buffered)"""
+        with self._wakeup:
+            taken = list(self._buffers.values())
+            self._buffers.clear()
+            self._stats["digests"] += len(taken)
+        return sum(1 for buffer in taken if self._hand_off(buffer))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["buffered_recipients"] = len(self._buffers)
+            stats["buffered_actions"] = sum(len(buffer["actions"]) for buffer in self._buffers.values())
+        return stats
+
+    def close(self):
+        """Flush everything and stop the timer thread"""
+        self.flush_all()
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        self._timer.join(5.0)
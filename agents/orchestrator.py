@@ -1,52 +1,139 @@
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from utils.config_loader import ConfigLoader
+from utils.config_loader import get_shared_config
+from utils.llm import get_shared_llm
 from agents.hubspot_agent import HubSpotAgent
 from agents.email_agent import EmailAgent
-import re
+from agents.query_parser import ParsedQuery, parse_query
+from agents.llm_extraction import needs_extraction
+from agents.query_result import HUBSPOT_SECTION, EMAIL_SECTION, EMAILS_SECTION, ORCHESTRATOR_ERROR
+from typing import Dict, List, Tuple, Optional, Callable, Any, Union
+import asyncio
 
 class GlobalOrchestrator:
     def __init__(self):
-        self.config = ConfigLoader()
-        self.llm = self._setup_llm()
+        self.config = get_shared_config()
         self.hubspot_agent = HubSpotAgent()
         self.email_agent = EmailAgent()
     
-    def _setup_llm(self) -> ChatOpenAI:
-        """Setup OpenAI LLM"""
-        openai_config = self.config.get_openai_config()
-        return ChatOpenAI(
-            api_key=openai_config.get('api_key'),
-            model=openai_config.get('model', 'gpt-4'),
-            temperature=0
-        )
+    @property
+    def llm(self):
+        """Shared ChatOpenAI client; langchain is imported and the client built on first use"""
+        return get_shared_llm(self.config.get_openai_config())
     
-    def process_query(self, user_query: str) -> str:
-        """Process user query through the multi-agent system"""
+    def _notifications(self, parsed: ParsedQuery, result: str) -> List[Tuple[str, str, bool]]:
+        """(recipient, details, urgent) for each distinct address in the query.
+        
+        Contacts in a list command are told only about their own row of the result table.
+        """
+        entities = {entity.email.lower(): entity for entity in parsed.entities}
+        recipients: Dict[str, str] = {}
+        for email in parsed.emails:
+            recipients.setdefault(email.lower(), email)
+        notifications = []
+        for recipient in recipients.values():
+            entity = entities.get(recipient.lower())
+            own_rows = [line.strip() for line in result.splitlines() if entity is not None and recipient in line]
+            if own_rows:
+                details = f"Action completed for: {entity.text}\nResult: {' '.join(own_rows)}"
+            else:
+                details = f"Action completed for: {parsed.text}\nResult: {result}"
+                own_rows = [result]
+            # Failures go out at once; routine confirmations are batched into digests
+            urgent = any('❌' in row or 'Error' in row for row in own_rows)
+            notifications.append((recipient, details, urgent))
+        return notifications
+    
+    def _notify(self, notifications: List[Tuple[str, str, bool]]) -> str:
+        """Queue the notifications; returns the result line(s) to append"""
+        messages = [self.email_agent.queue_notification(details, recipient, urgent=urgent)
+                    for recipient, details, urgent in notifications]
+        if len(messages) == 1:
+            return f"{EMAIL_SECTION}{messages[0]}\n"
+        failures = [message for message in messages if message.startswith('Error')]
+        lines = [f"{EMAILS_SECTION}{len(messages) - len(failures)}/{len(messages)} recipients notified"] + failures
+        return "\n".join(lines) + "\n"
+    
+    def resolve_many(self, queries: List[str]) -> List[ParsedQuery]:
+        """Parse a batch of queries, completing the ones the regexes miss in packed LLM calls.
+        
+        The results can be passed to process_query/aprocess_query, which then find
+        the LLM's answers already applied (or cached) instead of asking one by one.
+        """
+        parsed = [parse_query(query) for query in queries]
+        if not self.hubspot_agent.extraction_enabled:
+            return parsed
+        # Same gate as process_query: only queries that name an address go to the LLM
+        missing = [index for index, query in enumerate(parsed) if query.email and needs_extraction(query)]
+        if not missing:
+            return parsed
+        try:
+            resolved = self.hubspot_agent.resolve_many([queries[index] for index in missing])
+        except Exception as e:
+            print(f"⚠️ Batched extraction failed, falling back to one query at a time: {e}")
+            return parsed
+        for index, entry in zip(missing, resolved):
+            parsed[index] = entry["query"]
+        return parsed
+    
+    def process_query(self, user_query: Union[str, ParsedQuery], on_progress: Optional[Callable[[str], Any]] = None) -> str:
+        """Process user query through the multi-agent system; on_progress(step) is called as each stage finishes"""
         try:
-            print(f"🔄 Processing query: {user_query}")
+            # Parsed once here (or by resolve_many); the HubSpot agent reuses the same ParsedQuery
+            parsed = user_query if isinstance(user_query, ParsedQuery) else parse_query(user_query)
+            print(f"🔄 Processing query: {parsed.text}")
             
             # Simple rule-based orchestration
             result = ""
             
+            is_crm = parsed.is_crm
+            if not is_crm and parsed.email and self.hubspot_agent.extraction_enabled:
+                # e.g. "set John's mobile to ..." names no CRM object; let the LLM fallback decide
+                parsed = self.hubspot_agent.resolve(parsed)
+                is_crm = parsed.intent is not None
+            
             # Check if this is a CRM operation
-            if any(keyword in user_query.lower() for keyword in ['contact', 'deal', 'crm', 'hubspot']):
-                hubspot_result = self.hubspot_agent.process_request(user_query)
-                result += f"HubSpot Operation: {hubspot_result}\n"
+            if is_crm:
+                hubspot_result = self.hubspot_agent.process_request(parsed)
+                result += f"{HUBSPOT_SECTION}{hubspot_result}\n"
+                if on_progress:
+                    on_progress("✅ HubSpot operation done")
             
             # Always send email notification if there's an email in the query
-            email_match = re.search(r'[\w\.-]+@[\w\.-]+', user_query)
-            if email_match:
-                recipient_email = email_match.group(0)
-                email_result = self.email_agent.send_notification(
-                    f"Action completed for: {user_query}\nResult: {result}",
-                    recipient_email
-                )
-                result += f"Email Notification: {email_result}\n"
+            if parsed.email:
+                # Delivered by the outbox workers so the CRM result isn't held up by SMTP
+                result += self._notify(self._notifications(parsed, result))
+                if on_progress:
+                    on_progress("📧 Email notification queued")
+            
+            return result if result else "No action was performed."
+            
+        except Exception as e:
+            error_msg = f"{ORCHESTRATOR_ERROR}{str(e)}"
+            print(error_msg)
+            return error_msg
+    
+    async def aprocess_query(self, user_query: Union[str, ParsedQuery]) -> str:
+        """Coroutine version of process_query so one process can serve many queries at once"""
+        try:
+            parsed = user_query if isinstance(user_query, ParsedQuery) else parse_query(user_query)
+            print(f"🔄 Processing query: {parsed.text}")
+            
+            result = ""
+            is_crm = parsed.is_crm
+            if not is_crm and parsed.email and self.hubspot_agent.extraction_enabled:
+                parsed = await asyncio.to_thread(self.hubspot_agent.resolve, parsed)
+                is_crm = parsed.intent is not None
+            
+            if is_crm:
+                hubspot_result = await self.hubspot_agent.aprocess_request(parsed)
+                result += f"{HUBSPOT_SECTION}{hubspot_result}\n"
+            
+            if parsed.email:
+                # Normally just an outbox write, but falls back to blocking SMTP when the outbox is off
+                result += await asyncio.to_thread(self._notify, self._notifications(parsed, result))
             
             return result if result else "No action was performed."
             
         except Exception as e:
-            error_msg = f"Error in orchestrator: {str(e)}"
+            error_msg = f"{ORCHESTRATOR_ERROR}{str(e)}"
             print(error_msg)
-            return error_msg
\ No newline at end of file
+            return error_msg
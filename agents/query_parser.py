@@ -0,0 +1,238 @@
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, Callable, List, Mapping
+
+EMAIL_PATTERN = re.compile(r'[\w\.-]+@[\w\.-]+')
+# Queries mentioning any of these are routed to the HubSpot agent
+CRM_KEYWORDS = ('contact', 'deal', 'crm', 'hubspot')
+
+_FIRST_NAME = re.compile(r'first\s*name\s*(?:is|:)?\s*(\w+)', re.IGNORECASE)
+_LAST_NAME = re.compile(r'last\s*name\s*(?:is|:)?\s*(\w+)', re.IGNORECASE)
+_PHONE = [
+    re.compile(r'phone\s*number\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)', re.IGNORECASE),
+    re.compile(r'phone\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)', re.IGNORECASE),
+    re.compile(r'phone\s*[:]?\s*(\d+)', re.IGNORECASE),
+]
+_LONG_NUMBER = re.compile(r'(\d{5,})')
+_UPDATE_FIRST_NAME = re.compile(r'first\s*name\s*to\s*(?:is|:)?\s*(\w+)', re.IGNORECASE)
+_UPDATE_LAST_NAME = re.compile(r'last\s*name\s*to\s*(?:is|:)?\s*(\w+)', re.IGNORECASE)
+_UPDATE_PHONE = [
+    re.compile(r'phone\s*number\s*to\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)', re.IGNORECASE),
+    re.compile(r'phone\s*to\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)', re.IGNORECASE),
+    re.compile(r'phone\s*(?:is|:)?\s*([\d\s\-\+\(\)]+)', re.IGNORECASE),
+]
+_DEAL_NAME = re.compile(r'deal\s*(?:for|with|:)?\s*([^,.]+)', re.IGNORECASE)
+_AMOUNT = re.compile(r'\$?(\d+(?:,\d+)*(?:\.\d+)?)')
+_NON_DIGITS = re.compile(r'[^\d]')
+# A command is about several contacts only when it says so ("contacts", "each of") or lists addresses
+_LIST_CUE = re.compile(r'\b(?:contacts|each\s+of)\b', re.IGNORECASE)
+_LIST_SEPARATOR = re.compile(r'\s*(?:,\s*(?:and\s+)?|and\s+|&\s*)', re.IGNORECASE)
+
+
+def _first_phone(patterns: List["re.Pattern"], text: str) -> Optional[str]:
+    """Digits from the first phone pattern that matches (later patterns are not tried)"""
+    for pattern in patterns:
+        match = pattern.search(text)
+        if match:
+            return _NON_DIGITS.sub('', match.group(1).strip()) or None
+    return None
+
+
+def extract_contact_fields(text: str, email: Optional[str]) -> Dict[str, Any]:
+    properties = {}
+    if email:
+        properties['email'] = email
+    first_name = _FIRST_NAME.search(text)
+    if first_name:
+        properties['firstname'] = first_name.group(1)
+    last_name = _LAST_NAME.search(text)
+    if last_name:
+        properties['lastname'] = last_name.group(1)
+    phone = _first_phone(_PHONE, text)
+    if phone:
+        properties['phone'] = phone
+    else:
+        # Fallback: any 5+ digit number
+        number = _LONG_NUMBER.search(text)
+        if number:
+            properties['phone'] = number.group(1)
+    return properties
+
+
+def extract_update_fields(text: str, email: Optional[str]) -> Dict[str, Any]:
+    properties = {}
+    phone = _first_phone(_UPDATE_PHONE, text)
+    if phone:
+        properties['phone'] = phone
+    first_name = _UPDATE_FIRST_NAME.search(text)
+    if first_name:
+        properties['firstname'] = first_name.group(1)
+    last_name = _UPDATE_LAST_NAME.search(text)
+    if last_name:
+        properties['lastname'] = last_name.group(1)
+    return properties
+
+
+def extract_deal_fields(text: str, email: Optional[str]) -> Dict[str, Any]:
+    properties = {}
+    if 'deal' in text.lower():
+        deal_name = _DEAL_NAME.search(text)
+        if deal_name:
+            properties['dealname'] = deal_name.group(1).strip()
+    amount = _AMOUNT.search(text)
+    if amount:
+        properties['amount'] = amount.group(1).replace(',', '')
+    return properties
+
+
+FieldExtractor = Callable[[str, Optional[str]], Dict[str, Any]]
+
+
+@dataclass(frozen=True)
+class IntentRule:
+    """Intent matches when every all_of keyword and at least one any_of keyword occurs"""
+    name: str
+    entity: str
+    all_of: Tuple[str, ...] = ()
+    any_of: Tuple[str, ...] = ()
+    extract: Optional[FieldExtractor] = None
+
+    def matches(self, keywords: frozenset) -> bool:
+        return all(keyword in keywords for keyword in self.all_of) and \
+            (not self.any_of or any(keyword in keywords for keyword in self.any_of))
+
+
+# First matching rule wins, so order encodes precedence
+INTENT_RULES: List[IntentRule] = [
+    IntentRule('create_contact', 'contact', all_of=('create', 'contact'), extract=extract_contact_fields),
+    IntentRule('update_contact', 'contact', all_of=('update', 'contact'), extract=extract_update_fields),
+    IntentRule('search_contact', 'contact', any_of=('find', 'search', 'lookup')),
+    IntentRule('delete_contact', 'contact', any_of=('delete', 'remove')),
+    IntentRule('create_deal', 'deal', all_of=('create', 'deal'), extract=extract_deal_fields),
+]
+
+
+def _compile_keywords() -> "re.Pattern":
+    """One alternation over every keyword, so a query is scanned once whatever the rule count"""
+    keywords = set(CRM_KEYWORDS)
+    for rule in INTENT_RULES:
+        keywords.update(rule.all_of)
+        keywords.update(rule.any_of)
+    return re.compile('|'.join(sorted(map(re.escape, keywords), key=len, reverse=True)))
+
+
+_KEYWORDS = _compile_keywords()
+
+
+def register_intent(rule: IntentRule, before: Optional[str] = None):
+    """Add an intent to the dispatch table (ahead of `before` if given) and recompile the scanner"""
+    global _KEYWORDS
+    position = len(INTENT_RULES)
+    if before is not None:
+        position = next(index for index, existing in enumerate(INTENT_RULES) if existing.name == before)
+    INTENT_RULES.insert(position, rule)
+    _KEYWORDS = _compile_keywords()
+    parse_query.cache_clear()
+
+
+@dataclass(frozen=True)
+class ParsedQuery:
+    """Everything the orchestrator and agents need from one query, computed once"""
+    text: str
+    lowered: str
+    keywords: frozenset
+    intent: Optional[str]
+    entity: Optional[str]
+    emails: Tuple[str, ...]
+    properties: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    # List commands ("create contacts for a@x.com, b@y.com ..."): one sub-query per contact
+    entities: Tuple["ParsedQuery", ...] = ()
+
+    @property
+    def email(self) -> Optional[str]:
+        return self.emails[0] if self.emails else None
+
+    @property
+    def is_multi(self) -> bool:
+        return len(self.entities) > 1
+
+    @property
+    def is_crm(self) -> bool:
+        return any(keyword in self.keywords for keyword in CRM_KEYWORDS)
+
+
+def _split_entities(text: str, rule: IntentRule, base: Dict[str, Any]) -> Tuple[ParsedQuery, ...]:
+    """One sub-query per distinct email, with the fields stated in that email's segment.
+
+    Only list commands are split: ones that say "contacts" or "each of", or
+    that open with a comma/and-separated run of addresses ("delete a@x.com and
+    b@y.com"). Other addresses are just part of one contact's request.
+
+    A segment runs from an email to the next one. Fields before the first email
+    apply to every contact, as do fields after the last one when no other
+    segment has its own ("update contacts a@x.com and b@y.com phone to 555...").
+    """
+    matches, seen = [], set()
+    for match in EMAIL_PATTERN.finditer(text):
+        if match.group(0).lower() not in seen:
+            seen.add(match.group(0).lower())
+            matches.append(match)
+    if len(matches) < 2:
+        return ()
+    listed = _LIST_SEPARATOR.fullmatch(text, matches[0].end(), matches[1].start())
+    if not _LIST_CUE.search(text) and not listed:
+        return ()
+
+    def fields(segment: str, email: Optional[str]) -> Dict[str, Any]:
+        extracted = rule.extract(segment, email) if rule.extract else {}
+        extracted.pop('email', None)
+        return extracted
+
+    ends = [match.start() for match in matches[1:]] + [len(text)]
+    segments = [text[match.start():end] for match, end in zip(matches, ends)]
+    own = [fields(segment, match.group(0)) for segment, match in zip(segments, matches)]
+    shared = fields(text[:matches[0].start()], None)
+    if own[-1] and not any(own[:-1]):
+        shared.update(own[-1])
+        own[-1] = {}
+
+    entities = []
+    for segment, match, extracted in zip(segments, matches, own):
+        email = match.group(0)
+        properties = dict(shared, **extracted)
+        if 'email' in base:
+            properties = dict(email=email, **properties)
+        entities.append(ParsedQuery(
+            text=segment.strip(),
+            lowered=segment.strip().lower(),
+            keywords=frozenset(),
+            intent=rule.name,
+            entity=rule.entity,
+            emails=(email,),
+            properties=MappingProxyType(properties)
+        ))
+    return tuple(entities)
+
+
+@lru_cache(maxsize=1024)
+def parse_query(text: str) -> ParsedQuery:
+    """Tokenize, classify and extract fields for a query in a single pass"""
+    lowered = text.lower()
+    keywords = frozenset(match.group(0) for match in _KEYWORDS.finditer(lowered))
+    emails = tuple(EMAIL_PATTERN.findall(text))
+    email = emails[0] if emails else None
+    rule = next((rule for rule in INTENT_RULES if rule.matches(keywords)), None)
+    properties = rule.extract(text, email) if rule and rule.extract else {}
+    entities = _split_entities(text, rule, properties) if rule and rule.entity == 'contact' and len(emails) > 1 else ()
+    return ParsedQuery(
+        text=text,
+        lowered=lowered,
+        keywords=keywords,
+        intent=rule.name if rule else None,
+        entity=rule.entity if rule else None,
+        emails=emails,
+        properties=MappingProxyType(properties),
+        entities=entities
+    )
@@ -0,0 +1,46 @@
+from typing import Iterator, Tuple
+
+# Section headers of a process_query result; each is followed by that step's own result
+HUBSPOT_SECTION = "HubSpot Operation: "
+EMAIL_SECTION = "Email Notification: "
+EMAILS_SECTION = "Email Notifications: "
+ORCHESTRATOR_ERROR = "Error in orchestrator: "
+SECTIONS = (HUBSPOT_SECTION, EMAIL_SECTION, EMAILS_SECTION)
+
+# How a failed step's result starts (batch summaries use ⚠️ when only some operations succeeded)
+HUBSPOT_FAILURES = ('❌', '⚠️', 'Error', 'Could not')
+EMAIL_FAILURES = ('Error',)
+
+
+def _sections(result: str) -> Iterator[Tuple[str, str, bool]]:
+    """(header, first line, has continuation lines) for each section of a result"""
+    header, first, more = None, '', False
+    for line in result.splitlines():
+        section = next((section for section in SECTIONS if line.startswith(section)), None)
+        if section is None:
+            more = more or header is not None
+            continue
+        if header is not None:
+            yield header, first, more
+        header, first, more = section, line[len(section):], False
+    if header is not None:
+        yield header, first, more
+
+
+def result_failed(result: str) -> bool:
+    """True if process_query failed or any of its steps did.
+
+    Only the status at the start of each step's result is read, so data in the
+    body (say, a contact whose first name is "Error") can't be taken for a failure.
+    """
+    if result.startswith(ORCHESTRATOR_ERROR):
+        return True
+    for header, first, more in _sections(result):
+        if header == HUBSPOT_SECTION and first.startswith(HUBSPOT_FAILURES):
+            return True
+        if header == EMAIL_SECTION and first.startswith(EMAIL_FAILURES):
+            return True
+        # Followed by one line per recipient that could not be notified
+        if header == EMAILS_SECTION and more:
+            return True
+    return False
@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Headless HTTP API for the agent, so other systems can call it at volume
+
+One GlobalOrchestrator, and with it one set of HubSpot/SMTP pools and caches,
+serves every request. At most --concurrency queries run at once and up to
+--queue more wait for a slot; past that, requests get 429 with Retry-After.
+Every query (waiting time included) is bounded by --timeout; planned
+batches only while they wait, since their writes can't be cancelled.
+
+Endpoints:
+    POST /query   {"query": "..."}                       -> {"status", "result", "seconds"}
+    POST /batch   {"queries": ["...", ...]}              -> {"results": [...], "summary": {...}}
+    POST /batch   {"queries": [...], "plan": true, "dry_run": false}
+                  CRM operations only, merged into batch API calls by the planner
+    GET  /status  load, limits, counters and pool/cache stats
+
+Examples:
+    python api_server.py --port 8080 --concurrency 8 --queue 64 --timeout 30
+    curl -s localhost:8080/query -d '{"query": "Find contact john@example.com"}'
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from http import HTTPStatus
+from typing import Dict, Any, Optional, List, Tuple
+from urllib.parse import urlsplit
+
+from agents.query_parser import ParsedQuery, parse_query
+from agents.query_result import result_failed
+
+# Seconds a client gets to send a request's line and headers
+HEADER_TIMEOUT = 10.0
+# Seconds a client gets to send the body its Content-Length announced
+BODY_TIMEOUT = 30.0
+
+
+class HTTPError(Exception):
+    """A request that is answered with an error status and closes the connection"""
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class QueryServer:
+    """asyncio HTTP server over a shared GlobalOrchestrator with admission control.
+
+    Queries are admitted while fewer than max_concurrency + max_queue are in
+    the server; a batch is admitted all at once or not at all.
+    """
+
+    def __init__(self, orchestrator=None, host: str = '127.0.0.1', port: int = 8080, max_concurrency: int = 8,
+                 max_queue: int = 64, request_timeout: float = 30.0, max_batch: int = 100,
+                 max_body: int = 1_000_000):
+        self.orchestrator = orchestrator
+        self.host = host
+        self.port = port
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.request_timeout = request_timeout
+        self.max_batch = max_batch
+        self.max_body = max_body
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.started_at = time.monotonic()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._admitted = 0
+        self._running = 0
+        self._stats = {
+            "requests": 0,
+            "queries": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "errors": 0,
+        }
+        self._routes = {
+            ('POST', '/query'): self._query,
+            ('POST', '/batch'): self._batch,
+            ('GET', '/status'): self._status,
+        }
+
+    async def start(self) -> "QueryServer":
+        if self.orchestrator is None:
+            from agents.orchestrator import GlobalOrchestrator
+            self.orchestrator = await asyncio.to_thread(GlobalOrchestrator)
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.started_at = time.monotonic()
+        return self
+
+    async def close(self):
+        """Stop accepting connections, close the async HubSpot client and flush queued notifications"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        if self.orchestrator is not None:
+            if self.orchestrator.hubspot_agent._async_hubspot_tools is not None:
+                await self.orchestrator.hubspot_agent._async_hubspot_tools.aclose()
+            await asyncio.to_thread(self.orchestrator.email_agent.flush_notifications)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _admit(self, count: int = 1):
+        if self._admitted + count > self.max_concurrency + self.max_queue:
+            self._stats["rejected"] += 1
+            raise HTTPError(429, "Server is at capacity, retry later", {"Retry-After": "1"})
+        self._admitted += count
+
+    async def _run(self, query: str, parsed: Optional[ParsedQuery] = None) -> Dict[str, Any]:
+        """Run one admitted query; the timeout covers the wait for a slot too.
+
+        List commands write from a worker thread that can't be cancelled, so
+        for them the timeout only bounds the wait and the slot is held to the end.
+        """
+        started = time.perf_counter()
+        record: Dict[str, Any] = {"query": query}
+        held = False
+        try:
+            parsed = parsed or parse_query(query)
+            if parsed.is_multi:
+                await asyncio.wait_for(self._slots.acquire(), self.request_timeout)
+                held = True
+                result = await self._hold_slot(self.orchestrator.aprocess_query(parsed), 1)
+            else:
+                result = await asyncio.wait_for(self._run_in_slot(parsed), self.request_timeout)
+            record.update(status="failed" if result_failed(result) else "success", result=result)
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            record.update(status="timeout", error=f"Timed out after {self.request_timeout}s")
+        except Exception as e:
+            self._stats["errors"] += 1
+            record.update(status="error", error=str(e))
+        finally:
+            if not held:
+                self._admitted -= 1
+                self._stats["queries"] += 1
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        return record
+
+    async def _hold_slot(self, work, queries: int):
+        """Run work in an already acquired slot to the end, even if the request is cancelled.
+
+        The slot and the admission are released when work finishes, not when the caller stops waiting.
+        """
+        self._running += 1
+        task = asyncio.ensure_future(work)
+        task.add_done_callback(lambda _: self._release_held(queries))
+        return await asyncio.shield(task)
+
+    def _release_held(self, queries: int):
+        self._running -= 1
+        self._admitted -= 1
+        self._stats["queries"] += queries
+        self._slots.release()
+
+    async def _run_in_slot(self, query):
+        async with self._slots:
+            self._running += 1
+            try:
+                return await self.orchestrator.aprocess_query(query)
+            finally:
+                self._running -= 1
+
+    async def _query(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        query = body.get("query")
+        if not isinstance(query, str) or not query.strip():
+            raise HTTPError(400, "Expected {\"query\": \"...\"}")
+        self._admit()
+        record = await self._run(query.strip())
+        status = {"timeout": 504, "error": 500}.get(record["status"], 200)
+        return status, record
+
+    async def _batch(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        queries = body.get("queries")
+        if not isinstance(queries, list) or not queries or not all(isinstance(query, str) for query in queries):
+            raise HTTPError(400, "Expected {\"queries\": [\"...\", ...]}")
+        if len(queries) > self.max_batch:
+            raise HTTPError(413, f"At most {self.max_batch} queries per batch")
+        if body.get("plan"):
+            return await self._planned_batch(queries, bool(body.get("dry_run")))
+
+        self._admit(len(queries))
+        started = time.perf_counter()
+        try:
+            # One packed LLM extraction for the queries the regexes miss, not one call per query
+            parsed = await asyncio.to_thread(self.orchestrator.resolve_many, queries)
+        except BaseException:
+            self._admitted -= len(queries)
+            raise
+        results = await asyncio.gather(*(self._run(query, query_parsed)
+                                         for query, query_parsed in zip(queries, parsed)))
+        summary = {"queries": len(results), "seconds": round(time.perf_counter() - started, 4)}
+        for status in ("success", "failed", "timeout", "error"):
+            summary[status] = sum(1 for result in results if result["status"] == status)
+        return 200, {"results": [dict(result, index=index) for index, result in enumerate(results)],
+                     "summary": summary}
+
+    async def _planned_batch(self, queries: List[str], dry_run: bool) -> Tuple[int, Dict[str, Any]]:
+        """Merge the batch's CRM operations with the planner; no notifications are sent.
+
+        The timeout only bounds the wait for a slot. Once sent, the planned
+        writes can't be called back, so they keep their slot until they finish
+        and the response reports what they actually did.
+        """
+        self._admit()
+        started = False
+        try:
+            parsed = await asyncio.to_thread(self.orchestrator.resolve_many, queries)
+            await asyncio.wait_for(self._slots.acquire(), self.request_timeout)
+            started = True
+        except asyncio.TimeoutError:
+            self._stats["timed_out"] += 1
+            raise HTTPError(504, f"Timed out after {self.request_timeout}s")
+        finally:
+            if not started:
+                self._admitted -= 1
+                self._stats["queries"] += len(queries)
+        work = asyncio.to_thread(self.orchestrator.hubspot_agent.run_batch, parsed, dry_run)
+        result = await self._hold_slot(work, len(queries))
+        return 200, {"dry_run": dry_run, "result": result}
+
+    async def _status(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        status: Dict[str, Any] = {
+            "status": "ok",
+            "uptime_seconds": round(time.monotonic() - self.started_at, 1),
+            "running": self._running,
+            "queued": self._admitted - self._running,
+            "limits": {"concurrency": self.max_concurrency, "queue": self.max_queue,
+                       "timeout_seconds": self.request_timeout, "batch": self.max_batch},
+            "counters": dict(self._stats),
+        }
+        hubspot = self.orchestrator.hubspot_agent._async_hubspot_tools
+        if hubspot is not None:
+            status["hubspot"] = {"rate_limit": hubspot.get_rate_limit_stats(), "cache": hubspot.get_cache_stats()}
+        status["smtp"] = self.orchestrator.email_agent.email_tools.get_pool_stats()
+        return 200, status
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_head(reader), HEADER_TIMEOUT)
+                    if request is None:
+                        break
+                    method, path, headers, keep_alive = request
+                    body = await self._read_body(reader, headers)
+                    status, payload = await self._dispatch(method, path, body)
+                    extra = {}
+                except HTTPError as e:
+                    status, payload, extra, keep_alive = e.status, {"error": str(e)}, e.headers, False
+                await self._respond(writer, status, payload, extra, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> Optional[Tuple[str, str, Dict[str, str], bool]]:
+        line = await reader.readline()
+        if not line.strip():
+            return None
+        try:
+            method, target, version = line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+        headers = {}
+        while True:
+            header = await reader.readline()
+            if header in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection == 'keep-alive' if version == 'HTTP/1.0' else connection != 'close'
+        return method.upper(), urlsplit(target).path, headers, keep_alive
+
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length < 0:
+            raise HTTPError(400, "Invalid Content-Length")
+        if length > self.max_body:
+            raise HTTPError(413, f"Request body over {self.max_body} bytes")
+        if not length:
+            return {}
+        try:
+            data = await asyncio.wait_for(reader.readexactly(length), BODY_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPError(408, f"Request body not received within {BODY_TIMEOUT}s")
+        try:
+            body = json.loads(data)
+        except ValueError:
+            raise HTTPError(400, "Request body is not valid JSON")
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    async def _dispatch(self, method: str, path: str, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        self._stats["requests"] += 1
+        handler = self._routes.get((method, path))
+        if handler is None:
+            if any(route_path == path for _, route_path in self._routes):
+                raise HTTPError(405, f"{method} not allowed on {path}")
+            raise HTTPError(404, f"No endpoint at {path}")
+        try:
+            return await handler(body)
+        except HTTPError:
+            raise
+        except Exception as e:
+            # A failing handler still gets a JSON answer rather than a dropped connection
+            self._stats["errors"] += 1
+            print(f"❌ Error handling {method} {path}: {e!r}")
+            raise HTTPError(500, f"Internal server error: {e}")
+
+    async def _respond(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any],
+                       headers: Dict[str, str], keep_alive: bool):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+
+
+async def serve(args):
+    async with QueryServer(host=args.host, port=args.port, max_concurrency=args.concurrency,
+                           max_queue=args.queue, request_timeout=args.timeout,
+                           max_batch=args.max_batch) as server:
+        print(f"🌐 Serving on http://{server.host}:{server.port} "
+              f"({server.max_concurrency} concurrent, {server.max_queue} queued)")
+        await server.server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API for the HubSpot automation agent")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=8, help="queries processed at once")
+    parser.add_argument("--queue", type=int, default=64, help="queries waiting for a slot before 429s")
+    parser.add_argument("--timeout", type=float, default=30.0, help="seconds per query, queueing included")
+    parser.add_argument("--max-batch", type=int, default=100, help="queries accepted per /batch request")
+    args = parser.parse_args(argv)
+
+    print("🤖 HubSpot Agent API")
+    print("=" * 40)
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,15 @@
 import streamlit as st
 import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from agents.orchestrator import GlobalOrchestrator
 
+# Queries run at once across every browser session of this app server
+QUERY_WORKERS = 8
+# Seconds between checks on a running query
+POLL_INTERVAL = 0.3
+
 # Page configuration
 st.set_page_config(
     page_title="HubSpot AI Agent",
@@ -106,6 +113,19 @@ def load_api_config():
     except:
         return None
 
+@st.cache_resource
+def get_orchestrator():
+    """One orchestrator per server process, so every session shares its pools, caches and LLM client.
+    
+    Config edits are picked up by the shared hot-reloading config, so it is never rebuilt.
+    """
+    return GlobalOrchestrator()
+
+@st.cache_resource
+def get_executor():
+    """Background workers shared by all sessions; a running query never blocks a session's script"""
+    return ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="agent-query")
+
 def initialize_system():
     """Initialize the AI system"""
     try:
@@ -113,11 +133,32 @@ def initialize_system():
         if not os.path.exists("config/api_config.json"):
             return None, "Please configure your API keys first"
         
-        orchestrator = GlobalOrchestrator()
-        return orchestrator, None
+        return get_orchestrator(), None
     except Exception as e:
         return None, str(e)
 
+def submit_query(query):
+    """Queue a query on the shared executor; its progress steps are shown while it runs"""
+    st.session_state.messages.append({"role": "user", "content": query})
+    progress = []
+    future = get_executor().submit(st.session_state.orchestrator.process_query, query, progress.append)
+    st.session_state.pending = {"future": future, "progress": progress}
+
+def collect_pending():
+    """Move a finished query's result into the chat; returns True while one is still running"""
+    pending = st.session_state.pending
+    if pending is None:
+        return False
+    if not pending["future"].done():
+        return True
+    try:
+        result = pending["future"].result()
+    except Exception as e:
+        result = f"❌ Error: {str(e)}"
+    st.session_state.messages.append({"role": "assistant", "content": result})
+    st.session_state.pending = None
+    return False
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🤖 HubSpot AI Automation Agent</h1>', unsafe_allow_html=True)
@@ -129,6 +170,9 @@ def main():
         st.session_state.config_saved = False
     if 'orchestrator' not in st.session_state:
         st.session_state.orchestrator, st.session_state.system_error = initialize_system()
+    if 'pending' not in st.session_state:
+        st.session_state.pending = None
+    busy = collect_pending()
     
     # Sidebar - API Configuration
     with st.sidebar:
@@ -250,6 +294,12 @@ def main():
                     else:
                         st.markdown(f'<div class="chat-message bot-message"><strong>AI Agent:</strong> {message["content"]}</div>', unsafe_allow_html=True)
             
+            # Steps reported so far by the query running in the background
+            if busy:
+                with st.status("🔄 Processing your request...", expanded=True):
+                    for step in list(st.session_state.pending["progress"]):
+                        st.write(step)
+            
             # Enabled chat input
             user_input = st.text_input(
                 "Type your command:",
@@ -259,25 +309,12 @@ def main():
             
             col_btn1, col_btn2 = st.columns([3, 1])
             with col_btn1:
-                if st.button("Send", type="primary", use_container_width=True) and user_input:
-                    # Add user message to chat
-                    st.session_state.messages.append({"role": "user", "content": user_input})
-                    
-                    # Process the request
-                    with st.spinner("🔄 Processing your request..."):
-                        try:
-                            result = st.session_state.orchestrator.process_query(user_input)
-                            st.session_state.messages.append({"role": "assistant", "content": result})
-                        except Exception as e:
-                            st.session_state.messages.append({
-                                "role": "assistant", 
-                                "content": f"❌ Error: {str(e)}"
-                            })
-                    
+                if st.button("Send", type="primary", use_container_width=True, disabled=busy) and user_input:
+                    submit_query(user_input)
                     st.rerun()
             
             with col_btn2:
-                if st.button("Clear Chat", use_container_width=True):
+                if st.button("Clear Chat", use_container_width=True, disabled=busy):
                     st.session_state.messages = []
                     st.rerun()
     
@@ -287,6 +324,7 @@ def main():
         # System Test
         if st.button("🔄 Test System", use_container_width=True):
             with st.spinner("Testing system..."):
+                # Checks the shared orchestrator rather than building another one
                 orchestrator, error = initialize_system()
                 if error:
                     st.error(f"❌ System Error: {error}")
@@ -303,18 +341,9 @@ def main():
         ]
         
         for example in examples:
-            if st.button(example, key=example, use_container_width=True, disabled=not system_ready):
+            if st.button(example, key=example, use_container_width=True, disabled=not system_ready or busy):
                 if st.session_state.orchestrator:
-                    st.session_state.messages.append({"role": "user", "content": example})
-                    with st.spinner("Processing..."):
-                        try:
-                            result = st.session_state.orchestrator.process_query(example)
-                            st.session_state.messages.append({"role": "assistant", "content": result})
-                        except Exception as e:
-                            st.session_state.messages.append({
-                                "role": "assistant", 
-                                "content": f"❌ Error: {str(e)}"
-                            })
+                    submit_query(example)
                     st.rerun()
                 else:
                     st.error("Please configure API keys first")
@@ -334,6 +363,11 @@ def main():
             st.write(f"💬 Messages: {user_msgs}")
         else:
             st.write("💬 Messages: 0")
+    
+    # Poll the running query without holding a worker; other sessions keep being served
+    if busy:
+        time.sleep(POLL_INTERVAL)
+        st.rerun()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+End-to-end throughput and latency benchmark for GlobalOrchestrator
+
+Drives a seeded mix of create/update/find/delete/deal queries through
+process_query (threads), aprocess_query (asyncio) or the main.py REPL
+(subprocess fed on stdin), against the local fake HubSpot and SMTP servers.
+Reports throughput, p50/p95/p99 latency, HubSpot calls and emails per query
+and peak RSS, and compares the run to a saved baseline:
+
+    python -m benchmarks.orchestrator_bench --queries 500 --concurrency 8 --save-baseline
+    python -m benchmarks.orchestrator_bench --queries 500 --concurrency 8   # exits 1 on regression
+
+Absolute throughput, latency and memory depend on the machine, so that
+comparison is only meaningful against a baseline recorded on the same host.
+With --check (for CI) only hardware-independent metrics are compared (HubSpot
+calls and emails per query, and the p95/p50 latency ratio), and a scenario
+with no committed baseline fails. Baselines are committed for sync-c1,
+sync-c8, async-c1, async-c8 and repl-c1 at the default 200 queries.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from agents.query_result import result_failed
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_smtp import FakeSMTPServer
+from utils.config_loader import CONFIG_PATH_ENV
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+
+# Share of each operation in the generated workload
+QUERY_MIX = {
+    "create_contact": 0.30,
+    "update_contact": 0.20,
+    "search_contact": 0.30,
+    "delete_contact": 0.10,
+    "create_deal": 0.10,
+}
+FIRST_NAMES = ["Ava", "Ben", "Cara", "Dev", "Eli", "Fay", "Gus", "Hana", "Ivan", "Jade"]
+LAST_NAMES = ["Stone", "Rivera", "Okafor", "Nguyen", "Schmidt", "Patel", "Kim", "Moreau"]
+
+# Metric -> True when a higher value is better
+COMPARED_METRICS = {
+    "throughput_qps": True,
+    "p95_ms": False,
+    "api_calls_per_query": False,
+    "peak_rss_mb": False,
+}
+# Compared by --check: the same on any hardware, unlike req/s or milliseconds
+PORTABLE_METRICS = {
+    "api_calls_per_query": False,
+    "emails_per_query": False,
+    "p95_over_p50": False,
+}
+
+
+def build_workload(count: int, seeded_emails: List[str], seed: int = 0) -> List[Tuple[str, str]]:
+    """Return (operation, query) pairs; updates, finds and deletes target pre-seeded contacts"""
+    rng = random.Random(seed)
+    live = list(seeded_emails)
+    operations, weights = zip(*QUERY_MIX.items())
+    workload = []
+    for i in range(count):
+        operation = rng.choices(operations, weights)[0]
+        if operation in ("update_contact", "search_contact", "delete_contact") and not live:
+            operation = "create_contact"
+        if operation == "create_contact":
+            query = (f"Create a new contact for new{i}@bench.example.com with first name "
+                     f"{rng.choice(FIRST_NAMES)} and last name {rng.choice(LAST_NAMES)}")
+            if rng.random() < 0.5:
+                query += f" and phone 555{rng.randint(1000000, 9999999)}"
+        elif operation == "update_contact":
+            query = f"Update contact {rng.choice(live)} phone number to 555-{rng.randint(1000, 9999)}"
+        elif operation == "search_contact":
+            query = f"Find contact with email {rng.choice(live)}"
+        elif operation == "delete_contact":
+            # Each seeded contact is deleted at most once so concurrent queries never race
+            query = f"Delete contact {live.pop(rng.randrange(len(live)))}"
+        else:
+            query = f"Create a deal for Account {FIRST_NAMES[i % len(FIRST_NAMES)]}, amount ${rng.randint(1, 500) * 100}, owner sales@bench.example.com"
+        workload.append((operation, query))
+    return workload
+
+
+def write_config(path: str, hubspot_url: str, smtp: FakeSMTPServer, outbox_path: str, **hubspot_settings) -> str:
+    hubspot = {"api_key": "pat-bench", "base_url": hubspot_url, "requests_per_10s": 100000}
+    hubspot.update(hubspot_settings)
+    config = {
+        "openai": {"api_key": "sk-bench", "model": "gpt-4o-mini"},
+        "hubspot": hubspot,
+        "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False,
+                  "email": "bench@bench.example.com", "password": "bench", "outbox_path": outbox_path,
+                  "digest_window": 30},
+    }
+    with open(path, 'w') as file:
+        json.dump(config, file)
+    return path
+
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def _run_threads(orchestrator, queries: List[str], concurrency: int) -> List[Tuple[float, str]]:
+    def timed(query: str) -> Tuple[float, str]:
+        started = time.perf_counter()
+        result = orchestrator.process_query(query)
+        return time.perf_counter() - started, result
+
+    if concurrency <= 1:
+        return [timed(query) for query in queries]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(timed, queries))
+
+
+def _run_async(orchestrator, queries: List[str], concurrency: int) -> List[Tuple[float, str]]:
+    async def scenario():
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def timed(query: str) -> Tuple[float, str]:
+            async with semaphore:
+                started = time.perf_counter()
+                result = await orchestrator.aprocess_query(query)
+                return time.perf_counter() - started, result
+
+        try:
+            return await asyncio.gather(*(timed(query) for query in queries))
+        finally:
+            if orchestrator.hubspot_agent._async_hubspot_tools is not None:
+                await orchestrator.hubspot_agent._async_hubspot_tools.aclose()
+
+    return asyncio.run(scenario())
+
+
+def _run_repl(config_path: str, queries: List[str]) -> Dict[str, Any]:
+    """Feed every query to main.py on stdin; only whole-run timing is observable"""
+    env = dict(os.environ, **{CONFIG_PATH_ENV: config_path})
+    script = "\n".join(queries + ["quit"]) + "\n"
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, os.path.join(ROOT, "main.py")], input=script, text=True,
+                               capture_output=True, cwd=ROOT, env=env)
+    elapsed = time.perf_counter() - started
+    return {"elapsed": elapsed, "results": completed.stdout.count("✅ Result:"),
+            "failed": completed.stdout.count("❌"), "returncode": completed.returncode}
+
+
+def run_benchmark(queries: int = 200, mode: str = 'sync', concurrency: int = 1, seed_contacts: int = 200,
+                  hubspot_latency: Optional[str] = None, smtp_latency: Optional[str] = None,
+                  seed: int = 0, **hubspot_settings) -> Dict[str, Any]:
+    """Run one benchmark scenario and return its metrics"""
+    if mode == 'repl':
+        concurrency = 1
+    with FakeHubSpotServer(latency=hubspot_latency, seed=seed) as hubspot, \
+            FakeSMTPServer(latency=smtp_latency, seed=seed) as smtp, \
+            tempfile.TemporaryDirectory() as directory:
+        config_path = write_config(os.path.join(directory, "api_config.json"), hubspot.base_url, smtp,
+                                   os.path.join(directory, "outbox.db"), **hubspot_settings)
+        previous = os.environ.get(CONFIG_PATH_ENV)
+        os.environ[CONFIG_PATH_ENV] = config_path
+        try:
+            from agents.orchestrator import GlobalOrchestrator
+            from tools.hubspot_tools import HubSpotTools
+
+            seeded = [f"seed{i}@bench.example.com" for i in range(seed_contacts)]
+            HubSpotTools().upsert_contacts_batch({"email": email, "firstname": "Seed"} for email in seeded)
+            workload = build_workload(queries, seeded, seed)
+            texts = [query for _, query in workload]
+            hubspot.reset_stats()
+            smtp.reset_stats()
+
+            started = time.perf_counter()
+            timings = []
+            outbox_stats = {}
+            if mode == 'repl':
+                repl = _run_repl(config_path, texts)
+                elapsed, failed = repl["elapsed"], repl["failed"]
+                startup = None
+                drain = None
+            else:
+                with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                    orchestrator = GlobalOrchestrator()
+                    startup = time.perf_counter() - started
+                    started = time.perf_counter()
+                    if mode == 'async':
+                        outcomes = _run_async(orchestrator, texts, concurrency)
+                    else:
+                        outcomes = _run_threads(orchestrator, texts, concurrency)
+                    elapsed = time.perf_counter() - started
+                    # Notifications leave through the outbox after the query returns
+                    drain_started = time.perf_counter()
+                    orchestrator.email_agent.flush_notifications(timeout=60)
+                    drain = time.perf_counter() - drain_started
+                    if orchestrator.email_agent.outbox is not None:
+                        outbox_stats = orchestrator.email_agent.outbox.get_stats()
+                        orchestrator.email_agent.outbox.close()
+                timings = [duration for duration, _ in outcomes]
+                failed = sum(1 for _, result in outcomes if result_failed(result))
+        finally:
+            if previous is None:
+                os.environ.pop(CONFIG_PATH_ENV, None)
+            else:
+                os.environ[CONFIG_PATH_ENV] = previous
+        hubspot_stats = hubspot.get_stats()
+        smtp_stats = smtp.get_stats()
+
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN if mode == 'repl' else resource.RUSAGE_SELF)
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak_rss_mb = usage.ru_maxrss / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+    def ms(value: Optional[float]) -> Optional[float]:
+        return None if value is None else round(value * 1000, 2)
+
+    p50, p95 = percentile(timings, 0.50), percentile(timings, 0.95)
+
+    return {
+        "scenario": f"{mode}-c{concurrency}",
+        "mode": mode,
+        "concurrency": concurrency,
+        "queries": queries,
+        "failed": failed,
+        "elapsed_seconds": round(elapsed, 3),
+        "startup_seconds": None if startup is None else round(startup, 3),
+        "throughput_qps": round(queries / elapsed, 2) if elapsed else None,
+        "p50_ms": ms(p50),
+        "p95_ms": ms(p95),
+        "p95_over_p50": round(p95 / p50, 3) if p50 and p95 is not None else None,
+        "p99_ms": ms(percentile(timings, 0.99)),
+        "mean_ms": ms(sum(timings) / len(timings)) if timings else None,
+        "api_calls_per_query": round(hubspot_stats["requests"] / queries, 3) if queries else None,
+        "api_calls_by_endpoint": hubspot_stats["by_endpoint"],
+        "emails_per_query": round(smtp_stats["messages"] / queries, 3) if queries else None,
+        "smtp_connections": smtp_stats["connections"],
+        "outbox_drain_seconds": None if drain is None else round(drain, 3),
+        "email_delivery_p50_ms": ms(outbox_stats.get("delivery_latency_p50")),
+        "email_delivery_p95_ms": ms(outbox_stats.get("delivery_latency_p95")),
+        "peak_rss_mb": round(peak_rss_mb, 1),
+        "operations": {operation: sum(1 for kind, _ in workload if kind == operation) for operation in QUERY_MIX},
+    }
+
+
+def compare_to_baseline(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                        metrics: Optional[Dict[str, bool]] = None) -> List[str]:
+    """Describe every metric that is worse than the baseline by more than tolerance"""
+    regressions = []
+    for metric, higher_is_better in (metrics or COMPARED_METRICS).items():
+        current, expected = result.get(metric), baseline.get(metric)
+        if current is None or not expected:
+            continue
+        if higher_is_better and current < expected * (1 - tolerance):
+            regressions.append(f"{metric} dropped from {expected} to {current}")
+        elif not higher_is_better and current > expected * (1 + tolerance):
+            regressions.append(f"{metric} rose from {expected} to {current}")
+    if result.get("failed", 0) > baseline.get("failed", 0):
+        regressions.append(f"failed queries rose from {baseline.get('failed', 0)} to {result['failed']}")
+    return regressions
+
+
+def load_baselines(path: str) -> Dict[str, Any]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def save_baseline(path: str, result: Dict[str, Any]):
+    baselines = load_baselines(path)
+    baselines[result["scenario"]] = result
+    with open(path, 'w') as file:
+        json.dump(baselines, file, indent=2, sort_keys=True)
+
+
+def print_report(result: Dict[str, Any]):
+    print(f"📊 {result['scenario']}: {result['queries']} queries in {result['elapsed_seconds']}s "
+          f"({result['failed']} failed)")
+    print(f"   Throughput:     {result['throughput_qps']} queries/s")
+    if result["p50_ms"] is not None:
+        print(f"   Latency:        p50 {result['p50_ms']} ms, p95 {result['p95_ms']} ms, p99 {result['p99_ms']} ms")
+    if result["startup_seconds"] is not None:
+        print(f"   Startup:        {result['startup_seconds']}s")
+    print(f"   HubSpot calls:  {result['api_calls_per_query']} per query")
+    for endpoint, count in sorted(result["api_calls_by_endpoint"].items(), key=lambda item: -item[1]):
+        print(f"      {count:6d}  {endpoint}")
+    print(f"   Emails:         {result['emails_per_query']} per query over {result['smtp_connections']} SMTP connections")
+    if result["email_delivery_p50_ms"] is not None:
+        print(f"   Email delivery: p50 {result['email_delivery_p50_ms']} ms, p95 {result['email_delivery_p95_ms']} ms "
+              f"after queueing; outbox drained {result['outbox_drain_seconds']}s after the last query")
+    print(f"   Peak RSS:       {result['peak_rss_mb']} MB")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GlobalOrchestrator against local HubSpot/SMTP stand-ins")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--mode", choices=["sync", "async", "repl"], default="sync")
+    parser.add_argument("--concurrency", type=int, default=1, help="worker threads or concurrent coroutines")
+    parser.add_argument("--seed-contacts", type=int, default=200, help="contacts created before timing starts")
+    parser.add_argument("--hubspot-latency", default="lognormal:0.02:0.4",
+                        help="fake HubSpot latency: constant:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+    parser.add_argument("--smtp-latency", default="constant:0.002", help="fake SMTP per-command latency")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the scenario's baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown before failing")
+    parser.add_argument("--check", action="store_true",
+                        help="compare only hardware-independent metrics, and fail when the scenario has no baseline")
+    parser.add_argument("--output", help="also write the raw results to this JSON file")
+    args = parser.parse_args(argv)
+
+    result = run_benchmark(args.queries, args.mode, args.concurrency, args.seed_contacts,
+                           args.hubspot_latency, args.smtp_latency, args.seed)
+    print_report(result)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, result)
+        print(f"💾 Saved baseline for {result['scenario']} to {args.baseline}")
+        return 0
+
+    baseline = load_baselines(args.baseline).get(result["scenario"])
+    if baseline is None:
+        if args.check:
+            print(f"❌ No baseline for {result['scenario']} in {args.baseline}; record one with --save-baseline")
+            return 1
+        print(f"💡 No baseline for {result['scenario']}; run again with --save-baseline")
+        return 0
+    if baseline.get("queries") != result["queries"]:
+        print(f"⚠️ Baseline used {baseline.get('queries')} queries; comparison may be noisy")
+    regressions = compare_to_baseline(result, baseline, args.tolerance, PORTABLE_METRICS if args.check else None)
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    if not regressions:
+        print(f"✅ Within {int(args.tolerance * 100)}% of baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Query-parse micro-benchmark: how fast the front end turns text into a ParsedQuery
+
+Parses the orchestrator benchmark's query mix with the cache bypassed (every
+query tokenized, classified and extracted from scratch) and again through the
+lru_cache with a warm cache (repeated queries, e.g. retries or batch files),
+and compares to a saved baseline:
+
+    python -m benchmarks.parser_bench --queries 20000 --save-baseline
+    python -m benchmarks.parser_bench --queries 20000      # exits 1 on regression
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, Any
+
+from agents.query_parser import parse_query
+from benchmarks.orchestrator_bench import DEFAULT_BASELINE, build_workload, compare_to_baseline, load_baselines, save_baseline
+
+# Metric -> True when a higher value is better
+COMPARED_METRICS = {
+    "uncached_us_per_query": False,
+    "parses_per_second": True,
+}
+
+
+def run_parser(queries: int = 20000, repeats: int = 3, seed: int = 0) -> Dict[str, Any]:
+    """Best-of-repeats parse time per query, uncached and cached"""
+    corpus = [query for _, query in build_workload(queries, [f"seed{i}@bench.example" for i in range(200)], seed)]
+    parse_uncached = parse_query.__wrapped__
+
+    warm = corpus[:parse_query.cache_info().maxsize]
+    parse_query.cache_clear()
+    for query in warm:
+        parse_query(query)
+
+    uncached, cached = [], []
+    for _ in range(max(repeats, 1)):
+        started = time.perf_counter()
+        for query in corpus:
+            parse_uncached(query)
+        uncached.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        for query in warm:
+            parse_query(query)
+        cached.append(time.perf_counter() - started)
+
+    best_uncached = min(uncached)
+    return {
+        "scenario": "parser",
+        "queries": len(corpus),
+        "uncached_us_per_query": round(best_uncached / len(corpus) * 1e6, 2),
+        "cached_us_per_query": round(min(cached) / len(warm) * 1e6, 2),
+        "parses_per_second": round(len(corpus) / best_uncached, 1),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure query parse throughput")
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    result = run_parser(args.queries, args.repeats, args.seed)
+    print(f"🧩 Parsed {result['queries']} queries: {result['uncached_us_per_query']} µs/query uncached "
+          f"({result['parses_per_second']}/s), {result['cached_us_per_query']} µs/query cached")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, result)
+        print(f"💾 Saved parser baseline to {args.baseline}")
+        return 0
+    baseline = load_baselines(args.baseline).get("parser")
+    if baseline is None:
+        print("💡 No parser baseline; run again with --save-baseline")
+        return 0
+    regressions = compare_to_baseline(result, baseline, args.tolerance, COMPARED_METRICS)
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    if not regressions:
+        print(f"✅ Within {int(args.tolerance * 100)}% of baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
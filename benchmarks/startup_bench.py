@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark: how long until a GlobalOrchestrator is ready
+
+Starts fresh interpreters that import and build the orchestrator (offline,
+against a throwaway config), reports the median wall time and the slowest
+imports from python -X importtime, and compares to a saved baseline:
+
+    python -m benchmarks.startup_bench --runs 5 --save-baseline
+    python -m benchmarks.startup_bench --runs 5 --top 15      # exits 1 on regression
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from typing import Dict, Any, List, Tuple
+
+from benchmarks.orchestrator_bench import ROOT, DEFAULT_BASELINE, compare_to_baseline, load_baselines, save_baseline
+from utils.config_loader import CONFIG_PATH_ENV
+
+# Metric -> True when a higher value is better
+COMPARED_METRICS = {
+    "cold_start_ms": False,
+    "import_ms": False,
+}
+STARTUP_SCRIPT = (
+    "import time; started = time.perf_counter(); "
+    "from agents.orchestrator import GlobalOrchestrator; imported = time.perf_counter(); "
+    "GlobalOrchestrator(); ready = time.perf_counter(); "
+    "print(f'{(imported - started) * 1000:.2f} {(ready - started) * 1000:.2f}')"
+)
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) rows from -X importtime output"""
+    rows = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            rows.append((match.group(4), int(match.group(1)), int(match.group(2)), len(match.group(3)) // 2))
+    return rows
+
+
+def run_startup(runs: int = 5, top: int = 10) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = os.path.join(directory, "api_config.json")
+        with open(config_path, 'w') as file:
+            json.dump({
+                "openai": {"api_key": "sk-bench"},
+                "hubspot": {"api_key": "pat-bench", "base_url": "http://127.0.0.1:9"},
+                "email": {"outbox_path": os.path.join(directory, "outbox.db")},
+            }, file)
+        env = dict(os.environ, **{CONFIG_PATH_ENV: config_path})
+
+        imports, totals = [], []
+        slowest: Dict[str, int] = {}
+        for run in range(runs):
+            command = [sys.executable, "-c", STARTUP_SCRIPT]
+            if run == 0:
+                command[1:1] = ["-X", "importtime"]
+            completed = subprocess.run(command, capture_output=True, text=True, cwd=ROOT, env=env)
+            if completed.returncode != 0:
+                raise Exception(f"Startup failed: {completed.stderr.strip().splitlines()[-1:]}")
+            if run == 0:
+                # importtime itself slows the run, so it only feeds the per-package breakdown
+                for module, _, cumulative, _ in parse_importtime(completed.stderr):
+                    package = module.split('.')[0]
+                    slowest[package] = max(slowest.get(package, 0), cumulative)
+                continue
+            imported_ms, ready_ms = (float(value) for value in completed.stdout.split()[-2:])
+            imports.append(imported_ms)
+            totals.append(ready_ms)
+
+    return {
+        "scenario": "startup",
+        "runs": len(totals),
+        "import_ms": round(statistics.median(imports), 2) if imports else None,
+        "cold_start_ms": round(statistics.median(totals), 2) if totals else None,
+        "slowest_imports_ms": {module: round(us / 1000, 1) for module, us in
+                               sorted(slowest.items(), key=lambda item: -item[1])[:top]},
+        "langchain_loaded_at_startup": any(module.startswith("langchain") for module in slowest),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Measure GlobalOrchestrator cold start")
+    parser.add_argument("--runs", type=int, default=5, help="timed interpreter starts (plus one importtime run)")
+    parser.add_argument("--top", type=int, default=10, help="slowest top-level packages to list")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    result = run_startup(max(args.runs, 1) + 1, args.top)
+    print(f"🚀 Cold start: {result['cold_start_ms']} ms (imports {result['import_ms']} ms), "
+          f"median of {result['runs']} runs")
+    if result["langchain_loaded_at_startup"]:
+        print("⚠️ langchain is imported at startup; it should load on first LLM use")
+    print("   Slowest packages (cumulative import time):")
+    for module, elapsed in result["slowest_imports_ms"].items():
+        print(f"      {elapsed:8.1f} ms  {module}")
+
+    if args.save_baseline:
+        save_baseline(args.baseline, result)
+        print(f"💾 Saved startup baseline to {args.baseline}")
+        return 0
+    baseline = load_baselines(args.baseline).get("startup")
+    if baseline is None:
+        print("💡 No startup baseline; run again with --save-baseline")
+        return 0
+    regressions = compare_to_baseline(result, baseline, args.tolerance, COMPARED_METRICS)
+    if result["langchain_loaded_at_startup"] and not baseline.get("langchain_loaded_at_startup"):
+        regressions.append("langchain is imported at startup again")
+    for regression in regressions:
+        print(f"❌ Regression: {regression}")
+    if not regressions:
+        print(f"✅ Within {int(args.tolerance * 100)}% of baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
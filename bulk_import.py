@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Stream a CSV or JSONL file into HubSpot through the batch endpoints
+
+Examples:
+    python bulk_import.py contacts.csv
+    python bulk_import.py contacts.csv --map "Mobile=phone" --map "Notes="
+    python bulk_import.py deals.jsonl --object deals --mode create
+"""
+
+import argparse
+import sys
+
+
+def parse_mapping(pairs):
+    """Parse repeated COLUMN=property options; an empty property drops the column"""
+    mapping = {}
+    for pair in pairs or []:
+        if '=' not in pair:
+            raise argparse.ArgumentTypeError(f"Invalid mapping '{pair}', expected COLUMN=property")
+        column, target = pair.split('=', 1)
+        mapping[column.strip()] = target.strip()
+    return mapping
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import contacts or deals into HubSpot")
+    parser.add_argument("path", help="CSV or JSONL file to import")
+    parser.add_argument("--object", choices=["contacts", "deals"], default="contacts")
+    parser.add_argument("--mode", choices=["upsert", "create"], default="upsert",
+                        help="upsert contacts by email (safe to resume) or create new records")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="defaults to the file extension")
+    parser.add_argument("--map", action="append", metavar="COLUMN=property",
+                        help="map a source column to a HubSpot property (repeatable)")
+    parser.add_argument("--window", type=int, default=1000, help="rows committed per checkpoint")
+    parser.add_argument("--checkpoint", help="checkpoint file (default: <path>.checkpoint.json)")
+    parser.add_argument("--errors", help="failed rows as JSONL (default: <path>.errors.jsonl)")
+    parser.add_argument("--restart", action="store_true", help="ignore an existing checkpoint")
+    args = parser.parse_args(argv)
+
+    if args.object == "deals" and args.mode != "create":
+        parser.error("deals can only be imported with --mode create")
+
+    from tools.hubspot_tools import HubSpotTools
+    from tools.bulk_importer import BulkImporter
+
+    print("🤖 HubSpot Bulk Import")
+    print("=" * 40)
+    try:
+        importer = BulkImporter(
+            HubSpotTools(),
+            object_type=args.object,
+            mode=args.mode,
+            mapping=parse_mapping(args.map),
+            window_size=args.window,
+            checkpoint_path=args.checkpoint or f"{args.path}.checkpoint.json",
+            error_path=args.errors or f"{args.path}.errors.jsonl"
+        )
+        stats = importer.run(args.path, file_format=args.format, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted - run the same command again to resume from the checkpoint")
+        return 130
+    except Exception as e:
+        print(f"❌ Import failed: {e}")
+        return 1
+
+    print(f"\n🎉 Done: {stats['succeeded']} imported, {stats['failed']} failed in {stats['elapsed_seconds']}s")
+    return 0 if stats["failed"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
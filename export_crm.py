@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Export HubSpot contacts or deals to JSONL, CSV or Parquet
+
+Examples:
+    python export_crm.py contacts contacts.jsonl
+    python export_crm.py deals deals.csv --properties dealname,amount,dealstage
+    python export_crm.py contacts contacts.parquet --format parquet
+"""
+
+import argparse
+import os
+import sys
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream HubSpot CRM objects to a file")
+    parser.add_argument("object", choices=["contacts", "deals"])
+    parser.add_argument("output", help="file to write")
+    parser.add_argument("--properties", help="comma-separated HubSpot properties to export")
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet"],
+                        help="defaults to the output file extension")
+    parser.add_argument("--state", help="resume state file (default: <output>.state.json)")
+    parser.add_argument("--restart", action="store_true", help="ignore saved state and start over")
+    args = parser.parse_args(argv)
+
+    file_format = args.format or os.path.splitext(args.output)[1].lstrip('.').lower() or 'jsonl'
+    if file_format not in ("jsonl", "csv", "parquet"):
+        parser.error(f"cannot infer format from '{args.output}', pass --format")
+    properties = [name.strip() for name in args.properties.split(',')] if args.properties else None
+
+    from tools.hubspot_tools import HubSpotTools
+    from tools.crm_exporter import CrmExporter
+
+    print(f"🤖 HubSpot Export: {args.object} → {args.output}")
+    print("=" * 40)
+    try:
+        exporter = CrmExporter(HubSpotTools(), args.object, properties,
+                               state_path=args.state or f"{args.output}.state.json")
+        stats = exporter.run(args.output, file_format, resume=not args.restart)
+    except KeyboardInterrupt:
+        print("\n⏸️ Interrupted - run the same command again to resume")
+        return 130
+    except Exception as e:
+        print(f"❌ Export failed: {e}")
+        return 1
+
+    rate = stats["rows"] / stats["elapsed_seconds"] if stats["elapsed_seconds"] else 0
+    print(f"🎉 Exported {stats['rows']} rows to {stats['output']} in {stats['elapsed_seconds']}s ({rate:.0f} rows/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 """
 Main application for AI-powered HubSpot Automation Agent
+
+Examples:
+    python main.py                                   # interactive
+    python main.py --batch queries.txt --workers 8   # one query per line, JSONL results on stdout
+    cat queries.txt | python main.py --batch - --order completion > results.jsonl
 """
 
+import argparse
 import sys
 import os
 import json
+import time
+import importlib.util
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import redirect_stdout
+
+from agents.query_result import result_failed
 
 def check_config():
     """Check if configuration exists and has real API keys"""
-    config_path = "config/api_config.json"
+    config_path = os.environ.get("HUBSPOT_AGENT_CONFIG", "config/api_config.json")
     
     if not os.path.exists(config_path):
         print("❌ Configuration file not found!")
-        print("💡 Please create config/api_config.json with your API keys")
+        print(f"💡 Please create {config_path} with your API keys")
         return False
     
     try:
@@ -44,11 +57,11 @@ def check_config():
 def test_imports():
     """Test if all required imports work"""
     try:
-        from langchain_openai import ChatOpenAI
-        print("✅ langchain_openai import successful")
-        
-        from langchain_core.prompts import ChatPromptTemplate
-        print("✅ langchain_core.prompts import successful")
+        # Only check that langchain is installed; importing it costs ~2s and agents load it on first use
+        for module in ('langchain_openai', 'langchain_core'):
+            if importlib.util.find_spec(module) is None:
+                raise ImportError(f"No module named '{module}'")
+            print(f"✅ {module} available")
         
         import smtplib
         print("✅ smtplib import successful")
@@ -74,7 +87,129 @@ def test_imports():
         print(f"❌ Error during import test: {e}")
         return False
 
-def main():
+def read_queries(path):
+    """Non-blank lines of a file, or of stdin for '-', read as they are consumed.
+
+    The file is opened here, so a missing file fails at once rather than on first use.
+    """
+    source = sys.stdin if path == '-' else open(path, 'r')
+    return _lines(source)
+
+def _lines(source):
+    try:
+        for line in source:
+            if line.strip():
+                yield line.strip()
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+def run_queries(orchestrator, queries, workers=4, ordered=True):
+    """Run queries on a thread pool and yield one record per query.
+
+    Records come in input order when ordered, otherwise as they finish. At most
+    a few tasks per worker are queued at a time, so long files stream instead
+    of piling up pending results. Queries are parsed a window at a time, so
+    the ones that need the LLM fallback share packed extraction calls.
+    """
+    def run(index, query, parsed):
+        started = time.perf_counter()
+        record = {"index": index, "query": query}
+        try:
+            result = orchestrator.process_query(parsed)
+            record.update(status="failed" if result_failed(result) else "success", result=result)
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        record["seconds"] = round(time.perf_counter() - started, 4)
+        return record
+
+    window = max(1, workers) * 4
+    pending = _resolved(orchestrator, queries, window)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        in_flight = deque(pool.submit(run, *item) for item in _take(pending, window))
+        while in_flight:
+            if ordered:
+                finished = [in_flight.popleft()]
+            else:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                finished = [future for future in in_flight if future in done]
+                for future in finished:
+                    in_flight.remove(future)
+            for future in finished:
+                yield future.result()
+                in_flight.extend(pool.submit(run, *item) for item in _take(pending, 1))
+
+def _resolved(orchestrator, queries, chunk_size):
+    """(index, query, parsed) for each query, parsing chunk_size queries at a time with resolve_many"""
+    numbered = enumerate(queries)
+    while True:
+        chunk = list(_take(numbered, chunk_size))
+        if not chunk:
+            return
+        for (index, query), parsed in zip(chunk, orchestrator.resolve_many([query for _, query in chunk])):
+            yield index, query, parsed
+
+def _take(iterator, count):
+    for _ in range(count):
+        item = next(iterator, None)
+        if item is None:
+            return
+        yield item
+
+def run_batch(args):
+    """Non-interactive mode: JSONL results on stdout, progress and summary on stderr"""
+    output = sys.stdout
+    with redirect_stdout(sys.stderr):
+        if not check_config() or not test_imports():
+            return 1
+        try:
+            queries = read_queries(args.batch)
+        except OSError as e:
+            print(f"❌ Cannot read queries: {e}")
+            return 1
+
+        from agents.orchestrator import GlobalOrchestrator
+        orchestrator = GlobalOrchestrator()
+        print(f"🔄 Running queries from {'stdin' if args.batch == '-' else args.batch} on {args.workers} workers...")
+
+        counts = {"success": 0, "failed": 0, "error": 0}
+        total, unread = 0, None
+        started = time.perf_counter()
+        try:
+            for record in run_queries(orchestrator, queries, args.workers, ordered=args.order == 'input'):
+                total += 1
+                counts[record["status"]] += 1
+                output.write(json.dumps(record, ensure_ascii=False) + "\n")
+                output.flush()
+        except OSError as e:
+            unread = e
+        elapsed = time.perf_counter() - started
+
+        flushed = orchestrator.email_agent.flush_notifications()
+        retries = orchestrator.hubspot_agent.hubspot_tools.get_rate_limit_stats()
+        if unread is not None:
+            print(f"❌ Cannot read queries: {unread}")
+        print(f"📊 {total} queries in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f}/s): "
+              f"{counts['success']} succeeded, {counts['failed']} failed, {counts['error']} errors")
+        print(f"🔁 HubSpot retries: {retries['retries']} ({retries['throttled']} throttled, "
+              f"{retries['gave_up']} gave up)")
+        if not flushed:
+            print("📮 Some notifications are still queued; they will be sent on the next start")
+    if unread is not None:
+        return 1
+    return 0 if counts["failed"] == counts["error"] == 0 else 2
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AI-powered HubSpot Automation Agent")
+    parser.add_argument("--batch", metavar="PATH", help="run the queries in PATH (one per line, '-' for stdin) "
+                                                        "and print JSONL results instead of prompting")
+    parser.add_argument("--workers", type=int, default=4, help="queries run concurrently in batch mode")
+    parser.add_argument("--order", choices=["input", "completion"], default="input",
+                        help="emit batch results in input order or as they finish")
+    args = parser.parse_args(argv)
+    if args.batch:
+        return run_batch(args)
+
     print("🤖 HubSpot AI Automation Agent")
     print("=" * 40)
     
@@ -134,6 +269,10 @@ def main():
             break
         except Exception as e:
             print(f"\n❌ Error: {e}")
+    
+    # Let queued email notifications go out before the process exits
+    if not orchestrator.email_agent.flush_notifications():
+        print("📮 Some notifications are still queued; they will be sent on the next start")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
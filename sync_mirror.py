@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Seed or refresh the local CRM mirror used to answer lookups without the API
+
+Examples:
+    python sync_mirror.py --full            # first run / periodic full refresh
+    python sync_mirror.py                   # delta sync since the last high-water mark
+    python sync_mirror.py --watch 60        # delta sync every 60 seconds
+"""
+
+import argparse
+import sys
+import time
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sync HubSpot objects into the local SQLite mirror")
+    parser.add_argument("--object", choices=["contacts", "deals", "all"], default="contacts")
+    parser.add_argument("--full", action="store_true", help="re-export everything instead of syncing changes "
+                        "(archived records are swept every hubspot.mirror_archive_sweep_interval seconds)")
+    parser.add_argument("--watch", type=float, metavar="SECONDS", help="keep running delta syncs at this interval")
+    parser.add_argument("--db", help="mirror database (default: hubspot.mirror_path or crm_mirror.db)")
+    args = parser.parse_args(argv)
+
+    from utils.config_loader import get_shared_config
+    from tools.hubspot_tools import HubSpotTools
+    from tools.crm_mirror import CrmMirror, ARCHIVE_SWEEP_INTERVAL
+
+    config = get_shared_config()
+    hubspot_tools = HubSpotTools(config)
+    hubspot_config = config.get_hubspot_config()
+    # Resolved like the agent's, so both open the same file whatever the working directory
+    mirror = CrmMirror(args.db or config.resolve_path(hubspot_config.get('mirror_path', 'crm_mirror.db')),
+                       float(hubspot_config.get('mirror_archive_sweep_interval', ARCHIVE_SWEEP_INTERVAL)))
+    object_types = ["contacts", "deals"] if args.object == "all" else [args.object]
+
+    full = args.full
+    while True:
+        for object_type in object_types:
+            started = time.monotonic()
+            try:
+                count = mirror.sync(hubspot_tools, object_type, full=full)
+                print(f"✅ {object_type}: {'seeded' if full else 'synced'} {count} records "
+                      f"in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                print(f"❌ {object_type} sync failed: {e}")
+                if not args.watch:
+                    return 1
+        if not args.watch:
+            return 0
+        full = False
+        try:
+            time.sleep(args.watch)
+        except KeyboardInterrupt:
+            print("\n👋 Stopped")
+            return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Test the HTTP API server: endpoints, shared orchestrator, backpressure and timeouts
+"""
+
+import asyncio
+import json
+import sys
+import time
+
+import httpx
+import pytest
+
+import api_server
+from api_server import QueryServer
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_smtp import FakeSMTPServer
+
+
+def _config(tmp_path, monkeypatch, hubspot, smtp):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test"},
+        "hubspot": {"api_key": f"pat-test-{hubspot.base_url}", "base_url": hubspot.base_url},
+        "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False, "email": "bot@example.com",
+                  "password": "secret", "outbox_enabled": False, "digest_window": 0},
+    }))
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(path))
+
+
+def test_query_batch_and_status_endpoints(tmp_path, monkeypatch):
+    async def scenario():
+        async with QueryServer(port=0) as server:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}") as client:
+                created = await client.post("/query", json={"query": "Create contact ann@x.com with first name Ann"})
+                batch = await client.post("/batch", json={"queries": [
+                    "Update contact ann@x.com phone to 555-0100", "Find contact ghost@x.com"]})
+                planned = await client.post("/batch", json={"plan": True, "dry_run": True, "queries": [
+                    "Create contact bob@y.com", "Update contact bob@y.com phone to 555-0101"]})
+                status = await client.get("/status")
+                errors = [await client.post("/query", content=b"not json"), await client.get("/query"),
+                          await client.get("/nowhere")]
+            return created, batch, planned, status, errors
+
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        _config(tmp_path, monkeypatch, hubspot, smtp)
+        created, batch, planned, status, errors = asyncio.run(scenario())
+
+    assert created.status_code == 200 and created.json()["status"] == "success"
+    assert "Contact created successfully" in created.json()["result"]
+    assert [result["status"] for result in batch.json()["results"]] == ["success", "failed"]
+    assert batch.json()["summary"]["success"] == 1
+    assert planned.json()["result"].startswith("📋 Plan for 2 operations: 1 API calls")
+    counters = status.json()["counters"]
+    assert counters["queries"] == 5 and counters["rejected"] == 0
+    assert status.json()["hubspot"]["rate_limit"]["requests"] > 0
+    assert [response.status_code for response in errors] == [400, 405, 404]
+
+
+def test_full_queue_gets_429_and_slow_queries_time_out(tmp_path, monkeypatch):
+    async def scenario():
+        async with QueryServer(port=0, max_concurrency=1, max_queue=1, request_timeout=0.5) as server:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}", timeout=5) as client:
+                responses = await asyncio.gather(*(client.post("/query", json={"query": f"Find contact u{i}@x.com"})
+                                                   for i in range(5)))
+                server.request_timeout = 0.05
+                slow = await client.post("/query", json={"query": "Find contact slow@x.com"})
+                status = (await client.get("/status")).json()
+            return responses, slow, status
+
+    with FakeHubSpotServer(latency="0.2") as hubspot, FakeSMTPServer() as smtp:
+        _config(tmp_path, monkeypatch, hubspot, smtp)
+        responses, slow, status = asyncio.run(scenario())
+
+    codes = sorted(response.status_code for response in responses)
+    assert codes.count(429) == 3
+    assert responses[[response.status_code for response in responses].index(429)].headers["Retry-After"] == "1"
+    # One query runs ~0.2s; the queued one waits for it and finishes, or times out past 0.5s
+    assert set(codes) <= {200, 429, 504}
+    assert slow.status_code == 504 and slow.json()["status"] == "timeout"
+    assert status["counters"]["rejected"] == 3 and status["running"] == 0 and status["queued"] == 0
+
+
+def test_planned_writes_hold_their_slot_and_report_the_real_outcome(tmp_path, monkeypatch):
+    async def scenario():
+        async with QueryServer(port=0, max_concurrency=1, request_timeout=0.1) as server:
+            run_batch = server.orchestrator.hubspot_agent.run_batch
+
+            def slow_run_batch(*args):
+                time.sleep(0.3)
+                return run_batch(*args)
+
+            monkeypatch.setattr(server.orchestrator.hubspot_agent, "run_batch", slow_run_batch)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}", timeout=5) as client:
+                planned = asyncio.ensure_future(client.post("/batch", json={"plan": True, "queries": [
+                    "Create contact ann@x.com", "Create contact bob@x.com"]}))
+                await asyncio.sleep(0.05)
+                # The writes outlive the timeout, so the only slot is still taken
+                queued = await client.post("/query", json={"query": "Find contact ann@x.com"})
+                planned = await planned
+                status = (await client.get("/status")).json()
+            return planned, queued, status
+
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        _config(tmp_path, monkeypatch, hubspot, smtp)
+        planned, queued, status = asyncio.run(scenario())
+        contacts = hubspot.get_stats()["contacts"]
+
+    assert planned.status_code == 200 and planned.json()["result"].startswith("✅ 2/2 contacts created")
+    assert queued.status_code == 504
+    assert contacts == 2
+    assert status["running"] == 0 and status["queued"] == 0 and status["counters"]["queries"] == 3
+
+
+def test_list_commands_hold_their_slot_until_the_writes_finish(tmp_path, monkeypatch):
+    async def scenario():
+        async with QueryServer(port=0, max_concurrency=1, request_timeout=0.1) as server:
+            handle_many = server.orchestrator.hubspot_agent._handle_many
+
+            def slow_handle_many(parsed):
+                time.sleep(0.3)
+                return handle_many(parsed)
+
+            monkeypatch.setattr(server.orchestrator.hubspot_agent, "_handle_many", slow_handle_many)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}", timeout=5) as client:
+                listed = asyncio.ensure_future(client.post("/query", json={
+                    "query": "Create contacts ann@x.com and bob@x.com"}))
+                await asyncio.sleep(0.05)
+                queued = await client.post("/query", json={"query": "Find contact ann@x.com"})
+                listed = await listed
+                status = (await client.get("/status")).json()
+            return listed, queued, status
+
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        _config(tmp_path, monkeypatch, hubspot, smtp)
+        listed, queued, status = asyncio.run(scenario())
+        contacts = hubspot.get_stats()["contacts"]
+
+    assert listed.status_code == 200 and listed.json()["status"] == "success"
+    assert queued.status_code == 504
+    assert contacts == 2
+    assert status["running"] == 0 and status["queued"] == 0 and status["counters"]["queries"] == 2
+
+
+def test_stalled_and_oversized_bodies_are_refused(tmp_path, monkeypatch):
+    monkeypatch.setattr(api_server, "BODY_TIMEOUT", 0.1)
+
+    async def raw_request(port, head):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(head)
+        await writer.drain()
+        response = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return response.decode()
+
+    async def scenario():
+        async with QueryServer(port=0, max_body=1000) as server:
+            # Announces a body and then never sends it
+            stalled = await raw_request(server.port, b"POST /query HTTP/1.1\r\nContent-Length: 50\r\n\r\n{\"query\"")
+            oversized = await raw_request(server.port, b"POST /query HTTP/1.1\r\nContent-Length: 5000\r\n\r\n")
+            negative = await raw_request(server.port, b"POST /query HTTP/1.1\r\nContent-Length: -1\r\n\r\n")
+        return stalled, oversized, negative
+
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        _config(tmp_path, monkeypatch, hubspot, smtp)
+        stalled, oversized, negative = asyncio.run(scenario())
+
+    assert stalled.startswith("HTTP/1.1 408") and "Request body not received" in stalled
+    assert oversized.startswith("HTTP/1.1 413")
+    assert negative.startswith("HTTP/1.1 400")
+
+
+def test_unexpected_handler_errors_get_a_json_500(tmp_path, monkeypatch):
+    async def scenario():
+        async with QueryServer(port=0) as server:
+            def broken(queries):
+                raise RuntimeError("parser exploded")
+
+            monkeypatch.setattr(server.orchestrator, "resolve_many", broken)
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}") as client:
+                failed = await client.post("/batch", json={"queries": ["Find contact ann@x.com"]})
+                status = (await client.get("/status")).json()
+            return failed, status
+
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        _config(tmp_path, monkeypatch, hubspot, smtp)
+        failed, status = asyncio.run(scenario())
+
+    assert failed.status_code == 500
+    assert failed.json() == {"error": "Internal server error: parser exploded"}
+    assert status["counters"]["errors"] == 1 and status["queued"] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
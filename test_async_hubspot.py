@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Test AsyncHubSpotTools and GlobalOrchestrator.aprocess_query against the fake HubSpot server
+"""
+
+import asyncio
+import json
+import os
+import socket
+
+from tools.async_hubspot_tools import AsyncHubSpotTools
+from tools.fake_hubspot import FakeHubSpotServer
+from utils.config_loader import ConfigLoader
+
+
+def _write_config(path, base_url):
+    config = {
+        "openai": {"api_key": "sk-test", "model": "gpt-4o-mini"},
+        "hubspot": {"api_key": f"pat-test-{base_url}", "base_url": base_url,
+                    "requests_per_10s": 1000, "max_in_flight": 4},
+        "email": {}
+    }
+    path.write_text(json.dumps(config))
+    return str(path)
+
+
+def test_async_contact_roundtrip(tmp_path):
+    server = FakeHubSpotServer().start()
+    config = ConfigLoader(_write_config(tmp_path / "api_config.json", server.base_url))
+
+    async def scenario():
+        async with AsyncHubSpotTools(config) as hubspot:
+            created = await hubspot.create_contact({"email": "Async.User@example.com", "firstname": "Async"})
+            found = await hubspot.search_contact("async.user@example.com")
+            assert found["id"] == created["id"]
+            await hubspot.update_contact_by_email("async.user@example.com", {"phone": "5551234"})
+            assert (await hubspot.get_contact(created["id"]))["properties"]["phone"] == "5551234"
+            await hubspot.delete_contact(await hubspot.resolve_contact_id("async.user@example.com"))
+            assert await hubspot.get_contact_by_email("async.user@example.com") is None
+
+    asyncio.run(scenario())
+    server.stop()
+
+
+def test_async_batch_respects_shared_limiter(tmp_path):
+    server = FakeHubSpotServer(latency="0.01").start()
+    config = ConfigLoader(_write_config(tmp_path / "api_config.json", server.base_url))
+
+    async def scenario():
+        async with AsyncHubSpotTools(config) as hubspot:
+            contacts = ({"email": f"bulk{i}@example.com"} for i in range(950))
+            results = await hubspot.create_contacts_batch(contacts)
+            creates = [hubspot.create_contact({"email": f"single{i}@example.com"}) for i in range(20)]
+            await asyncio.gather(*creates)
+            return results
+
+    results = asyncio.run(scenario())
+    stats = server.get_stats()
+    server.stop()
+    assert len(results) == 950
+    assert all(entry["status"] == "success" for entry in results)
+    assert results[949]["result"]["properties"]["email"] == "bulk949@example.com"
+    assert stats["by_endpoint"]["POST /crm/v3/objects/contacts/batch/create"] == 10
+    assert stats["peak_in_flight"] <= 4
+
+
+def test_aprocess_query_runs_queries_concurrently(tmp_path, monkeypatch):
+    server = FakeHubSpotServer().start()
+    (tmp_path / "config").mkdir()
+    _write_config(tmp_path / "config" / "api_config.json", server.base_url)
+    monkeypatch.chdir(tmp_path)
+
+    from agents.orchestrator import GlobalOrchestrator
+    orchestrator = GlobalOrchestrator()
+
+    async def scenario():
+        queries = [f"Create contact for user{i}@example.com with first name User" for i in range(10)]
+        return await asyncio.gather(*(orchestrator.aprocess_query(query) for query in queries))
+
+    results = asyncio.run(scenario())
+    server.stop()
+    assert all("Contact created successfully" in result for result in results)
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        test_async_contact_roundtrip(pathlib.Path(directory))
+        test_async_batch_respects_shared_limiter(pathlib.Path(directory))
+    print("✅ Async HubSpot tests passed")
+
+
+def test_async_cached_lookup_survives_contact_without_email(tmp_path):
+    server = FakeHubSpotServer().start()
+    config = ConfigLoader(_write_config(tmp_path / "api_config.json", server.base_url))
+
+    async def scenario():
+        async with AsyncHubSpotTools(config) as hubspot:
+            created = await hubspot.create_contact({"email": "async.cleared@example.com"})
+            server.state.update("contacts", server.state.objects["contacts"][created["id"]], {"email": None})
+            return await hubspot.search_contact("async.cleared@example.com")
+
+    assert asyncio.run(scenario()) is None
+    server.stop()
+
+
+def test_client_of_a_finished_loop_is_shut_down(tmp_path):
+    server = FakeHubSpotServer().start()
+    hubspot = AsyncHubSpotTools(ConfigLoader(_write_config(tmp_path / "api_config.json", server.base_url)))
+
+    async def find():
+        return await hubspot.search_contact("nobody@example.com")
+
+    asyncio.run(find())
+    pooled = hubspot._client._transport._pool.connections[0]
+    old = socket.socket(fileno=os.dup(pooled._connection._network_stream.get_extra_info('socket').fileno()))
+    old.settimeout(2)
+
+    async def find_and_close():
+        await find()
+        await hubspot.aclose()
+
+    asyncio.run(find_and_close())
+    # The old keep-alive connection was shut down rather than left open
+    assert old.recv(1) == b""
+    old.close()
+    server.stop()
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test the batch query planner: merging, cancelling and grouping CRM operations
+"""
+
+import json
+import sys
+
+import pytest
+
+from agents.batch_planner import BatchPlanner, format_rows
+from agents.query_parser import parse_query
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.hubspot_tools import HubSpotTools
+from utils.config_loader import ConfigLoader
+
+
+def _tools(tmp_path, server):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({"hubspot": {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url,
+                                            "requests_per_10s": 1000, "backoff_base": 0.01}}))
+    return HubSpotTools(ConfigLoader(str(path)))
+
+
+def _plan(commands):
+    return BatchPlanner(None).plan(parse_query(command) for command in commands)
+
+
+def test_plan_merges_and_cancels_operations():
+    plan = _plan([
+        "Create contact ann@x.com with first name Ann",
+        "Update contact ANN@x.com phone to 555-0100",
+        "Update contact bob@y.com phone to 555-0101",
+        "Update contact bob@y.com first name to Robert",
+        "Update contact cy@z.com phone to 555-0102",
+        "Delete contact cy@z.com",
+        "Create contact tmp@x.com",
+        "Delete contact tmp@x.com",
+        "Update contact tmp@x.com phone to 555-0103",
+        "Create deal for Acme Corp worth $5000",
+    ])
+    assert plan.creates == {"ann@x.com": (0, {"email": "ann@x.com", "firstname": "Ann", "phone": "5550100"})}
+    assert plan.updates == {"bob@y.com": (2, {"phone": "5550101", "firstname": "Robert"})}
+    assert plan.deletes == {"cy@z.com": 5, "tmp@x.com": 7}
+    assert plan.notes[1][0] == "merged" and plan.notes[3][0] == "merged"
+    assert plan.notes[4] == ("skipped", "cancelled by a later delete")
+    assert plan.notes[6] == ("skipped", "cancelled by a later delete")
+    assert plan.notes[8][0] == "error"
+    # read ids + archive + create contacts + update + create deals, vs 17 calls one by one
+    assert (plan.api_calls, plan.sequential_calls) == (5, 17)
+    assert "5 API calls (vs 17 one by one)" in plan.describe()
+
+
+def test_execute_runs_each_verb_as_one_batch(tmp_path):
+    with FakeHubSpotServer() as server:
+        tools = _tools(tmp_path, server)
+        tools.create_contacts_batch([{"email": f"old{i}@x.com"} for i in range(3)])
+        server.reset_stats()
+
+        planner = BatchPlanner(tools)
+        plan = planner.plan(parse_query(command) for command in [
+            "Update contacts old0@x.com and old1@x.com phone to 555-0100",
+            "Delete contact old2@x.com",
+            "Create contact old2@x.com with first name Again",
+            "Create contact new@x.com",
+            "Update contact new@x.com first name to Nia",
+            "Delete contact ghost@x.com",
+            "Find contact new@x.com",
+        ])
+        rows = planner.execute(plan)
+        stats = server.get_stats()["by_endpoint"]
+
+    assert [row["status"] for row in rows] == ["success"] * 6 + ["error", "success"]
+    assert rows[2]["detail"].startswith("deleted (ID") and rows[3]["detail"].startswith("created (ID")
+    assert rows[6] == {"index": 6, "status": "error", "target": "ghost@x.com", "detail": "No contact found"}
+    assert "Nia" in rows[7]["detail"]
+    assert stats["POST /crm/v3/objects/contacts/batch/create"] == 1
+    assert stats["POST /crm/v3/objects/contacts/batch/update"] == 1
+    assert stats["POST /crm/v3/objects/contacts/batch/archive"] == 1
+    assert stats["POST /crm/v3/objects/contacts/batch/read"] == 2  # ids up front, lookups last
+    assert sum(stats.values()) == plan.api_calls
+    assert format_rows(plan, rows).startswith("⚠️ 7/8 operations completed")
+
+
+def test_searches_see_the_state_at_their_position(tmp_path):
+    with FakeHubSpotServer() as server:
+        tools = _tools(tmp_path, server)
+        tools.create_contacts_batch([{"email": "ann@x.com", "phone": "5550100"}, {"email": "bob@x.com"}])
+
+        planner = BatchPlanner(tools)
+        plan = planner.plan(parse_query(command) for command in [
+            "Find contact ann@x.com",
+            "Update contact ann@x.com phone to 555-0199",
+            "Find contact ann@x.com",
+            "Find contact bob@x.com",
+            "Delete contact bob@x.com",
+            "Find contact bob@x.com",
+        ])
+        rows = planner.execute(plan)
+
+    assert plan.prior_searches == {"ann@x.com": [0], "bob@x.com": [3]}
+    assert "phone 5550100" in rows[0]["detail"] and "phone 5550199" in rows[2]["detail"]
+    assert rows[3]["status"] == "success" and rows[4]["status"] == "success"
+    assert rows[5] == {"index": 5, "status": "error", "target": "bob@x.com", "detail": "No contact found"}
+
+
+def test_failed_reads_are_not_reported_as_missing_contacts(tmp_path):
+    with FakeHubSpotServer() as server:
+        tools = _tools(tmp_path, server)
+        server.state.create("contacts", {"email": "ann@x.com"})
+        server.error_rate = 1.0
+
+        planner = BatchPlanner(tools)
+        rows = planner.execute(planner.plan(parse_query(command) for command in [
+            "Find contact bob@x.com",
+            "Delete contact ann@x.com",
+            "Update contact bob@x.com phone to 555-0100",
+        ]))
+        archived = server.get_stats()["by_endpoint"].get("POST /crm/v3/objects/contacts/batch/archive", 0)
+
+    assert [row["status"] for row in rows] == ["error"] * 3
+    assert all(row["detail"].startswith("Could not look up contact:") for row in rows)
+    assert archived == 0
+
+
+def test_dry_run_makes_no_calls(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as server:
+        path = tmp_path / "api_config.json"
+        path.write_text(json.dumps({"openai": {"api_key": "sk-test"},
+                                    "hubspot": {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url}}))
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(path))
+        from agents.hubspot_agent import HubSpotAgent
+        agent = HubSpotAgent()
+        summary = agent.run_batch([parse_query("Delete contacts a@x.com, b@x.com and c@x.com")], dry_run=True)
+        assert summary.startswith("📋 Plan for 3 operations: 2 API calls (vs 6 one by one)")
+        assert server.get_stats()["requests"] == 0
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
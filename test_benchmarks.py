@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test the fake SMTP server and the orchestrator benchmark harness
+"""
+
+import json
+
+import pytest
+
+from benchmarks.orchestrator_bench import run_benchmark, compare_to_baseline, build_workload, main, PORTABLE_METRICS
+from tools.fake_smtp import FakeSMTPServer
+
+
+def test_email_tools_deliver_to_fake_smtp(tmp_path, monkeypatch):
+    with FakeSMTPServer() as smtp:
+        path = tmp_path / "api_config.json"
+        path.write_text(json.dumps({"email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False,
+                                              "email": "bot@example.com", "password": "secret"}}))
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(path))
+
+        from tools.email_tools import EmailTools
+        result = EmailTools().send_email("someone@example.com", "Hello", "Body text")
+        assert result["status"] == "success"
+        assert smtp.messages[0]["to"] == ["someone@example.com"]
+        assert "Body text" in smtp.messages[0]["data"]
+
+
+def test_workload_never_deletes_a_contact_twice():
+    seeded = [f"seed{i}@example.com" for i in range(20)]
+    workload = build_workload(200, seeded, seed=1)
+    deleted = [query.split()[-1] for operation, query in workload if operation == "delete_contact"]
+    assert len(deleted) == len(set(deleted))
+    assert {operation for operation, _ in workload} >= {"create_contact", "search_contact", "create_deal"}
+
+
+def test_benchmark_reports_metrics_and_regressions():
+    result = run_benchmark(queries=30, concurrency=2, seed_contacts=20)
+    assert result["failed"] == 0
+    assert result["throughput_qps"] > 0
+    assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+    assert result["api_calls_per_query"] >= 1
+    # Routine confirmations are coalesced into per-recipient digests
+    assert 0 < result["emails_per_query"] < 1
+
+    assert compare_to_baseline(result, dict(result), 0.25) == []
+    slower = dict(result, throughput_qps=result["throughput_qps"] / 2, p95_ms=result["p95_ms"] * 2)
+    assert len(compare_to_baseline(slower, result, 0.25)) == 2
+    # --check leaves out what depends on the machine
+    assert compare_to_baseline(slower, result, 0.25, PORTABLE_METRICS) == []
+    chattier = dict(result, api_calls_per_query=result["api_calls_per_query"] * 2)
+    assert len(compare_to_baseline(chattier, result, 0.25, PORTABLE_METRICS)) == 1
+
+
+def test_check_fails_without_a_baseline(tmp_path):
+    arguments = ["--queries", "5", "--seed-contacts", "5", "--baseline", str(tmp_path / "baseline.json")]
+    assert main(arguments) == 0
+    assert main(arguments + ["--check"]) == 1
+    assert main(arguments + ["--save-baseline"]) == 0
+    assert main(arguments + ["--check", "--tolerance", "100"]) == 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
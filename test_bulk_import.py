@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Test the streaming bulk importer against the fake HubSpot server: windows, dedupe and checkpoint resume
+"""
+
+import json
+
+import pytest
+
+from tools.bulk_importer import BulkImporter
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.hubspot_tools import HubSpotTools
+from utils.config_loader import ConfigLoader
+
+
+def _tools(tmp_path, server):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({"hubspot": {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url,
+                                            "requests_per_10s": 1000, "backoff_base": 0.01}}))
+    return HubSpotTools(ConfigLoader(str(path)))
+
+
+class _CrashAfter:
+    """Delegate to HubSpotTools, but fail right after the nth batch call was sent"""
+
+    def __init__(self, tools, calls):
+        self.tools = tools
+        self.calls = calls
+
+    def __getattr__(self, name):
+        method = getattr(self.tools, name)
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            self.calls -= 1
+            if self.calls == 0:
+                raise RuntimeError("crashed before the checkpoint was written")
+            return result
+        return call
+
+
+def _errors(path):
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+def test_streams_csv_in_windows_and_dedupes_emails(tmp_path):
+    source = tmp_path / "contacts.csv"
+    lines = ["E-mail,First Name,Notes"] + [f"User{i}@Example.com,User {i},x" for i in range(250)]
+    lines.insert(3, "user0@example.com,Renamed,x")
+    lines.append(",No Email,x")
+    source.write_text("\n".join(lines) + "\n")
+
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        importer = BulkImporter(hubspot, mapping={"Notes": ""}, window_size=100,
+                                checkpoint_path=str(tmp_path / "checkpoint.json"),
+                                error_path=str(tmp_path / "errors.jsonl"))
+        stats = importer.run(str(source))
+        stats_by_endpoint = server.get_stats()["by_endpoint"]
+        renamed = hubspot.get_contact_by_email("user0@example.com")
+
+    assert stats["rows_committed"] == 252 and stats["succeeded"] == 251 and stats["failed"] == 1
+    assert stats_by_endpoint["POST /crm/v3/objects/contacts/batch/upsert"] == 3
+    assert server.get_stats()["contacts"] == 250
+    # Both rows for user0 are in the first window; the later one wins
+    assert renamed["properties"]["firstname"] == "Renamed"
+    assert [error["row"] for error in _errors(tmp_path / "errors.jsonl")] == [252]
+    checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+    assert checkpoint["rows_committed"] == 252 and checkpoint["pending_through"] is None
+
+
+def test_resume_after_crash_keeps_counters_and_does_not_duplicate_creates(tmp_path):
+    source = tmp_path / "contacts.jsonl"
+    source.write_text("".join(json.dumps({"email": f"c{i}@example.com"}) + "\n" for i in range(25)))
+    settings = dict(mode='create', window_size=10, checkpoint_path=str(tmp_path / "checkpoint.json"))
+
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        with pytest.raises(RuntimeError):
+            BulkImporter(_CrashAfter(hubspot, 2), **settings).run(str(source))
+        checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+        assert checkpoint["rows_committed"] == 10 and checkpoint["pending_through"] == 20
+
+        stats = BulkImporter(hubspot, **settings).run(str(source))
+        contacts = server.get_stats()["contacts"]
+        by_endpoint = server.get_stats()["by_endpoint"]
+
+    assert stats["skipped"] == 10
+    assert stats["succeeded"] == 25 and stats["failed"] == 0
+    assert contacts == 25
+    # The pending window is replayed as an upsert by email, the rest is created
+    assert by_endpoint["POST /crm/v3/objects/contacts/batch/upsert"] == 1
+    assert by_endpoint["POST /crm/v3/objects/contacts/batch/create"] == 3
+
+
+def test_pending_deal_window_is_reported_instead_of_recreated(tmp_path):
+    source = tmp_path / "deals.csv"
+    source.write_text("Deal,Value\n" + "".join(f"Deal {i},{i * 100}\n" for i in range(12)))
+    settings = dict(object_type='deals', mode='create', window_size=5,
+                    checkpoint_path=str(tmp_path / "checkpoint.json"), error_path=str(tmp_path / "errors.jsonl"))
+
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        with pytest.raises(RuntimeError):
+            BulkImporter(_CrashAfter(hubspot, 2), **settings).run(str(source))
+        stats = BulkImporter(hubspot, **settings).run(str(source))
+        deals = server.get_stats()["deals"]
+
+    assert deals == 12
+    assert stats["succeeded"] == 7 and stats["failed"] == 5
+    assert [error["row"] for error in _errors(tmp_path / "errors.jsonl")] == [6, 7, 8, 9, 10]
+
+
+def test_malformed_jsonl_lines_are_failed_rows_and_restart_truncates_errors(tmp_path):
+    source = tmp_path / "contacts.jsonl"
+    source.write_text('{"email": "ann@x.com"}\n{"email": "bob@x.com",\n[1, 2]\n{"email": "cy@x.com"}\n')
+    errors = tmp_path / "errors.jsonl"
+    errors.write_text('{"row": 99, "properties": {}, "error": "from an abandoned run"}\n')
+    settings = dict(window_size=2, checkpoint_path=str(tmp_path / "checkpoint.json"), error_path=str(errors))
+
+    with FakeHubSpotServer() as server:
+        stats = BulkImporter(_tools(tmp_path, server), **settings).run(str(source), resume=False)
+        contacts = server.get_stats()["contacts"]
+
+    assert contacts == 2
+    assert stats["succeeded"] == 2 and stats["failed"] == 2 and stats["rows_committed"] == 4
+    failed = _errors(errors)
+    assert [error["row"] for error in failed] == [2, 3]
+    assert failed[0]["error"].startswith("Malformed JSON") and failed[0]["line"] == '{"email": "bob@x.com",'
+    assert failed[1]["error"] == "Expected a JSON object"
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
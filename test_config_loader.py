@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Test the shared, hot-reloading ConfigLoader
+"""
+
+import json
+import os
+
+import pytest
+
+from utils.config_loader import ConfigLoader, get_shared_config
+
+
+def _write(path, config, bump=0):
+    path.write_text(json.dumps(config))
+    if bump:
+        # Make sure the mtime moves even on coarse-grained filesystems
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+def _config(api_key="pat-one", password="secret", **email_settings):
+    return {
+        "openai": {"api_key": "sk-test"},
+        "hubspot": {"api_key": api_key, "base_url": "http://127.0.0.1:9"},
+        "email": dict({"email": "bot@example.com", "password": password, "use_tls": False}, **email_settings),
+    }
+
+
+def test_orchestrator_parses_config_once(tmp_path, monkeypatch):
+    path = tmp_path / "api_config.json"
+    _write(path, _config(outbox_path=str(tmp_path / "outbox.db")))
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(path))
+
+    from agents.orchestrator import GlobalOrchestrator
+    first = GlobalOrchestrator()
+    second = GlobalOrchestrator()
+    assert first.config is second.config is first.hubspot_agent.hubspot_tools.config
+    assert get_shared_config().loads == 1
+
+
+def test_only_changed_sections_are_rebuilt(tmp_path):
+    path = tmp_path / "api_config.json"
+    _write(path, _config())
+    config = ConfigLoader(str(path), check_interval=0)
+
+    from tools.hubspot_tools import HubSpotTools
+    from tools.email_tools import EmailTools
+    hubspot_tools = HubSpotTools(config)
+    email_tools = EmailTools(config)
+    seen = []
+    config.subscribe('openai', lambda section: seen.append(section))
+
+    assert config.refresh() == []
+    _write(path, _config(api_key="pat-two"), bump=1000)
+    assert config.refresh() == ["hubspot"]
+    assert hubspot_tools.headers["Authorization"] == "Bearer pat-two"
+    assert email_tools.email_config["password"] == "secret"
+    assert seen == []
+    assert config.loads == 2
+
+    _write(path, _config(api_key="pat-two", password="rotated"), bump=2000)
+    assert config.get_email_config()["password"] == "rotated"
+    assert email_tools.email_config["password"] == "rotated"
+
+
+def test_broken_edit_keeps_last_good_config(tmp_path):
+    path = tmp_path / "api_config.json"
+    _write(path, _config())
+    config = ConfigLoader(str(path), check_interval=0)
+    path.write_text("{ not json")
+    assert config.refresh() == []
+    assert config.get_hubspot_config()["api_key"] == "pat-one"
+
+
+def test_outbox_lives_next_to_the_config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config" / "api_config.json"
+    path.parent.mkdir()
+    _write(path, _config())
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(path))
+    monkeypatch.chdir(tmp_path)
+
+    from agents.email_agent import EmailAgent
+    outbox = EmailAgent().outbox
+    outbox.close()
+    assert outbox.db_path == str(tmp_path / "config" / "notification_outbox.db")
+    assert ConfigLoader(str(path)).resolve_path("/var/lib/outbox.db") == "/var/lib/outbox.db"
+
+
+def test_extraction_cache_lives_next_to_the_config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config" / "api_config.json"
+    path.parent.mkdir()
+    config = _config()
+    config["openai"]["extraction_fallback"] = True
+    _write(path, config)
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(path))
+    monkeypatch.chdir(tmp_path)
+
+    from agents.hubspot_agent import HubSpotAgent
+    cache = HubSpotAgent().extractor.cache
+    cache.close()
+    assert cache.db_path == str(tmp_path / "config" / "extraction_cache.db")
+
+
+def test_contact_cache_lives_next_to_the_config_file(tmp_path, monkeypatch):
+    path = tmp_path / "config" / "api_config.json"
+    path.parent.mkdir()
+    config = _config(api_key=f"pat-{tmp_path.name}")
+    config["hubspot"]["contact_cache_path"] = "contact_ids.db"
+    _write(path, config)
+    monkeypatch.chdir(tmp_path)
+
+    from tools.hubspot_tools import HubSpotTools
+    tools = HubSpotTools(ConfigLoader(str(path)))
+    assert tools.contact_cache.db_path == str(tmp_path / "config" / "contact_ids.db")
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
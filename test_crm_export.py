@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test the paginated CRM export against the fake HubSpot server: pages, output formats and prefetch shutdown
+"""
+
+import csv
+import json
+import threading
+
+import pytest
+
+import export_crm
+from tools.crm_exporter import CrmExporter, CsvWriter
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.hubspot_tools import HubSpotTools
+from utils.config_loader import ConfigLoader
+
+
+def _config(tmp_path, server):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({"hubspot": {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url,
+                                            "requests_per_10s": 1000}}))
+    return str(path)
+
+
+def _seed(server, count):
+    for i in range(count):
+        server.state.create("contacts", {"email": f"user{i}@example.com", "firstname": f"User {i}"})
+
+
+def _prefetch_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('crm-export-prefetch')]
+
+
+def test_exports_every_page_as_jsonl_and_csv(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as server:
+        _seed(server, 250)
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(tmp_path, server))
+        assert export_crm.main(["contacts", str(tmp_path / "contacts.jsonl")]) == 0
+        pages = server.get_stats()["requests"]
+        assert export_crm.main(["contacts", str(tmp_path / "contacts.csv"), "--properties", "email,firstname"]) == 0
+
+    assert pages == 3
+    records = [json.loads(line) for line in (tmp_path / "contacts.jsonl").read_text().splitlines()]
+    assert len(records) == 250 and len({record["id"] for record in records}) == 250
+    assert records[0]["email"] == "user0@example.com" and records[-1]["firstname"] == "User 249"
+    with open(tmp_path / "contacts.csv", newline='') as file:
+        rows = list(csv.DictReader(file))
+    assert len(rows) == 250
+    assert list(rows[0]) == ["id", "email", "firstname", "createdAt", "updatedAt"]
+    assert json.loads((tmp_path / "contacts.csv.state.json").read_text())["rows"] == 250
+
+
+def test_prefetch_thread_stops_when_the_consumer_stops_early(tmp_path, monkeypatch):
+    with FakeHubSpotServer(latency="0.05") as server:
+        _seed(server, 450)
+        exporter = CrmExporter(HubSpotTools(ConfigLoader(_config(tmp_path, server))), 'contacts')
+
+        pages = exporter._prefetched_pages(None)
+        records, _ = next(pages)
+        pages.close()
+        assert len(records) == 100
+        assert _prefetch_threads() == []
+        # The consumed page plus the one prefetched behind it, nothing more
+        assert server.get_stats()["requests"] == 2
+
+        def fail_on_second_page(writer, rows, calls=[]):
+            calls.append(rows)
+            if len(calls) == 2:
+                raise OSError("disk full")
+            writer.writer.writerows(rows)
+
+        monkeypatch.setattr(CsvWriter, "write_rows", fail_on_second_page)
+        with pytest.raises(OSError):
+            exporter.run(str(tmp_path / "contacts.csv"), 'csv')
+        assert _prefetch_threads() == []
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Test the local CRM mirror against the fake HubSpot server: delta sync, archived records, write-through and staleness
+"""
+
+import json
+import time
+
+import pytest
+
+import sync_mirror
+from agents.hubspot_agent import HubSpotAgent
+from agents.query_parser import parse_query
+from tools.crm_mirror import CrmMirror
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.hubspot_tools import HubSpotTools
+from utils.config_loader import ConfigLoader
+
+SEARCH = "POST /crm/v3/objects/contacts/search"
+LIST = "GET /crm/v3/objects/contacts"
+
+
+def _config(tmp_path, server, **hubspot_settings):
+    hubspot = {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url, "requests_per_10s": 1000,
+               "mirror_path": str(tmp_path / "mirror.db")}
+    hubspot.update(hubspot_settings)
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({"openai": {"api_key": "sk-test"}, "hubspot": hubspot}))
+    return str(path)
+
+
+def test_delta_sync_applies_changes_and_drops_archived_contacts(tmp_path):
+    with FakeHubSpotServer() as server:
+        hubspot = HubSpotTools(ConfigLoader(_config(tmp_path, server)))
+        kept = server.state.create("contacts", {"email": "kept@x.com", "firstname": "Kept"})
+        gone = server.state.create("contacts", {"email": "gone@x.com", "firstname": "Gone"})
+        mirror = CrmMirror(str(tmp_path / "mirror.db"), archive_sweep_interval=0)
+        assert mirror.sync(hubspot) == 2
+
+        # Changed outside this process: one edit, one archive, one new contact
+        server.state.update("contacts", kept, {"phone": "555-0100"})
+        server.state.archive("contacts", gone["id"])
+        server.state.create("contacts", {"email": "new@x.com"})
+        mirror.delta_sync(hubspot)
+
+        assert mirror.find_contact_by_email("kept@x.com")["properties"]["phone"] == "555-0100"
+        assert mirror.find_contact_by_email("gone@x.com") is None
+        assert mirror.find_contact_by_email("new@x.com") is not None
+        assert mirror.get_stats()["contacts"]["records"] == 2
+
+
+def test_archive_is_swept_only_when_due(tmp_path):
+    with FakeHubSpotServer() as server:
+        hubspot = HubSpotTools(ConfigLoader(_config(tmp_path, server)))
+        server.state.create("contacts", {"email": "ann@x.com"})
+        gone = server.state.create("contacts", {"email": "gone@x.com"})
+        mirror = CrmMirror(str(tmp_path / "mirror.db"), archive_sweep_interval=0.2)
+        mirror.sync(hubspot, full=True)
+        server.state.archive("contacts", gone["id"])
+        server.reset_stats()
+
+        # The seed just accounted for the archive, so these delta syncs don't page through it
+        mirror.delta_sync(hubspot)
+        mirror.delta_sync(hubspot)
+        assert LIST not in server.get_stats()["by_endpoint"]
+
+        time.sleep(0.25)
+        mirror.delta_sync(hubspot)
+        assert server.get_stats()["by_endpoint"][LIST] == 1
+        assert mirror.find_contact_by_email("gone@x.com") is None
+
+
+def test_sync_script_and_agent_share_the_mirror_file(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as server:
+        server.state.create("contacts", {"email": "ann@x.com", "firstname": "Ann"})
+        config_dir = tmp_path / "config"
+        config_dir.mkdir()
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(config_dir, server, mirror_path="mirror.db"))
+        elsewhere = tmp_path / "elsewhere"
+        elsewhere.mkdir()
+        monkeypatch.chdir(elsewhere)
+
+        assert sync_mirror.main(["--full"]) == 0
+        agent = HubSpotAgent()
+
+    assert agent.mirror.db_path == str(config_dir / "mirror.db")
+    assert agent.mirror.find_contact_by_email("ann@x.com")["properties"]["firstname"] == "Ann"
+    assert not (elsewhere / "mirror.db").exists()
+
+
+def test_write_through_merges_partial_responses(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as server:
+        server.state.create("contacts", {"email": "ann@x.com", "firstname": "Ann", "phone": "5550100"})
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(tmp_path, server))
+        agent = HubSpotAgent()
+        agent.mirror.sync(agent.hubspot_tools)
+
+        # The PATCH response carries lastname but not phone
+        assert "Contact updated successfully" in agent.process_request("Update contact ann@x.com last name to Lee")
+        server.reset_stats()
+        found = agent.process_request("Find contact ann@x.com")
+        planned = agent.run_batch([parse_query("Find contact ann@x.com")])
+
+        assert SEARCH not in server.get_stats()["by_endpoint"]
+    assert "Last Name: Lee" in found and "Phone: 5550100" in found
+    # The batch planner answers searches from the same mirror rows
+    assert "Ann Lee, phone 5550100" in planned
+
+
+def test_stale_mirror_is_not_trusted(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as server:
+        server.state.create("contacts", {"email": "ann@x.com", "firstname": "Ann"})
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(tmp_path, server, mirror_max_staleness=0.05))
+        agent = HubSpotAgent()
+        assert agent.mirror.staleness() is None and not agent.mirror.is_fresh()
+
+        agent.mirror.sync(agent.hubspot_tools)
+        assert agent.mirror.is_fresh(max_staleness=60)
+        server.reset_stats()
+        agent.process_request("Find contact ann@x.com")
+        assert SEARCH not in server.get_stats()["by_endpoint"]
+
+        time.sleep(0.1)
+        assert not agent.mirror.is_fresh(max_staleness=0.05)
+        assert "Ann" in agent.process_request("Find contact ann@x.com")
+        assert server.get_stats()["by_endpoint"][SEARCH] == 1
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
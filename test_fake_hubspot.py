@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Test HubSpotTools against the fake HubSpot server: retries, search lag, batches and bulk search
+"""
+
+import json
+
+import pytest
+
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.hubspot_tools import HubSpotTools, HubSpotAPIError
+from utils.config_loader import ConfigLoader
+
+
+def _tools(tmp_path, server, **hubspot_settings):
+    hubspot = {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url,
+               "requests_per_10s": 1000, "backoff_base": 0.01}
+    hubspot.update(hubspot_settings)
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({"hubspot": hubspot}))
+    return HubSpotTools(ConfigLoader(str(path)))
+
+
+def test_throttled_reads_are_retried(tmp_path):
+    with FakeHubSpotServer(throttle_rate=0.5, retry_after=0.05, seed=3) as server:
+        hubspot = _tools(tmp_path, server)
+        for i in range(10):
+            assert hubspot.search_contact(f"nobody{i}@example.com") is None
+        stats = hubspot.get_rate_limit_stats()
+    assert stats["throttled"] > 0
+    assert stats["retries"] == stats["throttled"]
+    assert stats["gave_up"] == 0
+
+
+def test_creates_are_not_retried_on_server_errors(tmp_path):
+    with FakeHubSpotServer(error_rate=1.0) as server:
+        hubspot = _tools(tmp_path, server)
+        with pytest.raises(HubSpotAPIError) as error:
+            hubspot.create_contact({"email": "once@example.com"})
+        assert error.value.status_code >= 500
+        assert server.get_stats()["requests"] == 1
+
+
+def test_update_by_email_does_not_wait_for_search_index(tmp_path):
+    with FakeHubSpotServer(search_lag=30) as server:
+        hubspot = _tools(tmp_path, server)
+        hubspot.create_contact({"email": "fresh@example.com", "firstname": "Fresh"})
+        assert list(hubspot.iter_search('contacts', [])) == []
+        hubspot.update_contact_by_email("fresh@example.com", {"phone": "5551234"})
+        assert hubspot.get_contact_by_email("fresh@example.com")["properties"]["phone"] == "5551234"
+        assert server.get_stats()["by_endpoint"]["PATCH /crm/v3/objects/contacts/{id}"] == 1
+
+
+def test_batch_create_reports_per_record_failures(tmp_path):
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        hubspot.create_contact({"email": "taken@example.com"})
+        contacts = [{"email": f"new{i}@example.com"} for i in range(149)] + [{"email": "taken@example.com"}]
+        results = hubspot.create_contacts_batch(contacts)
+        assert server.get_stats()["by_endpoint"]["POST /crm/v3/objects/contacts/batch/create"] == 2
+    assert [entry["index"] for entry in results if entry["status"] == "error"] == [149]
+    assert results[7]["result"]["properties"]["email"] == "new7@example.com"
+
+
+def test_bulk_email_search_uses_few_requests(tmp_path):
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        hubspot.upsert_contacts_batch({"email": f"user{i}@example.com"} for i in range(1200))
+        server.reset_stats()
+        emails = [f"USER{i}@example.com" for i in range(1200)] + ["missing@example.com"]
+        matches = hubspot.search_contacts_by_emails(emails)
+        requests = server.get_stats()["requests"]
+    assert len(matches) == 1201
+    assert matches["missing@example.com"] == []
+    assert all(len(matches[f"user{i}@example.com"]) == 1 for i in range(1200))
+    assert requests <= 15
+
+
+def test_cached_lookups_skip_search_endpoint(tmp_path):
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        created = hubspot.create_contact({"email": "cached@example.com"})
+        for _ in range(5):
+            assert hubspot.search_contact("cached@example.com")["id"] == created["id"]
+        assert hubspot.resolve_contact_id("cached@example.com") == created["id"]
+        assert "POST /crm/v3/objects/contacts/search" not in server.get_stats()["by_endpoint"]
+        assert hubspot.get_cache_stats()["hits"] >= 6
+
+
+def test_cached_lookup_survives_contact_without_email(tmp_path):
+    with FakeHubSpotServer() as server:
+        hubspot = _tools(tmp_path, server)
+        created = hubspot.create_contact({"email": "cleared@example.com"})
+        # HubSpot returns "email": null once the address is removed outside this process
+        server.state.update("contacts", server.state.objects["contacts"][created["id"]], {"email": None})
+        assert hubspot.search_contact("cleared@example.com") is None
+        assert hubspot.get_cache_stats()["size"] == 0
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Test the LLM extraction fallback and its normalized-query cache
+"""
+
+import asyncio
+import json
+import sys
+
+import httpx
+import pytest
+
+from agents.llm_extraction import LLMExtractor, normalize_query, pack_batches
+from agents.query_parser import parse_query
+from tools.extraction_cache import ExtractionCache
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_llm import FakeLLM
+from tools.fake_smtp import FakeSMTPServer
+
+
+def test_normalize_query_abstracts_slots():
+    template, slots = normalize_query("Set John's mobile to 555-123-4567 for jd@example.com")
+    assert template == "set <name>'s mobile to <number> for <email>"
+    assert slots == {"email": ["jd@example.com"], "number": ["555-123-4567"], "name": ["John"]}
+    assert normalize_query("set  Mary Ann's mobile to +1 (555) 000 1111 for ma@example.org")[0] == template
+
+
+def test_repeated_phrasings_hit_the_cache(tmp_path):
+    llm = FakeLLM()
+    extractor = LLMExtractor(llm, ExtractionCache(str(tmp_path / "extractions.db")))
+
+    first = extractor.resolve(parse_query("Set John's mobile to 555-123-4567 for jd@example.com"))
+    assert (first.intent, dict(first.properties)) == ("update_contact", {"phone": "5551234567"})
+    second = extractor.resolve(parse_query("Set Mary's mobile to (555) 987 6543 for mary@example.com"))
+    assert (second.intent, dict(second.properties)) == ("update_contact", {"phone": "5559876543"})
+    assert second.email == "mary@example.com"
+
+    deal = extractor.resolve(parse_query("Open an opportunity with Acme Corp worth $5,000 owner@acme.io"))
+    assert dict(deal.properties) == {"dealname": "Acme Corp", "amount": "5000"}
+    assert extractor.extract("What's the weather at home@example.com") is None
+    assert extractor.extract("What's the weather at work@example.com") is None
+    assert llm.calls == 3
+
+    stats = extractor.get_stats()
+    assert stats["llm_calls"] == 3 and stats["unrecognized"] == 1
+    assert stats["cache"]["hits"] == 2 and stats["cache"]["hit_rate"] == 0.4
+    extractor.cache.close()
+
+    # A fresh process starts warm from disk
+    restarted = LLMExtractor(FakeLLM(), ExtractionCache(str(tmp_path / "extractions.db")))
+    again = restarted.resolve(parse_query("Set Li's mobile to 555 0000 for li@example.com"))
+    assert dict(again.properties) == {"phone": "5550000"}
+    assert restarted.llm.calls == 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "extractions.db")
+    cache = ExtractionCache(path, max_size=2)
+    cache.put("a <email>", {"intent": None, "fields": {}})
+    cache.put("b <email>", {"intent": None, "fields": {}})
+    assert cache.get("a <email>") is not None
+    cache.put("c <email>", {"intent": None, "fields": {}})
+    assert cache.get("b <email>") is None
+    assert cache.get_stats()["evictions"] == 1
+    cache.close()
+
+    reopened = ExtractionCache(path, max_size=1)
+    assert reopened.get_stats()["size"] == 1
+    assert reopened.get("c <email>") is not None
+
+
+def test_llm_errors_are_not_cached(tmp_path):
+    class BrokenLLM:
+        def with_structured_output(self, schema):
+            raise RuntimeError("rate limited")
+
+    extractor = LLMExtractor(BrokenLLM(), ExtractionCache(str(tmp_path / "extractions.db")))
+    parsed = parse_query("Set John's mobile to 555 1234 for jd@example.com")
+    assert extractor.resolve(parsed) is parsed
+    assert extractor.get_stats()["llm_errors"] == 1
+    assert extractor.cache.get_stats()["size"] == 0
+
+
+def test_pack_batches_respects_token_budget_and_item_cap():
+    texts = ["x" * 400] * 10 + ["short"] * 5
+    batches = pack_batches(texts, max_tokens=500, max_items=4)
+    assert [position for batch in batches for position in batch] == list(range(15))
+    assert all(len(batch) <= 4 for batch in batches)
+    assert len(batches[0]) == 3  # 3 x 108 estimated tokens fit after the system prompt, 4 don't
+    assert pack_batches(["x" * 10000], max_tokens=500) == [[0]]
+
+
+def test_extract_many_batches_concurrently_and_isolates_failures(tmp_path):
+    llm = FakeLLM(latency=0.05, fail_on="poison")
+    extractor = LLMExtractor(llm, ExtractionCache(str(tmp_path / "extractions.db")))
+    commands = [f"Set User's mobile to 555 01{i:02d} for u{i}@example.com ref r{i}x" for i in range(40)]
+    commands += [f"Set Ann's mobile to 555 9999 for ann@example.com ref r{i}x" for i in range(5)]  # repeat templates
+    commands.insert(7, "Set Eve's mobile to 555 0000 for eve@example.com poison")
+    commands.insert(20, "What's the weather at home@example.com")
+
+    results = extractor.extract_many(commands, max_items=10, max_concurrency=2)
+    assert [result["index"] for result in results] == list(range(len(commands)))
+    assert results[7]["status"] == "error" and "failed" in results[7]["error"]
+    assert results[20]["status"] == "unrecognized"
+    assert results[0] == {"index": 0, "status": "success", "intent": "update_contact", "entity": "contact",
+                          "properties": {"phone": "5550100"}}
+    assert results[-1]["properties"] == {"phone": "5559999"}
+    assert all(result["status"] == "success" for position, result in enumerate(results) if position not in (7, 20))
+
+    assert llm.items < len(commands) + 10          # repeated templates are asked once
+    assert llm.calls < 15                           # vs one call per command
+    assert llm.peak_in_flight == 2
+    assert extractor.cache.get("set <name>'s mobile to <number> for <email> poison") is None
+
+    calls = llm.calls
+    again = extractor.extract_many(commands[:5])
+    assert [result["status"] for result in again] == ["success"] * 5
+    assert llm.calls == calls
+
+
+def test_agent_resolve_many_only_asks_llm_for_misses(tmp_path, monkeypatch):
+    config_path = tmp_path / "api_config.json"
+    config_path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test", "extraction_fallback": True, "extraction_batch_size": 2},
+        "hubspot": {"api_key": "pat-test", "base_url": "http://127.0.0.1:9"},
+    }))
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(config_path))
+
+    from agents.hubspot_agent import HubSpotAgent
+    agent = HubSpotAgent()
+    llm = FakeLLM()
+    agent.extractor = LLMExtractor(llm, ExtractionCache(str(tmp_path / "extractions.db")))
+    results = agent.resolve_many([
+        "Create contact a@example.com with first name Ada",
+        "Set Bob's mobile to 555 1234 for bob@example.com",
+        "Forget c@example.com",
+        "Nice weather today",
+    ])
+    assert [result["status"] for result in results] == ["parsed", "extracted", "extracted", "unrecognized"]
+    assert results[1]["query"].intent == "update_contact"
+    assert dict(results[1]["query"].properties) == {"phone": "5551234"}
+    assert results[2]["query"].intent == "delete_contact"
+    assert llm.calls == 2 and llm.items == 3
+
+
+def test_orchestrator_uses_fallback_for_unparsed_requests(tmp_path, monkeypatch):
+    server = FakeHubSpotServer().start()
+    config_path = tmp_path / "api_config.json"
+    config_path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test", "extraction_fallback": True,
+                   "extraction_cache_path": str(tmp_path / "extractions.db")},
+        "hubspot": {"api_key": "pat-test", "base_url": server.base_url},
+        "email": {"outbox_enabled": False, "digest_window": 0, "smtp_server": "127.0.0.1", "smtp_port": 9},
+    }))
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(config_path))
+
+    from agents.orchestrator import GlobalOrchestrator
+    orchestrator = GlobalOrchestrator()
+    llm = FakeLLM()
+    orchestrator.hubspot_agent.extractor = LLMExtractor(llm, ExtractionCache(str(tmp_path / "extractions.db")))
+
+    created = orchestrator.process_query("Create contact jd@example.com with first name John")
+    updated = orchestrator.process_query("Set John's mobile to 555-123-4567 for jd@example.com")
+    found = orchestrator.hubspot_agent.process_request("Find contact jd@example.com")
+    server.stop()
+    assert "Contact created successfully" in created
+    assert "Contact updated successfully" in updated
+    assert "Phone: 5551234567" in found
+    assert llm.calls == 1
+
+
+def test_batch_entry_points_pack_extraction_into_one_call(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as server, FakeSMTPServer() as smtp:
+        for i in range(12):
+            server.state.create("contacts", {"email": f"u{i}@example.com"})
+        config_path = tmp_path / "api_config.json"
+        config_path.write_text(json.dumps({
+            "openai": {"api_key": "sk-test", "extraction_fallback": True},
+            "hubspot": {"api_key": f"pat-test-{server.base_url}", "base_url": server.base_url},
+            "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False, "email": "bot@example.com",
+                      "password": "secret", "outbox_enabled": False, "digest_window": 0},
+        }))
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(config_path))
+
+        from agents.orchestrator import GlobalOrchestrator
+        from api_server import QueryServer
+        from main import run_queries
+        orchestrator = GlobalOrchestrator()
+        llm = FakeLLM()
+        orchestrator.hubspot_agent.extractor = LLMExtractor(llm, ExtractionCache(str(tmp_path / "extractions.db")))
+        # Distinct templates, so each one needs the LLM
+        queries = [f"Set User's mobile to 555 01{i:02d} for u{i}@example.com ref r{i}x" for i in range(12)]
+
+        records = list(run_queries(orchestrator, queries[:6], workers=2))
+        assert [record["status"] for record in records] == ["success"] * 6
+        assert llm.calls == 1 and llm.items == 6
+
+        async def scenario():
+            async with QueryServer(orchestrator, port=0) as api:
+                async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{api.port}") as client:
+                    return (await client.post("/batch", json={"queries": queries[6:]})).json()
+
+        batch = asyncio.run(scenario())
+        assert batch["summary"]["success"] == 6
+        assert llm.calls == 2 and llm.items == 12
+        assert server.state.find_by_email("u11@example.com")["properties"]["phone"] == "5550111"
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
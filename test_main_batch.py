@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test main.py --batch: queries from stdin or a file, JSONL results, summary on stderr
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_smtp import FakeSMTPServer
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+def _run(tmp_path, hubspot, smtp, *args, stdin=None):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test"},
+        "hubspot": {"api_key": f"pat-test-{hubspot.base_url}", "base_url": hubspot.base_url},
+        "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False, "email": "bot@example.com",
+                  "password": "secret", "outbox_path": str(tmp_path / "outbox.db"), "digest_window": 0},
+    }))
+    env = dict(os.environ, HUBSPOT_AGENT_CONFIG=str(path))
+    return subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), *args], input=stdin, text=True,
+                          capture_output=True, cwd=ROOT, env=env, timeout=60)
+
+
+def test_batch_mode_streams_jsonl_in_input_order(tmp_path):
+    queries = [f"Create contact user{i}@example.com with first name User" for i in range(12)]
+    queries.insert(5, "Find contact nobody@example.com")
+    with FakeHubSpotServer(latency="0.01") as hubspot, FakeSMTPServer() as smtp:
+        completed = _run(tmp_path, hubspot, smtp, "--batch", "-", "--workers", "4",
+                         stdin="\n".join(queries) + "\n\n")
+        assert hubspot.get_stats()["contacts"] == 12
+
+    records = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert [record["index"] for record in records] == list(range(13))
+    assert [record["query"] for record in records] == queries
+    assert records[0]["status"] == "success" and "Contact created successfully" in records[0]["result"]
+    assert records[5]["status"] == "failed"
+    assert "📊 13 queries" in completed.stderr and "12 succeeded, 1 failed" in completed.stderr
+    assert "HubSpot retries: 0" in completed.stderr
+    assert completed.returncode == 2
+
+
+def test_batch_mode_reads_a_file_in_completion_order(tmp_path):
+    path = tmp_path / "queries.txt"
+    path.write_text("\n".join(f"Create contact c{i}@example.com" for i in range(6)))
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        completed = _run(tmp_path, hubspot, smtp, "--batch", str(path), "--order", "completion")
+
+    records = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert sorted(record["index"] for record in records) == list(range(6))
+    assert completed.returncode == 0
+
+
+def test_contact_data_is_not_taken_for_a_failure(tmp_path):
+    queries = ["Create contact err@example.com with first name Error last name Failed",
+               "Find contact err@example.com"]
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        completed = _run(tmp_path, hubspot, smtp, "--batch", "-", "--workers", "1", stdin="\n".join(queries))
+
+    records = [json.loads(line) for line in completed.stdout.splitlines()]
+    assert "First Name: Error" in records[1]["result"]
+    assert [record["status"] for record in records] == ["success", "success"]
+    assert "📊 2 queries" in completed.stderr and completed.returncode == 0
+
+
+def test_queries_are_read_as_they_are_consumed(tmp_path):
+    from main import read_queries
+    path = tmp_path / "queries.txt"
+    path.write_text("first\n\n  second  \n")
+    queries = read_queries(str(path))
+    assert not isinstance(queries, list)
+    assert list(queries) == ["first", "second"]
+    with pytest.raises(OSError):
+        read_queries(str(tmp_path / "missing.txt"))
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Test list commands that create, update, find or delete many contacts in one query
+"""
+
+import asyncio
+import json
+import sys
+
+import pytest
+
+from agents.query_parser import parse_query
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_smtp import FakeSMTPServer
+
+
+def test_list_commands_split_into_entities():
+    parsed = parse_query("Create contacts for a@x.com with first name Ann, b@y.com with first name Bob and c@z.com")
+    assert parsed.is_multi and parsed.intent == "create_contact"
+    assert [dict(entity.properties) for entity in parsed.entities] == [
+        {"email": "a@x.com", "firstname": "Ann"}, {"email": "b@y.com", "firstname": "Bob"}, {"email": "c@z.com"}]
+
+    shared = parse_query("Update contacts a@x.com, b@y.com and c@z.com phone to 555-0100")
+    assert [dict(entity.properties) for entity in shared.entities] == [{"phone": "5550100"}] * 3
+
+    repeated = parse_query("Delete contacts a@x.com and b@y.com, then A@x.com again")
+    assert [entity.email for entity in repeated.entities] == ["a@x.com", "b@y.com"]
+    assert not parse_query("Create contact solo@x.com first name Solo").is_multi
+    assert [entity.email for entity in parse_query("Delete contact a@x.com and b@y.com").entities] == [
+        "a@x.com", "b@y.com"]
+
+
+def test_other_addresses_do_not_split_a_single_contact_command():
+    for query in ("Update a@x.com: note that b@y.com referred them",
+                  "Update contact a@x.com: note that b@y.com referred them",
+                  "Update contact a@x.com email to b@y.com",
+                  "Create contact a@x.com referred by b@y.com"):
+        assert not parse_query(query).is_multi, query
+
+
+def _config(tmp_path, hubspot, smtp):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test"},
+        "hubspot": {"api_key": f"pat-test-{hubspot.base_url}", "base_url": hubspot.base_url},
+        "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False,
+                  "email": "bot@example.com", "password": "secret", "outbox_enabled": False, "digest_window": 0},
+    }))
+    return str(path)
+
+
+def test_orchestrator_runs_list_commands_as_batches(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(tmp_path, hubspot, smtp))
+        from agents.orchestrator import GlobalOrchestrator
+        orchestrator = GlobalOrchestrator()
+
+        steps = []
+        created = orchestrator.process_query(
+            "Create contacts for ann@x.com with first name Ann, bob@y.com with first name Bob and cy@z.com",
+            on_progress=steps.append)
+        assert steps == ["✅ HubSpot operation done", "📧 Email notification queued"]
+        assert "✅ 3/3 contacts created" in created
+        assert "Email Notifications: 3/3 recipients notified" in created
+        assert hubspot.get_stats()["by_endpoint"]["POST /crm/v3/objects/contacts/batch/create"] == 1
+        bodies = {message["to"][0]: message["data"] for message in smtp.messages}
+        assert "ann@x.com" in bodies["ann@x.com"] and "bob@y.com" not in bodies["ann@x.com"]
+
+        hubspot.reset_stats()
+        updated = orchestrator.process_query("Update contacts ann@x.com, ghost@x.com and bob@y.com phone to 555-0100")
+        assert "⚠️ 2/3 contacts updated" in updated
+        assert "❌ ghost@x.com — No contact found" in updated
+        assert "✅ bob@y.com — updated phone" in updated
+
+        found = orchestrator.hubspot_agent.process_request("Find contacts ann@x.com and bob@y.com")
+        assert "ann@x.com — ID" in found and "Ann, phone 5550100" in found
+
+        deleted = asyncio.run(orchestrator.aprocess_query("Delete contacts ann@x.com and cy@z.com"))
+        assert "✅ 2/2 contacts deleted" in deleted
+        stats = hubspot.get_stats()["by_endpoint"]
+        assert stats["POST /crm/v3/objects/contacts/batch/update"] == 1
+        assert stats["POST /crm/v3/objects/contacts/batch/archive"] == 1
+        assert "No contact found" in orchestrator.hubspot_agent.process_request("Find contact cy@z.com")
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
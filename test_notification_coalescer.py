@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test per-recipient notification digests
+"""
+
+import json
+import time
+
+import pytest
+
+from agents.notification_coalescer import NotificationCoalescer
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_smtp import FakeSMTPServer
+
+
+def test_buffers_flush_on_size_window_and_urgency():
+    delivered = []
+    coalescer = NotificationCoalescer(lambda recipient, actions: delivered.append((recipient, list(actions))),
+                                      window=0.2, max_actions=3)
+    for i in range(3):
+        coalescer.add("Bulk@example.com", f"bulk {i}")
+    assert delivered == [("Bulk@example.com", ["bulk 0", "bulk 1", "bulk 2"])]
+
+    coalescer.add("ops@example.com", "routine")
+    coalescer.add("ops@example.com", "failed", urgent=True)
+    assert delivered[-1] == ("ops@example.com", ["routine", "failed"])
+
+    coalescer.add("slow@example.com", "only one")
+    time.sleep(0.5)
+    assert delivered[-1] == ("slow@example.com", ["only one"])
+    stats = coalescer.get_stats()
+    coalescer.close()
+    assert (stats["size_flushes"], stats["urgent_flushes"], stats["window_flushes"]) == (1, 1, 1)
+    assert stats["buffered_actions"] == 0
+
+
+def test_failed_handoffs_are_kept_and_retried():
+    delivered, failures = [], [RuntimeError("outbox locked")] * 2
+
+    def deliver(recipient, actions):
+        if failures:
+            raise failures.pop()
+        delivered.append((recipient, list(actions)))
+
+    coalescer = NotificationCoalescer(deliver, window=0.1)
+    coalescer.add("ops@example.com", "first")
+    # Only the first window is short, so the timer doesn't retry on its own during the test
+    coalescer.window = 60
+    time.sleep(0.2)
+    # The timer's hand-off failed; the digest is back in the buffer with the newer action after it
+    coalescer.add("ops@example.com", "second")
+    assert delivered == [] and coalescer.get_stats()["buffered_actions"] == 2
+
+    assert coalescer.flush_all() == 0
+    assert coalescer.flush_all() == 1
+    stats = coalescer.get_stats()
+    coalescer.close()
+    assert delivered == [("ops@example.com", ["first", "second"])]
+    assert stats["failed_handoffs"] == 2 and stats["digests"] == 1 and stats["buffered_actions"] == 0
+
+
+def test_bulk_queries_send_one_digest_per_recipient(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer() as smtp:
+        config = {
+            "openai": {"api_key": "sk-test"},
+            "hubspot": {"api_key": f"pat-test-{hubspot.base_url}", "base_url": hubspot.base_url,
+                        "requests_per_10s": 1000},
+            "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False,
+                      "email": "bot@example.com", "password": "secret",
+                      "outbox_path": str(tmp_path / "outbox.db"), "digest_window": 60, "digest_max_actions": 100},
+        }
+        (tmp_path / "api_config.json").write_text(json.dumps(config))
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(tmp_path / "api_config.json"))
+
+        from agents.orchestrator import GlobalOrchestrator
+        orchestrator = GlobalOrchestrator()
+        for i in range(200):
+            result = orchestrator.process_query(f"Create a deal for Account {i}, amount $500, owner sales@example.com")
+            assert "added to the next digest" in result
+        assert orchestrator.email_agent.flush_notifications(timeout=10)
+        orchestrator.email_agent.outbox.close()
+        orchestrator.email_agent.coalescer.close()
+
+        assert smtp.get_stats()["messages"] == 2
+        assert "Subject: CRM Actions Completed (100)" in smtp.messages[0]["data"]
+
+
+
+def test_digests_are_opt_in(tmp_path, monkeypatch):
+    (tmp_path / "api_config.json").write_text(json.dumps({
+        "email": {"email": "bot@example.com", "password": "secret", "outbox_path": str(tmp_path / "outbox.db")}}))
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(tmp_path / "api_config.json"))
+
+    from agents.email_agent import EmailAgent
+    agent = EmailAgent()
+    result = agent.queue_notification("Contact created", "ann@example.com")
+    agent.outbox.close()
+    assert agent.coalescer is None
+    assert result == "Email to ann@example.com queued for delivery"
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test the durable notification outbox and its use by the orchestrator
+"""
+
+import json
+import time
+
+import pytest
+
+from tools.fake_hubspot import FakeHubSpotServer
+from tools.fake_smtp import FakeSMTPServer
+from tools.notification_outbox import NotificationOutbox
+
+
+def test_failed_sends_are_retried_then_dead_lettered(tmp_path):
+    attempts = {}
+
+    def flaky_send(recipient, subject, body):
+        attempts[recipient] = attempts.get(recipient, 0) + 1
+        if recipient == "never@example.com" or attempts[recipient] < 3:
+            return {"status": "error", "message": "SMTP unavailable"}
+        return {"status": "success", "message": "sent"}
+
+    outbox = NotificationOutbox(str(tmp_path / "outbox.db"), flaky_send, max_attempts=3, retry_base=0.01)
+    outbox.enqueue("eventually@example.com", "Subject", "Body")
+    outbox.enqueue("never@example.com", "Subject", "Body")
+    assert outbox.wait_until_empty(timeout=5)
+    stats = outbox.get_stats()
+    assert stats["sent"] == 1 and stats["dead"] == 1 and stats["depth"] == 0
+    assert outbox.dead_letters()[0]["last_error"] == "SMTP unavailable"
+
+    assert outbox.retry_dead() == 1
+    assert outbox.wait_until_empty(timeout=5)
+    outbox.close()
+    assert attempts == {"eventually@example.com": 3, "never@example.com": 6}
+
+
+def test_undelivered_notifications_survive_a_restart(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    sent = []
+    outbox = NotificationOutbox(path, lambda *message: sent.append(message), workers=0)
+    outbox.enqueue("later@example.com", "Subject", "Body")
+    outbox.close()
+
+    outbox = NotificationOutbox(path, lambda *message: sent.append(message) or {"status": "success"})
+    assert outbox.wait_until_empty(timeout=5)
+    outbox.close()
+    assert sent == [("later@example.com", "Subject", "Body")]
+
+
+def test_process_query_does_not_wait_for_smtp(tmp_path, monkeypatch):
+    with FakeHubSpotServer() as hubspot, FakeSMTPServer(latency="0.2") as smtp:
+        config = {
+            "openai": {"api_key": "sk-test"},
+            "hubspot": {"api_key": f"pat-test-{hubspot.base_url}", "base_url": hubspot.base_url},
+            "email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False,
+                      "email": "bot@example.com", "password": "secret",
+                      "outbox_path": str(tmp_path / "outbox.db"), "digest_window": 0},
+        }
+        (tmp_path / "api_config.json").write_text(json.dumps(config))
+        monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(tmp_path / "api_config.json"))
+
+        from agents.orchestrator import GlobalOrchestrator
+        orchestrator = GlobalOrchestrator()
+        started = time.monotonic()
+        result = orchestrator.process_query("Create contact for quick@example.com with first name Quick")
+        elapsed = time.monotonic() - started
+
+        assert "Contact created successfully" in result
+        assert "queued for delivery" in result
+        assert elapsed < 1.0
+        assert orchestrator.email_agent.flush_notifications(timeout=10)
+        orchestrator.email_agent.outbox.close()
+        assert smtp.messages[0]["to"] == ["quick@example.com"]
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Test the parse-once query front end and its intent dispatch table
+"""
+
+import dataclasses
+import json
+import sys
+
+import pytest
+
+from agents import query_parser
+from agents.query_parser import IntentRule, parse_query, register_intent
+from benchmarks.parser_bench import run_parser
+from tools.fake_hubspot import FakeHubSpotServer
+
+
+@pytest.mark.parametrize("query, intent, properties", [
+    ("Create a new contact for john@example.com with first name John and last name Doe",
+     "create_contact", {"email": "john@example.com", "firstname": "John", "lastname": "Doe"}),
+    ("Create contact x@y.com phone: (555) 123-4567", "create_contact", {"email": "x@y.com", "phone": "5551234567"}),
+    ("Create contact ab@cd.com ref 123456", "create_contact", {"email": "ab@cd.com", "phone": "123456"}),
+    ("Update contact john@example.com phone number to 555-1234 first name to Jim",
+     "update_contact", {"phone": "5551234", "firstname": "Jim"}),
+    ("Find contact with email john@example.com", "search_contact", {}),
+    ("Remove contact a@b.co", "delete_contact", {}),
+    ("Create a new deal for Acme Corp, amount $5,000.50 owner@acme.io",
+     "create_deal", {"dealname": "Acme Corp", "amount": "5000.50"}),
+    ("Update phone number to 555-1234 for john@example.com", None, {}),
+])
+def test_intents_and_fields(query, intent, properties):
+    parsed = parse_query(query)
+    assert parsed.intent == intent
+    assert dict(parsed.properties) == properties
+
+
+def test_parsed_query_is_immutable_and_cached():
+    parsed = parse_query("Lookup contact 99999 first@x.com and second@y.org in HubSpot")
+    assert parsed.emails == ("first@x.com", "second@y.org")
+    assert parsed.email == "first@x.com"
+    assert parsed.is_crm and parsed.intent == "search_contact"
+    assert parse_query("Lookup contact 99999 first@x.com and second@y.org in HubSpot") is parsed
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        parsed.intent = "delete_contact"
+    with pytest.raises(TypeError):
+        parsed.properties["email"] = "other@x.com"
+    assert not parse_query("What's the weather like?").is_crm
+
+
+def test_register_intent_extends_dispatch(monkeypatch):
+    monkeypatch.setattr(query_parser, "INTENT_RULES", list(query_parser.INTENT_RULES))
+    assert parse_query("Archive contact old@x.com").intent is None
+
+    register_intent(IntentRule("archive_contact", "contact", all_of=("archive", "contact"),
+                               extract=lambda text, email: {"email": email}), before="search_contact")
+    parsed = parse_query("Archive contact old@x.com")
+    assert parsed.intent == "archive_contact"
+    assert dict(parsed.properties) == {"email": "old@x.com"}
+
+    monkeypatch.undo()
+    query_parser._KEYWORDS = query_parser._compile_keywords()
+    parse_query.cache_clear()
+    assert parse_query("Archive contact old@x.com").intent is None
+
+
+def test_orchestrator_parses_once(tmp_path, monkeypatch):
+    server = FakeHubSpotServer().start()
+    config_path = tmp_path / "api_config.json"
+    config_path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test"},
+        "hubspot": {"api_key": "pat-test", "base_url": server.base_url},
+        "email": {"outbox_enabled": False, "digest_window": 0, "smtp_server": "127.0.0.1", "smtp_port": 9},
+    }))
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", str(config_path))
+
+    from agents.orchestrator import GlobalOrchestrator
+    orchestrator = GlobalOrchestrator()
+    calls = []
+    original = query_parser.parse_query
+    monkeypatch.setattr("agents.orchestrator.parse_query", lambda text: calls.append(text) or original(text))
+    monkeypatch.setattr("agents.hubspot_agent.parse_query", lambda text: calls.append(text) or original(text))
+
+    result = orchestrator.hubspot_agent.process_request(original("Create contact parse@once.com first name Pat"))
+    result += orchestrator.process_query("Find contact parse@once.com")
+    server.stop()
+    assert "Contact created successfully" in result
+    assert "Email: parse@once.com" in result
+    assert calls == ["Find contact parse@once.com"]
+
+
+def test_parser_benchmark_smoke():
+    result = run_parser(queries=300, repeats=1)
+    assert result["scenario"] == "parser"
+    assert result["queries"] == 300
+    assert result["parses_per_second"] > 0
+    assert result["cached_us_per_query"] < result["uncached_us_per_query"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Test the pooled SMTP connections used by EmailTools
+"""
+
+import json
+import socket
+from email.message import EmailMessage
+
+import pytest
+
+from tools.email_tools import EmailTools
+from tools.fake_smtp import FakeSMTPServer
+from tools.smtp_pool import SMTPPool
+from utils.config_loader import ConfigLoader
+
+
+def _message(to_email: str) -> EmailMessage:
+    message = EmailMessage()
+    message['From'] = "bot@example.com"
+    message['To'] = to_email
+    message['Subject'] = "CRM Action Completed"
+    message.set_content("Done")
+    return message
+
+
+def test_thousand_notifications_need_a_handful_of_logins(tmp_path):
+    with FakeSMTPServer() as smtp:
+        path = tmp_path / "api_config.json"
+        path.write_text(json.dumps({"email": {"smtp_server": smtp.host, "smtp_port": smtp.port, "use_tls": False,
+                                              "email": "bot@example.com", "password": "secret"}}))
+        email_tools = EmailTools(ConfigLoader(str(path)))
+        for i in range(1000):
+            assert email_tools.send_email(f"user{i}@example.com", "Hi", "Body")["status"] == "success"
+        stats = email_tools.get_pool_stats()
+        server_stats = smtp.get_stats()
+    assert server_stats["messages"] == 1000
+    assert server_stats["commands"]["AUTH"] == stats["logins"] <= 10
+    assert stats["recycled"] == 10
+
+
+def test_dead_connection_is_replaced_once(tmp_path):
+    with FakeSMTPServer() as smtp:
+        pool = SMTPPool(smtp.host, smtp.port, "bot@example.com", "secret", use_tls=False)
+        pool.send_message(_message("first@example.com"))
+        pool._idle[0].smtp.sock.shutdown(socket.SHUT_RDWR)
+        pool.send_message(_message("second@example.com"))
+        stats = pool.get_stats()
+        pool.close()
+        assert [message["to"] for message in smtp.messages] == [["first@example.com"], ["second@example.com"]]
+    assert stats["reconnects"] == 1
+    assert stats["connections_opened"] == 2
+
+
+def test_idle_connections_are_checked_and_expired(tmp_path):
+    with FakeSMTPServer() as smtp:
+        pool = SMTPPool(smtp.host, smtp.port, use_tls=False, health_check_after=0)
+        pool.send_message(_message("a@example.com"))
+        pool.send_message(_message("b@example.com"))
+        assert pool.get_stats()["health_checks"] == 1
+        assert smtp.get_stats()["commands"]["NOOP"] == 1
+
+        pool.idle_timeout = 0
+        pool.send_message(_message("c@example.com"))
+        stats = pool.get_stats()
+        pool.close()
+    assert stats["idle_closed"] == 1
+    assert stats["connections_opened"] == 2
+
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Test that startup stays lazy: no langchain import until an LLM is used, one shared client
+"""
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks.startup_bench import parse_importtime, run_startup
+
+
+def _config(tmp_path):
+    path = tmp_path / "api_config.json"
+    path.write_text(json.dumps({
+        "openai": {"api_key": "sk-test", "model": "gpt-4o-mini"},
+        "hubspot": {"api_key": "pat-test", "base_url": "http://127.0.0.1:9"},
+        "email": {"outbox_path": str(tmp_path / "outbox.db")},
+    }))
+    return str(path)
+
+
+def test_orchestrator_starts_without_langchain(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(tmp_path))
+    script = ("import sys; from agents.orchestrator import GlobalOrchestrator; GlobalOrchestrator(); "
+              "print(sorted({m.split('.')[0] for m in sys.modules} & {'langchain_openai', 'openai', 'httpx'}))")
+    completed = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert completed.stdout.strip() == "[]"
+
+
+def test_agents_share_one_llm_client(tmp_path, monkeypatch):
+    monkeypatch.setenv("HUBSPOT_AGENT_CONFIG", _config(tmp_path))
+    from agents.orchestrator import GlobalOrchestrator
+    orchestrator = GlobalOrchestrator()
+    assert orchestrator.llm is orchestrator.hubspot_agent.llm
+    assert orchestrator.llm.model_name == "gpt-4o-mini"
+
+
+def test_startup_benchmark_reports_import_breakdown():
+    rows = parse_importtime("import time:       298 |       6227 |   utils\nimport time: self [us] | cumulative | imported package")
+    assert rows == [("utils", 298, 6227, 1)]
+
+    result = run_startup(runs=2, top=5)
+    assert result["runs"] == 1
+    assert result["cold_start_ms"] >= result["import_ms"] > 0
+    assert not result["langchain_loaded_at_startup"]
+    assert "agents" in result["slowest_imports_ms"]
+
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
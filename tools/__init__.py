@@ -1,4 +1,4 @@
-from .hubspot_tools import HubSpotTools
+from .hubspot_tools import HubSpotTools, HubSpotAPIError
 from .email_tools import EmailTools
 
-__all__ = ['HubSpotTools', 'EmailTools']
\ No newline at end of file
+__all__ = ['HubSpotTools', 'HubSpotAPIError', 'EmailTools']
\ No newline at end of file
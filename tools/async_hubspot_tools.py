@@ -0,0 +1,297 @@
+import asyncio
+import socket
+from typing import Dict, Any, Optional, Iterable, List, Tuple, Callable
+from urllib.parse import quote
+
+import httpx
+
+from utils.config_loader import ConfigLoader, get_shared_config
+from tools.hubspot_tools import (
+    HubSpotAPIError, HubSpotClientBase, BATCH_SIZE, CONTACT_PROPERTIES, READ_BY_EMAIL_BODY,
+    _chunked, _match_batch_response, _coerce_properties, _email_matches, _email_search,
+    _create_input, _update_input, _id_input, _upsert_input
+)
+from tools.rate_limiter import RateLimitExceeded
+
+
+def _close_stranded(client: httpx.AsyncClient):
+    """Shut down the pooled connections of a client whose event loop is gone.
+
+    aclose() would have to run on that loop, so each socket is shut down
+    directly; the file descriptors go with the client.
+    """
+    pool = getattr(client._transport, '_pool', None)
+    for connection in getattr(pool, 'connections', []):
+        stream = getattr(getattr(connection, '_connection', None), '_network_stream', None)
+        sock = stream.get_extra_info('socket') if stream is not None else None
+        if sock is None:
+            continue
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class AsyncHubSpotTools(HubSpotClientBase):
+    """asyncio counterpart of HubSpotTools.
+
+    Uses one pooled httpx.AsyncClient and one concurrency limiter shared by
+    every task on the event loop. Rate-limit buckets and the contact id cache
+    are the same process-wide objects HubSpotTools uses, so sync and async
+    callers stay within one budget.
+    """
+
+    def __init__(self, config: Optional[ConfigLoader] = None):
+        self.config = config or get_shared_config()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._limiter: Optional[asyncio.Semaphore] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._retired_clients: List[httpx.AsyncClient] = []
+        self._apply_config(self.config.get_hubspot_config())
+        self.config.subscribe('hubspot', self._apply_config)
+
+    def _apply_config(self, hubspot_config: Dict[str, Any]):
+        """(Re)build credentials and limiters; the HTTP client is replaced on next use"""
+        self._apply_settings(hubspot_config)
+        self.timeout = httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+        self._client_outdated = True
+
+    def _ensure_client(self) -> Tuple[httpx.AsyncClient, asyncio.Semaphore]:
+        """Create the client and limiter for the running loop (asyncio objects are loop-bound)"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop or self._client_outdated:
+            if self._client is not None and self._loop is loop:
+                # Settings changed: in-flight requests finish on the old client, closed in aclose()
+                self._retired_clients.append(self._client)
+            elif self._client is not None:
+                # The loop changed: the old client can't be awaited from this one
+                _close_stranded(self._client)
+            self._client_outdated = False
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=self.headers,
+                timeout=self.timeout,
+                limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+            )
+            self._limiter = asyncio.Semaphore(self.scheduler.max_in_flight)
+            self._loop = loop
+        return self._client, self._limiter
+
+    async def aclose(self):
+        for client in self._retired_clients:
+            await client.aclose()
+        self._retired_clients = []
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def _acquire_tokens(self):
+        while True:
+            pause = self.scheduler.pause_remaining()
+            if pause > 0:
+                await asyncio.sleep(pause)
+                continue
+            if self.scheduler.daily_bucket.try_acquire() > 0:
+                raise RateLimitExceeded("HubSpot daily request limit reached")
+            while True:
+                wait = self.scheduler.burst_bucket.try_acquire()
+                if wait == 0.0:
+                    break
+                await asyncio.sleep(wait)
+            self.scheduler.record_request()
+            return
+
+    async def _make_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None,
+                            idempotent: Optional[bool] = None, idempotency_key: Optional[str] = None,
+                            params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make API request to HubSpot; same retry rules as HubSpotTools._make_request"""
+        method, retryable, extra_headers = self._request_options(method, idempotent, idempotency_key)
+        headers = extra_headers or None
+        if method == 'GET':
+            params = dict(data or {}, **(params or {}))
+            data = None
+        client, limiter = self._ensure_client()
+
+        attempt = 0
+        while True:
+            try:
+                async with limiter:
+                    await self._acquire_tokens()
+                    self.scheduler.record_in_flight(1)
+                    try:
+                        response = await client.request(
+                            method, endpoint, headers=headers, params=params,
+                            json=data if method in ('POST', 'PATCH') else None
+                        )
+                    finally:
+                        self.scheduler.record_in_flight(-1)
+            except httpx.HTTPError as e:
+                error = self._connection_error(e)
+            else:
+                try:
+                    return self._parse_response(response)
+                except HubSpotAPIError as e:
+                    error = e
+
+            delay = self._retry_delay(error, retryable, attempt)
+            if delay is None:
+                raise error
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def create_contact(self, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new contact in HubSpot"""
+        data = {"properties": _coerce_properties(properties, 'email')}
+        return self._remember_contact(await self._make_request("/crm/v3/objects/contacts", 'POST', data))
+
+    async def update_contact(self, contact_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Update an existing contact in HubSpot"""
+        properties = _coerce_properties(properties, 'email')
+        if 'email' in properties:
+            self.contact_cache.invalidate_id(contact_id)
+        return self._remember_contact(await self._make_request(f"/crm/v3/objects/contacts/{contact_id}", 'PATCH',
+                                                               {"properties": properties}, idempotent=True))
+
+    async def search_contact(self, email: str) -> Optional[Dict[str, Any]]:
+        """Search for contact by email, reading by cached id when possible"""
+        contact_id = self.contact_cache.get(email)
+        if contact_id:
+            contact = await self.get_contact(contact_id)
+            if _email_matches(contact, email):
+                return contact
+            self.contact_cache.invalidate(email)
+
+        return self._first_result(await self._make_request("/crm/v3/objects/contacts/search", 'POST',
+                                                           _email_search(email), idempotent=True))
+
+    async def get_contact(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        """Read a contact by id; returns None if it does not exist"""
+        try:
+            return await self._make_request(f"/crm/v3/objects/contacts/{contact_id}", 'GET',
+                                            params={"properties": CONTACT_PROPERTIES})
+        except HubSpotAPIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+
+    async def get_contact_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Read a contact by email from the object store (not the lagging search index)"""
+        endpoint = f"/crm/v3/objects/contacts/{quote(email, safe='')}"
+        try:
+            contact = await self._make_request(endpoint, 'GET',
+                                               params={"idProperty": "email", "properties": CONTACT_PROPERTIES})
+            return self._remember_contact(contact)
+        except HubSpotAPIError as e:
+            if e.status_code == 404:
+                self.contact_cache.invalidate(email)
+                return None
+            raise
+
+    async def resolve_contact_id(self, email: str) -> Optional[str]:
+        """Return the contact id for email, from the cache when possible"""
+        contact_id = self.contact_cache.get(email)
+        if contact_id:
+            return contact_id
+        contact = await self.get_contact_by_email(email)
+        return contact.get('id') if contact else None
+
+    async def update_contact_by_email(self, email: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a contact addressed by email in a single PATCH; raises HubSpotAPIError 404 if missing"""
+        properties = _coerce_properties(properties, 'email')
+        endpoint = f"/crm/v3/objects/contacts/{quote(email, safe='')}"
+        try:
+            result = await self._make_request(endpoint, 'PATCH', {"properties": properties},
+                                              idempotent=True, params={"idProperty": "email"})
+        except HubSpotAPIError as e:
+            if e.status_code == 404:
+                self.contact_cache.invalidate(email)
+            raise
+        return self._updated_by_email(email, properties, result)
+
+    async def upsert_contact(self, email: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the contact with this email or update it if it exists, in one request"""
+        results = await self.upsert_contacts_batch([dict(properties, email=email)])
+        if results[0]["status"] == "error":
+            raise HubSpotAPIError(results[0]["error"])
+        return results[0]["result"]
+
+    async def delete_contact(self, contact_id: str) -> Dict[str, Any]:
+        """Delete a contact from HubSpot"""
+        self.contact_cache.invalidate_id(contact_id)
+        return await self._make_request(f"/crm/v3/objects/contacts/{contact_id}", 'DELETE')
+
+    async def create_deal(self, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a new deal in HubSpot"""
+        data = {"properties": _coerce_properties(properties, 'dealname')}
+        return await self._make_request("/crm/v3/objects/deals", 'POST', data)
+
+    async def _run_batch(self, object_type: str, action: str, items: Iterable[Any],
+                         build_input: Callable[[int, Any], Dict[str, Any]], idempotent: bool,
+                         body: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Send items to a batch endpoint in chunks of BATCH_SIZE, all chunks sharing the limiter"""
+        endpoint = f"/crm/v3/objects/{object_type}/batch/{action}"
+
+        async def send_chunk(chunk: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+            inputs = [build_input(index, item) for index, item in chunk]
+            try:
+                response = await self._make_request(endpoint, 'POST', dict(body or {}, inputs=inputs), idempotent=idempotent)
+            except Exception as e:
+                return [{"index": index, "status": "error", "error": str(e)} for index, _ in chunk]
+            return _match_batch_response(chunk, inputs, response)
+
+        results: List[Dict[str, Any]] = []
+        max_pending = self.scheduler.max_in_flight * 2
+        pending = set()
+        for chunk in _chunked(items, BATCH_SIZE):
+            pending.add(asyncio.ensure_future(send_chunk(chunk)))
+            if len(pending) >= max_pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    results.extend(task.result())
+        for chunk_results in await asyncio.gather(*pending):
+            results.extend(chunk_results)
+
+        results.sort(key=lambda entry: entry["index"])
+        return results
+
+    async def create_contacts_batch(self, contacts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many contacts via batch/create, 100 per request"""
+        return self._remember_batch(await self._run_batch('contacts', 'create', contacts, _create_input,
+                                                          idempotent=False))
+
+    async def update_contacts_batch(self, updates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Update many contacts via batch/update; each item is {"id": ..., "properties": {...}}"""
+        return self._remember_batch(await self._run_batch('contacts', 'update', updates, _update_input,
+                                                          idempotent=True))
+
+    async def archive_contacts_batch(self, contact_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Archive (delete) many contacts by id via batch/archive"""
+        return await self._run_batch('contacts', 'archive', self._invalidating(contact_ids), _id_input,
+                                     idempotent=True)
+
+    async def read_contacts_batch_by_email(self, emails: Iterable[str]) -> List[Dict[str, Any]]:
+        """Read many contacts by email via batch/read (the object store, not the lagging search index)"""
+        return self._remember_batch(await self._run_batch('contacts', 'read', emails, _id_input, idempotent=True,
+                                                          body=READ_BY_EMAIL_BODY))
+
+    async def resolve_contact_ids(self, emails: Iterable[str],
+                                  errors: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        """Map each (lowercased) email to its contact id; failed reads other than "not found" go to errors"""
+        ids, missing = self._cached_ids(emails)
+        return self._fill_ids(ids, missing, await self.read_contacts_batch_by_email(missing) if missing else [],
+                              errors)
+
+    async def upsert_contacts_batch(self, contacts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create-or-update many contacts keyed by their "email" property via batch/upsert"""
+        return self._remember_batch(await self._run_batch('contacts', 'upsert', contacts, _upsert_input,
+                                                          idempotent=True))
+
+    async def create_deals_batch(self, deals: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many deals via batch/create, 100 per request"""
+        return await self._run_batch('deals', 'create', deals, _create_input, idempotent=False)
@@ -0,0 +1,290 @@
+import csv
+import io
+import json
+import os
+import re
+import time
+from itertools import islice
+from typing import Dict, Any, Optional, Iterator, Tuple, List
+
+# Normalized column header -> HubSpot property, for headers that don't normalize to the property name
+COLUMN_ALIASES = {
+    "emailaddress": "email",
+    "mail": "email",
+    "first": "firstname",
+    "givenname": "firstname",
+    "last": "lastname",
+    "surname": "lastname",
+    "familyname": "lastname",
+    "phonenumber": "phone",
+    "telephone": "phone",
+    "mobile": "mobilephone",
+    "mobilenumber": "mobilephone",
+    "company": "company",
+    "companyname": "company",
+    "deal": "dealname",
+    "dealtitle": "dealname",
+    "value": "amount",
+}
+
+
+class _CountingReader(io.RawIOBase):
+    """Raw reader that counts bytes handed to the text layer, for progress/ETA"""
+
+    def __init__(self, raw):
+        self.raw = raw
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        count = self.raw.readinto(buffer)
+        self.bytes_read += count or 0
+        return count
+
+    def close(self):
+        self.raw.close()
+        super().close()
+
+
+class MalformedRow:
+    """Stands in for a JSONL line that is not a JSON object, so it can be reported as a failed row"""
+
+    def __init__(self, line: str, error: str):
+        self.line = line
+        self.error = error
+
+
+def normalize_column(column: str) -> str:
+    """Turn a header such as "First Name" or "E-mail" into a HubSpot property name"""
+    key = re.sub(r'[^a-z0-9]', '', column.lower())
+    return COLUMN_ALIASES.get(key, key)
+
+
+def iter_rows(path: str, file_format: Optional[str] = None) -> Tuple[Iterator[Dict[str, Any]], _CountingReader]:
+    """Stream rows of a CSV or JSONL file as dicts, one at a time.
+
+    Returns the row iterator and the byte counter of the underlying file.
+    A JSONL line that can't be parsed is yielded as a MalformedRow.
+    """
+    file_format = file_format or ('jsonl' if path.lower().endswith(('.jsonl', '.ndjson')) else 'csv')
+    counter = _CountingReader(open(path, 'rb', buffering=0))
+    text = io.TextIOWrapper(io.BufferedReader(counter), encoding='utf-8-sig', newline='')
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        with text:
+            if file_format == 'jsonl':
+                for line in text:
+                    if not line.strip():
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except ValueError as e:
+                        yield MalformedRow(line.rstrip('\r\n'), f"Malformed JSON: {e}")
+                        continue
+                    if isinstance(row, dict):
+                        yield row
+                    else:
+                        yield MalformedRow(line.rstrip('\r\n'), "Expected a JSON object")
+            else:
+                yield from csv.DictReader(text)
+
+    return rows(), counter
+
+
+class BulkImporter:
+    """Stream a CSV/JSONL file into HubSpot through the batch endpoints.
+
+    Rows are sent in windows. The checkpoint marks a window as pending before
+    it is sent and as committed once it completes, so a crashed import resumes
+    after the last committed window with its counters intact. Contacts are
+    upserted by email by default, which makes replaying a pending window
+    harmless; in create mode a pending window is never created twice (see
+    _replay_pending).
+    """
+
+    def __init__(self, hubspot_tools, object_type: str = 'contacts', mode: str = 'upsert',
+                 mapping: Optional[Dict[str, str]] = None, window_size: int = 1000,
+                 checkpoint_path: Optional[str] = None, error_path: Optional[str] = None):
+        if object_type == 'deals' and mode != 'create':
+            raise ValueError("Deals can only be imported with mode 'create'")
+        self.hubspot_tools = hubspot_tools
+        self.object_type = object_type
+        self.mode = mode
+        self.mapping = mapping or {}
+        self.window_size = window_size
+        self.checkpoint_path = checkpoint_path
+        self.error_path = error_path
+
+    def map_row(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """Map a source row to HubSpot properties; explicit mapping wins, empty targets drop a column"""
+        properties = {}
+        for column, value in row.items():
+            if column is None or value is None or value == '':
+                continue
+            target = self.mapping[column] if column in self.mapping else normalize_column(column)
+            if target:
+                properties[target] = value.strip() if isinstance(value, str) else value
+        if 'email' in properties:
+            properties['email'] = str(properties['email']).lower()
+        return properties
+
+    def _load_checkpoint(self, path: str) -> Dict[str, Any]:
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return {}
+        with open(self.checkpoint_path, 'r') as file:
+            checkpoint = json.load(file)
+        if checkpoint.get('source') != os.path.abspath(path) or checkpoint.get('object_type') != self.object_type:
+            return {}
+        return checkpoint
+
+    def _save_checkpoint(self, path: str, stats: Dict[str, Any], pending_through: Optional[int] = None):
+        """Record committed rows and counters; pending_through marks a window that is being sent"""
+        if not self.checkpoint_path:
+            return
+        checkpoint = {
+            "source": os.path.abspath(path),
+            "object_type": self.object_type,
+            "rows_committed": stats["rows_committed"],
+            "pending_through": pending_through,
+            "succeeded": stats["succeeded"],
+            "failed": stats["failed"],
+            "updated_at": time.time(),
+        }
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(checkpoint, file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _send_window(self, window: List[Tuple[int, Dict[str, Any]]],
+                     mode: Optional[str] = None) -> List[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+        """Send one window of (row number, properties); returns failures as (row, properties, outcome)"""
+        mode = mode or self.mode
+        upsert = self.object_type == 'contacts' and mode == 'upsert'
+        failures = []
+        sendable = []
+        for row_number, properties in window:
+            if upsert and not properties.get('email'):
+                failures.append((row_number, properties, {"status": "error", "error": "Missing email"}))
+            else:
+                sendable.append((row_number, properties))
+
+        if upsert:
+            # One input per email (the batch endpoint rejects duplicates): the last row wins
+            # and earlier rows for the same email share its outcome
+            latest = {properties['email']: position for position, (_, properties) in enumerate(sendable)}
+            winners = sorted(latest.values())
+        else:
+            winners = list(range(len(sendable)))
+
+        records = [sendable[position][1] for position in winners]
+        if self.object_type == 'deals':
+            outcomes = self.hubspot_tools.create_deals_batch(records)
+        elif mode == 'create':
+            outcomes = self.hubspot_tools.create_contacts_batch(records)
+        else:
+            outcomes = self.hubspot_tools.upsert_contacts_batch(records)
+
+        by_position = dict(zip(winners, outcomes))
+        for position, (row_number, properties) in enumerate(sendable):
+            outcome = by_position[latest[properties['email']] if upsert else position]
+            if outcome["status"] != "success":
+                failures.append((row_number, properties, outcome))
+        return failures
+
+    def _replay_pending(self, window: List[Tuple[int, Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+        """Resend a window that was in flight when the previous run stopped.
+
+        In upsert mode it is simply sent again. Created records may already
+        exist, so contacts are upserted by email instead, and rows that cannot
+        be matched (deals, contacts without an email) are reported as failed
+        for manual review rather than risking duplicates.
+        """
+        if self.mode == 'upsert':
+            return self._send_window(window)
+        uncertain = {"status": "error", "error": "Interrupted while being created; not retried to avoid duplicates"}
+        if self.object_type == 'deals':
+            return [(row_number, properties, uncertain) for row_number, properties in window]
+        matched = [(row_number, properties) for row_number, properties in window if properties.get('email')]
+        failures = [(row_number, properties, uncertain) for row_number, properties in window
+                    if not properties.get('email')]
+        return failures + self._send_window(matched, mode='upsert')
+
+    def run(self, path: str, file_format: Optional[str] = None, resume: bool = True,
+            progress_interval: float = 2.0) -> Dict[str, Any]:
+        """Import the file, printing throughput and ETA; returns final counters"""
+        checkpoint = self._load_checkpoint(path) if resume else {}
+        skip = int(checkpoint.get('rows_committed', 0))
+        pending_through = checkpoint.get('pending_through')
+        total_bytes = os.path.getsize(path)
+        rows, counter = iter_rows(path, file_format)
+        stats = {"rows_committed": skip, "succeeded": int(checkpoint.get('succeeded', 0)),
+                 "failed": int(checkpoint.get('failed', 0)), "skipped": skip}
+        if skip:
+            print(f"⏩ Resuming after row {skip}")
+            for _ in islice(rows, skip):
+                pass
+
+        # A fresh run (or --restart) starts a new error file; a resumed run adds to it
+        error_file = open(self.error_path, 'a' if checkpoint else 'w') if self.error_path else None
+        start_bytes = counter.bytes_read
+        started = time.monotonic()
+        last_report = started
+        row_number = skip
+        try:
+            # A window left pending by the previous run is replayed on its own, exactly as it was sent
+            replay = pending_through is not None and pending_through > skip
+            while True:
+                window = []
+                malformed = []
+                for row in islice(rows, pending_through - skip if replay else self.window_size):
+                    row_number += 1
+                    if isinstance(row, MalformedRow):
+                        malformed.append((row_number, {}, {"status": "error", "error": row.error, "line": row.line}))
+                    else:
+                        window.append((row_number, self.map_row(row)))
+                if not window and not malformed:
+                    break
+
+                if not window:
+                    failures = []
+                elif replay:
+                    failures = self._replay_pending(window)
+                else:
+                    self._save_checkpoint(path, stats, pending_through=row_number)
+                    failures = self._send_window(window)
+                replay = False
+                failures += malformed
+                stats["failed"] += len(failures)
+                stats["succeeded"] += len(window) + len(malformed) - len(failures)
+                stats["rows_committed"] = row_number
+                if error_file:
+                    for failed_row, properties, outcome in sorted(failures, key=lambda failure: failure[0]):
+                        record = {"row": failed_row, "properties": properties, "error": outcome.get("error")}
+                        if "line" in outcome:
+                            record["line"] = outcome["line"]
+                        error_file.write(json.dumps(record) + "\n")
+                    error_file.flush()
+                self._save_checkpoint(path, stats)
+
+                now = time.monotonic()
+                if now - last_report >= progress_interval:
+                    self._report(stats, counter.bytes_read - start_bytes, total_bytes - start_bytes, now - started)
+                    last_report = now
+        finally:
+            if error_file:
+                error_file.close()
+
+        stats["elapsed_seconds"] = round(time.monotonic() - started, 3)
+        self._report(stats, 1, 1, stats["elapsed_seconds"])
+        return stats
+
+    def _report(self, stats: Dict[str, Any], bytes_read: int, total_bytes: int, elapsed: float):
+        """Print progress; bytes are counted from where this run started"""
+        processed = stats["succeeded"] + stats["failed"]
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        fraction = bytes_read / total_bytes if total_bytes else 1.0
+        eta = elapsed * (1 - fraction) / fraction if 0 < fraction < 1 else 0.0
+        print(f"📦 {stats['rows_committed']} rows committed ({fraction:.0%}) | "
+              f"✅ {stats['succeeded']} ❌ {stats['failed']} | {rate:.0f} rows/s | ETA {eta:.0f}s")
@@ -0,0 +1,149 @@
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+
+class ContactIdCache:
+    """Bounded email -> contact id cache with TTL and LRU eviction.
+
+    When db_path is given, entries are also written through to SQLite so a
+    restarted process (REPL, Streamlit) starts warm.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: float = 3600, db_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.db_path = db_path
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._emails_by_id: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "disk_hits": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+        self._db = self._open_db(db_path) if db_path else None
+
+    def _open_db(self, db_path: str) -> sqlite3.Connection:
+        db = sqlite3.connect(db_path, check_same_thread=False)
+        db.execute("CREATE TABLE IF NOT EXISTS contact_ids (email TEXT PRIMARY KEY, contact_id TEXT NOT NULL, expires_at REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS contact_ids_by_id ON contact_ids (contact_id)")
+        db.execute("DELETE FROM contact_ids WHERE expires_at < ?", (time.time(),))
+        db.commit()
+        return db
+
+    @staticmethod
+    def _normalize(email: str) -> str:
+        return email.strip().lower()
+
+    def get(self, email: str) -> Optional[str]:
+        """Return the cached contact id for email, or None on a miss"""
+        key = self._normalize(email)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                contact_id, expires_at = entry
+                if expires_at >= now:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return contact_id
+                self._remove(key)
+                self._stats["expirations"] += 1
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT contact_id, expires_at FROM contact_ids WHERE email = ?", (key,)
+                ).fetchone()
+                if row and row[1] >= now:
+                    self._insert(key, row[0], row[1])
+                    self._stats["disk_hits"] += 1
+                    return row[0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, email: str, contact_id: str):
+        """Remember the contact id for email (write-through to disk if enabled)"""
+        if not email or not contact_id:
+            return
+        key = self._normalize(email)
+        contact_id = str(contact_id)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._insert(key, contact_id, expires_at)
+            if self._db is not None:
+                self._db.execute("DELETE FROM contact_ids WHERE contact_id = ? AND email != ?", (contact_id, key))
+                self._db.execute("INSERT OR REPLACE INTO contact_ids VALUES (?, ?, ?)", (key, contact_id, expires_at))
+                self._db.commit()
+
+    def invalidate(self, email: str):
+        key = self._normalize(email)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+            if self._db is not None:
+                self._db.execute("DELETE FROM contact_ids WHERE email = ?", (key,))
+                self._db.commit()
+
+    def invalidate_id(self, contact_id: str):
+        """Drop whichever email currently maps to contact_id"""
+        contact_id = str(contact_id)
+        with self._lock:
+            key = self._emails_by_id.get(contact_id)
+            if key is not None:
+                self._remove(key)
+                self._stats["invalidations"] += 1
+            if self._db is not None:
+                self._db.execute("DELETE FROM contact_ids WHERE contact_id = ?", (contact_id,))
+                self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._emails_by_id.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM contact_ids")
+                self._db.commit()
+
+    def _insert(self, key: str, contact_id: str, expires_at: float):
+        if key in self._entries:
+            self._remove(key)
+        # A contact has one primary email: drop a mapping left over from an email change
+        previous = self._emails_by_id.get(contact_id)
+        if previous is not None and previous in self._entries:
+            self._remove(previous)
+        self._entries[key] = (contact_id, expires_at)
+        self._emails_by_id[contact_id] = key
+        while len(self._entries) > self.max_size:
+            evicted, (evicted_id, _) = self._entries.popitem(last=False)
+            if self._emails_by_id.get(evicted_id) == evicted:
+                del self._emails_by_id[evicted_id]
+            self._stats["evictions"] += 1
+
+    def _remove(self, key: str):
+        contact_id, _ = self._entries.pop(key)
+        if self._emails_by_id.get(contact_id) == key:
+            del self._emails_by_id[contact_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["disk_hits"] + stats["misses"]
+        stats["max_size"] = self.max_size
+        stats["hit_rate"] = round((stats["hits"] + stats["disk_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+_shared_caches: Dict[str, ContactIdCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_contact_cache(key: str, **settings) -> ContactIdCache:
+    """Return the process-wide cache for a portal; settings apply on first creation"""
+    with _shared_lock:
+        cache = _shared_caches.get(key)
+        if cache is None:
+            cache = ContactIdCache(**settings)
+            _shared_caches[key] = cache
+        return cache
@@ -0,0 +1,201 @@
+import csv
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+
+DEFAULT_PROPERTIES = {
+    "contacts": ["email", "firstname", "lastname", "phone"],
+    "deals": ["dealname", "amount", "dealstage", "pipeline", "closedate"],
+}
+
+
+def flatten_record(record: Dict[str, Any], properties: List[str]) -> Dict[str, Any]:
+    """Turn a CRM record into a flat row: id, the requested properties, timestamps"""
+    values = record.get('properties') or {}
+    row = {"id": record.get('id')}
+    for name in properties:
+        row[name] = values.get(name)
+    row["createdAt"] = record.get('createdAt')
+    row["updatedAt"] = record.get('updatedAt')
+    return row
+
+
+class JsonlWriter:
+    def __init__(self, path: str, columns: List[str], offset: Optional[int] = None):
+        self.columns = columns
+        self.file = open(path, 'r+' if offset is not None else 'w', encoding='utf-8')
+        if offset is not None:
+            self.file.truncate(offset)
+            self.file.seek(offset)
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            self.file.write(json.dumps(row) + "\n")
+
+    def checkpoint(self) -> int:
+        """Flush and return the resumable file offset"""
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class CsvWriter:
+    def __init__(self, path: str, columns: List[str], offset: Optional[int] = None):
+        self.columns = columns
+        self.file = open(path, 'r+' if offset is not None else 'w', encoding='utf-8', newline='')
+        if offset is not None:
+            self.file.truncate(offset)
+            self.file.seek(offset)
+        self.writer = csv.DictWriter(self.file, fieldnames=columns)
+        if offset is None:
+            self.writer.writeheader()
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        self.writer.writerows(rows)
+
+    def checkpoint(self) -> int:
+        self.file.flush()
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetWriter:
+    """Columnar output, one row group per page (requires pyarrow).
+
+    Parquet files can't be appended to, so a resumed export continues in a
+    new part file next to the original (name.part1.parquet, ...).
+    """
+
+    def __init__(self, path: str, columns: List[str], offset: Optional[int] = None):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise Exception("Parquet export requires pyarrow: pip install pyarrow")
+        self.pa = pyarrow
+        self.columns = columns
+        self.schema = pyarrow.schema([(column, pyarrow.string()) for column in columns])
+        self.path = path
+        if offset is not None:
+            stem, extension = os.path.splitext(path)
+            part = 1
+            while os.path.exists(f"{stem}.part{part}{extension}"):
+                part += 1
+            self.path = f"{stem}.part{part}{extension}"
+        self.writer = pyarrow.parquet.ParquetWriter(self.path, self.schema)
+        self.rows_written = 0
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        if not rows:
+            return
+        table = self.pa.Table.from_pydict(
+            {column: [None if row.get(column) is None else str(row[column]) for row in rows]
+             for column in self.columns},
+            schema=self.schema
+        )
+        self.writer.write_table(table)
+        self.rows_written += len(rows)
+
+    def checkpoint(self) -> int:
+        return self.rows_written
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {"jsonl": JsonlWriter, "csv": CsvWriter, "parquet": ParquetWriter}
+
+
+class CrmExporter:
+    """Stream every record of an object type to a file without holding the portal in memory.
+
+    The next page is fetched on a background thread while the current one is
+    written. After each page the cursor and file offset are saved to
+    state_path, so an interrupted export resumes from the last written page.
+    """
+
+    def __init__(self, hubspot_tools, object_type: str = 'contacts', properties: Optional[List[str]] = None,
+                 state_path: Optional[str] = None):
+        self.hubspot_tools = hubspot_tools
+        self.object_type = object_type
+        self.properties = properties or DEFAULT_PROPERTIES.get(object_type, [])
+        self.state_path = state_path
+
+    def _load_state(self, output_path: str, file_format: str) -> Optional[Dict[str, Any]]:
+        if not self.state_path or not os.path.exists(self.state_path) or not os.path.exists(output_path):
+            return None
+        with open(self.state_path, 'r') as file:
+            state = json.load(file)
+        expected = (self.object_type, os.path.abspath(output_path), file_format, self.properties)
+        actual = (state.get('object_type'), state.get('output'), state.get('format'), state.get('properties'))
+        return state if actual == expected and state.get('after') else None
+
+    def _save_state(self, output_path: str, file_format: str, after: Optional[str], rows: int, offset: int):
+        if not self.state_path:
+            return
+        state = {
+            "object_type": self.object_type,
+            "output": os.path.abspath(output_path),
+            "format": file_format,
+            "properties": self.properties,
+            "after": after,
+            "rows": rows,
+            "offset": offset,
+            "updated_at": time.time(),
+        }
+        temp_path = f"{self.state_path}.tmp"
+        with open(temp_path, 'w') as file:
+            json.dump(state, file)
+        os.replace(temp_path, self.state_path)
+
+    def _prefetched_pages(self, after: Optional[str]) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Yield pages while the following page is already being fetched.
+
+        Closing the generator early (the consumer stops or fails) waits for the
+        in-flight fetch, stops the prefetch thread and closes the page walk.
+        """
+        pages = self.hubspot_tools.iter_object_pages(self.object_type, self.properties, after)
+        prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix='crm-export-prefetch')
+        try:
+            upcoming = prefetcher.submit(next, pages, None)
+            while True:
+                page = upcoming.result()
+                if page is None:
+                    return
+                upcoming = prefetcher.submit(next, pages, None)
+                yield page
+        finally:
+            prefetcher.shutdown(wait=True)
+            pages.close()
+
+    def run(self, output_path: str, file_format: str = 'jsonl', resume: bool = True) -> Dict[str, Any]:
+        """Export to output_path; returns row count and timing"""
+        if file_format not in WRITERS:
+            raise ValueError(f"Unsupported export format: {file_format}")
+        state = self._load_state(output_path, file_format) if resume else None
+        after = state['after'] if state else None
+        rows = state['rows'] if state else 0
+        if state:
+            print(f"⏩ Resuming {self.object_type} export after {rows} rows")
+
+        columns = ["id"] + self.properties + ["createdAt", "updatedAt"]
+        writer = WRITERS[file_format](output_path, columns, offset=state['offset'] if state else None)
+        started = time.monotonic()
+        pages = self._prefetched_pages(after)
+        try:
+            for records, next_after in pages:
+                writer.write_rows([flatten_record(record, self.properties) for record in records])
+                rows += len(records)
+                self._save_state(output_path, file_format, next_after, rows, writer.checkpoint())
+        finally:
+            pages.close()
+            writer.close()
+
+        elapsed = time.monotonic() - started
+        return {"rows": rows, "elapsed_seconds": round(elapsed, 3), "output": getattr(writer, 'path', output_path)}
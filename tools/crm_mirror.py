@@ -0,0 +1,254 @@
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Iterable
+
+# Property holding each object type's last-modified timestamp
+LAST_MODIFIED_PROPERTY = {
+    "contacts": "lastmodifieddate",
+    "deals": "hs_lastmodifieddate",
+}
+# Properties mirrored when the caller doesn't choose
+DEFAULT_PROPERTIES = {
+    "contacts": ["email", "firstname", "lastname", "phone", "lastmodifieddate"],
+    "deals": ["dealname", "amount", "dealstage", "pipeline", "closedate", "hs_lastmodifieddate"],
+}
+# HubSpot search stops paging at 10,000 results per query
+SEARCH_RESULT_CAP = 10000
+# Seconds between sweeps for archived records during delta syncs; a full seed also counts as one
+ARCHIVE_SWEEP_INTERVAL = 3600
+
+
+def _to_epoch_ms(timestamp: str) -> int:
+    return int(datetime.fromisoformat(timestamp.replace('Z', '+00:00')).timestamp() * 1000)
+
+
+class CrmMirror:
+    """Local SQLite copy of CRM objects, kept fresh by delta syncs.
+
+    A full seed walks every record; later syncs only fetch records modified
+    since the stored high-water mark. Archived records never show up in those
+    searches and HubSpot can't list them by archive time, so delta syncs walk
+    the archive at most once per archive_sweep_interval. Reads report how
+    stale the copy is so callers can decide whether to trust it.
+    """
+
+    def __init__(self, db_path: str, archive_sweep_interval: float = ARCHIVE_SWEEP_INTERVAL):
+        self.db_path = db_path
+        self.archive_sweep_interval = archive_sweep_interval
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS objects (
+                    object_type TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    email TEXT,
+                    phone TEXT,
+                    lastmodifieddate TEXT,
+                    properties TEXT NOT NULL,
+                    generation INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (object_type, id)
+                );
+                CREATE INDEX IF NOT EXISTS objects_by_email ON objects (object_type, email);
+                CREATE INDEX IF NOT EXISTS objects_by_phone ON objects (object_type, phone);
+                CREATE INDEX IF NOT EXISTS objects_by_modified ON objects (object_type, lastmodifieddate);
+                CREATE TABLE IF NOT EXISTS sync_state (
+                    object_type TEXT PRIMARY KEY,
+                    high_water_mark TEXT,
+                    generation INTEGER NOT NULL DEFAULT 0,
+                    last_sync_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS archive_sweeps (
+                    object_type TEXT PRIMARY KEY,
+                    swept_at REAL NOT NULL
+                );
+            """)
+            self._db.commit()
+
+    def _state(self, object_type: str) -> Dict[str, Any]:
+        row = self._db.execute(
+            "SELECT high_water_mark, generation, last_sync_at FROM sync_state WHERE object_type = ?", (object_type,)
+        ).fetchone()
+        if not row:
+            return {"high_water_mark": None, "generation": 0, "last_sync_at": None}
+        return {"high_water_mark": row[0], "generation": row[1], "last_sync_at": row[2]}
+
+    def _save_state(self, object_type: str, high_water_mark: Optional[str], generation: int):
+        self._db.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+            (object_type, high_water_mark, generation, time.time())
+        )
+
+    def _last_sweep(self, object_type: str) -> Optional[float]:
+        row = self._db.execute("SELECT swept_at FROM archive_sweeps WHERE object_type = ?", (object_type,)).fetchone()
+        return row[0] if row else None
+
+    def _save_sweep(self, object_type: str, swept_at: float):
+        self._db.execute("INSERT OR REPLACE INTO archive_sweeps VALUES (?, ?)", (object_type, swept_at))
+
+    def upsert_records(self, object_type: str, records: Iterable[Dict[str, Any]], generation: Optional[int] = None,
+                       merge: bool = False) -> Optional[str]:
+        """Store records; returns the newest updatedAt among them.
+
+        With merge=True the incoming properties are laid over the stored ones,
+        for write-through of partial records such as PATCH responses.
+        """
+        newest = None
+        rows = []
+        with self._lock:
+            if generation is None:
+                generation = self._state(object_type)["generation"]
+            for record in records:
+                object_id = str(record['id'])
+                properties = record.get('properties') or {}
+                if merge:
+                    stored = self._db.execute(
+                        "SELECT properties FROM objects WHERE object_type = ? AND id = ?", (object_type, object_id)
+                    ).fetchone()
+                    if stored:
+                        properties = dict(json.loads(stored[0])["properties"], **properties)
+                updated = record.get('updatedAt') or properties.get(LAST_MODIFIED_PROPERTY.get(object_type, ''))
+                email = (properties.get('email') or '').lower() or None
+                phone = ''.join(ch for ch in (properties.get('phone') or '') if ch.isdigit()) or None
+                rows.append((object_type, object_id, email, phone, updated,
+                             json.dumps({"id": object_id, "properties": properties, "updatedAt": updated}),
+                             generation))
+                if updated and (newest is None or updated > newest):
+                    newest = updated
+            self._db.executemany("INSERT OR REPLACE INTO objects VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._db.commit()
+        return newest
+
+    def delete(self, object_type: str, object_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM objects WHERE object_type = ? AND id = ?", (object_type, str(object_id)))
+            self._db.commit()
+
+    def delete_contact_by_email(self, email: str):
+        with self._lock:
+            self._db.execute("DELETE FROM objects WHERE object_type = 'contacts' AND email = ?", (email.lower(),))
+            self._db.commit()
+
+    def sync(self, hubspot_tools, object_type: str = 'contacts', properties: Optional[List[str]] = None,
+             full: bool = False) -> int:
+        """Seed on first use (or when full=True), otherwise run a delta sync"""
+        if full:
+            return self.seed(hubspot_tools, object_type, properties)
+        return self.delta_sync(hubspot_tools, object_type, properties)
+
+    def seed(self, hubspot_tools, object_type: str = 'contacts', properties: Optional[List[str]] = None) -> int:
+        """Full export into the mirror; records not seen in this pass are removed"""
+        properties = properties or DEFAULT_PROPERTIES[object_type]
+        started = time.time()
+        with self._lock:
+            generation = self._state(object_type)["generation"] + 1
+        count = 0
+        high_water_mark = None
+        for records, _ in hubspot_tools.iter_object_pages(object_type, properties):
+            newest = self.upsert_records(object_type, records, generation)
+            if newest and (high_water_mark is None or newest > high_water_mark):
+                high_water_mark = newest
+            count += len(records)
+        with self._lock:
+            self._db.execute("DELETE FROM objects WHERE object_type = ? AND generation < ?", (object_type, generation))
+            self._save_state(object_type, high_water_mark, generation)
+            # Archived records were not in the export, so they are gone from the mirror too
+            self._save_sweep(object_type, started)
+            self._db.commit()
+        return count
+
+    def delta_sync(self, hubspot_tools, object_type: str = 'contacts', properties: Optional[List[str]] = None) -> int:
+        """Fetch records modified since the high-water mark, dropping archived ones when a sweep is due"""
+        properties = properties or DEFAULT_PROPERTIES[object_type]
+        with self._lock:
+            state = self._state(object_type)
+        high_water_mark = state["high_water_mark"]
+        if high_water_mark is None:
+            return self.seed(hubspot_tools, object_type, properties)
+
+        modified_property = LAST_MODIFIED_PROPERTY[object_type]
+        count = 0
+        while True:
+            query_start = high_water_mark
+            filter_groups = [{"filters": [{
+                "propertyName": modified_property,
+                "operator": "GTE",
+                "value": str(_to_epoch_ms(high_water_mark))
+            }]}]
+            sorts = [{"propertyName": modified_property, "direction": "ASCENDING"}]
+            fetched = 0
+            batch = []
+            for record in hubspot_tools.iter_search(object_type, filter_groups, properties=properties, sorts=sorts):
+                batch.append(record)
+                fetched += 1
+                if len(batch) >= 100:
+                    high_water_mark = max(high_water_mark, self.upsert_records(object_type, batch) or high_water_mark)
+                    batch = []
+                if fetched >= SEARCH_RESULT_CAP:
+                    break
+            if batch:
+                high_water_mark = max(high_water_mark, self.upsert_records(object_type, batch) or high_water_mark)
+            count += fetched
+            # Past the search cap, start a new query from the newest timestamp seen
+            if fetched < SEARCH_RESULT_CAP or high_water_mark == query_start:
+                break
+
+        with self._lock:
+            last_sweep = self._last_sweep(object_type)
+        swept_at = None
+        if last_sweep is None or time.time() - last_sweep >= self.archive_sweep_interval:
+            swept_at = time.time()
+            count += self._drop_archived(hubspot_tools, object_type)
+        with self._lock:
+            self._save_state(object_type, high_water_mark, state["generation"])
+            if swept_at is not None:
+                self._save_sweep(object_type, swept_at)
+            self._db.commit()
+        return count
+
+    def _drop_archived(self, hubspot_tools, object_type: str) -> int:
+        """Remove records archived in the CRM (searches never return them); returns how many were mirrored"""
+        removed = 0
+        for records, _ in hubspot_tools.iter_object_pages(object_type, ['hs_object_id'], archived=True):
+            ids = [(object_type, str(record['id'])) for record in records]
+            with self._lock:
+                removed += self._db.executemany("DELETE FROM objects WHERE object_type = ? AND id = ?", ids).rowcount
+                self._db.commit()
+        return removed
+
+    def staleness(self, object_type: str = 'contacts') -> Optional[float]:
+        """Seconds since the last successful sync, or None if never synced"""
+        with self._lock:
+            last_sync_at = self._state(object_type)["last_sync_at"]
+        return None if last_sync_at is None else time.time() - last_sync_at
+
+    def is_fresh(self, object_type: str = 'contacts', max_staleness: float = 300) -> bool:
+        staleness = self.staleness(object_type)
+        return staleness is not None and staleness <= max_staleness
+
+    def _find(self, object_type: str, column: str, value: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT properties FROM objects WHERE object_type = ? AND {column} = ? ORDER BY lastmodifieddate DESC LIMIT 1",
+                (object_type, value)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_contact_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._find('contacts', 'email', email.strip().lower())
+
+    def find_contact_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
+        digits = ''.join(ch for ch in phone if ch.isdigit())
+        return self._find('contacts', 'phone', digits) if digits else None
+
+    def get(self, object_type: str, object_id: str) -> Optional[Dict[str, Any]]:
+        return self._find(object_type, 'id', str(object_id))
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._db.execute("SELECT object_type, COUNT(*) FROM objects GROUP BY object_type").fetchall())
+        return {object_type: {"records": counts.get(object_type, 0), "staleness_seconds": self.staleness(object_type)}
+                for object_type in LAST_MODIFIED_PROPERTY}
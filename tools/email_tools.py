@@ -1,18 +1,40 @@
-import smtplib
 from email.message import EmailMessage
-from typing import Dict, Any
-from utils.config_loader import ConfigLoader
+from typing import Dict, Any, Optional
+from utils.config_loader import ConfigLoader, get_shared_config
+from tools.smtp_pool import get_shared_smtp_pool
 
 class EmailTools:
-    def __init__(self):
-        self.config = ConfigLoader()
+    def __init__(self, config: Optional[ConfigLoader] = None):
+        self.config = config or get_shared_config()
         self.email_config = self.config.get_email_config()
+        self.config.subscribe('email', self._on_config_changed)
+    
+    def _on_config_changed(self, email_config: Dict[str, Any]):
+        # The next send picks up a rebuilt pool if server or credentials changed
+        self.email_config = email_config
+    
+    def _get_pool(self):
+        """Shared authenticated connection pool for the configured account"""
+        smtp_server = self.email_config.get('smtp_server', 'smtp.gmail.com')
+        smtp_port = self.email_config.get('smtp_port', 587)
+        email = self.email_config.get('email')
+        return get_shared_smtp_pool(
+            f"{smtp_server}:{smtp_port}|{email}",
+            host=smtp_server,
+            port=smtp_port,
+            username=email,
+            password=self.email_config.get('password'),
+            # use_tls: false is only for local relays such as tools.fake_smtp
+            use_tls=self.email_config.get('use_tls', True),
+            pool_size=int(self.email_config.get('smtp_pool_size', 2)),
+            idle_timeout=float(self.email_config.get('smtp_idle_timeout', 60)),
+            max_messages_per_connection=int(self.email_config.get('smtp_max_messages_per_connection', 100)),
+            timeout=float(self.email_config.get('smtp_timeout', 30))
+        )
     
     def send_email(self, to_email: str, subject: str, body: str) -> Dict[str, Any]:
-        """Send email notification using simplified approach"""
+        """Send email notification over a pooled SMTP connection"""
         try:
-            smtp_server = self.email_config.get('smtp_server', 'smtp.gmail.com')
-            smtp_port = self.email_config.get('smtp_port', 587)
             email = self.email_config.get('email')
             password = self.email_config.get('password')
             
@@ -26,13 +48,14 @@ class EmailTools:
             msg['Subject'] = subject
             msg.set_content(body)
             
-            # Create server connection and send email
-            with smtplib.SMTP(smtp_server, smtp_port) as server:
-                server.starttls()
-                server.login(email, password)
-                server.send_message(msg)
+            # Reuses a logged-in connection instead of STARTTLS + login per message
+            self._get_pool().send_message(msg)
             
             return {"status": "success", "message": f"Email sent successfully to {to_email}"}
             
         except Exception as e:
-            return {"status": "error", "message": f"Failed to send email: {str(e)}"}
\ No newline at end of file
+            return {"status": "error", "message": f"Failed to send email: {str(e)}"}
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Connections opened, logins, reuse and health-check counters for the SMTP pool"""
+        return self._get_pool().get_stats()
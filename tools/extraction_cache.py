@@ -0,0 +1,106 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+class ExtractionCache:
+    """Bounded query template -> LLM extraction cache with LRU eviction.
+
+    Every entry is held in memory, so a hit is a dict lookup; entries are
+    written through to SQLite so repeated phrasings stay free across restarts.
+    The table is kept to the same max_size as the memory copy, and recency is
+    written back on close() so the next start evicts in the right order.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 10000):
+        self.db_path = db_path
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS extractions (template TEXT PRIMARY KEY, result TEXT NOT NULL, last_used REAL NOT NULL)"
+            )
+            rows = self._db.execute(
+                "SELECT template, result FROM extractions ORDER BY last_used DESC LIMIT ?", (max_size,)
+            ).fetchall()
+            for template, result in reversed(rows):
+                self._entries[template] = json.loads(result)
+            self._db.execute(
+                "DELETE FROM extractions WHERE template NOT IN "
+                "(SELECT template FROM extractions ORDER BY last_used DESC LIMIT ?)", (max_size,)
+            )
+            self._db.commit()
+
+    def get(self, template: str) -> Optional[Dict[str, Any]]:
+        """Return the cached extraction for a template, or None on a miss"""
+        with self._lock:
+            entry = self._entries.get(template)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(template)
+            self._touched[template] = time.time()
+            self._stats["hits"] += 1
+            return entry
+
+    def put(self, template: str, result: Dict[str, Any]):
+        """Remember an extraction (write-through), evicting the least recently used beyond max_size"""
+        with self._lock:
+            self._entries[template] = result
+            self._entries.move_to_end(template)
+            self._db.execute("INSERT OR REPLACE INTO extractions VALUES (?, ?, ?)",
+                             (template, json.dumps(result), time.time()))
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_size:
+                evicted, _ = self._entries.popitem(last=False)
+                self._touched.pop(evicted, None)
+                self._db.execute("DELETE FROM extractions WHERE template = ?", (evicted,))
+                self._stats["evictions"] += 1
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            self._db.execute("DELETE FROM extractions")
+            self._db.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["max_size"] = self.max_size
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+    def close(self):
+        """Persist recency of entries used since they were stored, then close the database"""
+        with self._lock:
+            self._db.executemany("UPDATE extractions SET last_used = ? WHERE template = ?",
+                                 [(used, template) for template, used in self._touched.items()])
+            self._db.commit()
+            self._touched.clear()
+            self._db.close()
+
+
+_shared_caches: Dict[str, ExtractionCache] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_extraction_cache(db_path: str, **settings) -> ExtractionCache:
+    """Return the process-wide extraction cache for a database file; settings apply on first creation"""
+    with _shared_lock:
+        cache = _shared_caches.get(db_path)
+        if cache is None:
+            cache = ExtractionCache(db_path, **settings)
+            _shared_caches[db_path] = cache
+        return cache
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Local HubSpot API stand-in for offline testing and benchmarking
+
+Implements the CRM v3 object, search and batch endpoints HubSpotTools uses,
+backed by in-memory storage, with injectable latency, 429s, 5xx errors and
+search-index lag. Point hubspot.base_url at it to run the whole agent stack
+without a real portal:
+
+    python -m tools.fake_hubspot --port 8765 --latency lognormal:0.05:0.4 --search-lag 2
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import deque, Counter
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from urllib.parse import urlparse, parse_qs, unquote
+
+DEFAULT_PROPERTIES = {
+    "contacts": ["email", "firstname", "lastname", "createdate", "lastmodifieddate", "hs_object_id"],
+    "deals": ["dealname", "amount", "dealstage", "pipeline", "closedate", "createdate",
+              "hs_lastmodifieddate", "hs_object_id"],
+}
+LAST_MODIFIED_PROPERTY = {"contacts": "lastmodifieddate", "deals": "hs_lastmodifieddate"}
+MAX_BATCH_INPUTS = 100
+MAX_PAGE_SIZE = 100
+SEARCH_RESULT_CAP = 10000
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+
+
+def _comparable(value: Any) -> Any:
+    """Compare timestamps as epoch millis and numbers numerically, like HubSpot search"""
+    if value is None:
+        return None
+    text = str(value)
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(text.replace('Z', '+00:00')).timestamp() * 1000
+    except ValueError:
+        return text.lower()
+
+
+class LatencyModel:
+    """Latency distribution parsed from "constant:S", "uniform:MIN:MAX" or "lognormal:MEDIAN:SIGMA" """
+
+    def __init__(self, spec: Optional[str] = None, rng: Optional[random.Random] = None):
+        self.rng = rng or random.Random(0)
+        self.kind, self.params = 'constant', [0.0]
+        if spec:
+            parts = str(spec).split(':')
+            if len(parts) == 1:
+                self.params = [float(parts[0])]
+            else:
+                self.kind, self.params = parts[0], [float(part) for part in parts[1:]]
+        if self.kind not in ('constant', 'uniform', 'lognormal'):
+            raise ValueError(f"Unknown latency distribution: {self.kind}")
+
+    def sample(self) -> float:
+        if self.kind == 'uniform':
+            return self.rng.uniform(self.params[0], self.params[1])
+        if self.kind == 'lognormal':
+            median, sigma = self.params
+            return self.rng.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return self.params[0]
+
+
+class FakeHubSpotState:
+    """In-memory CRM store with a lagging search index"""
+
+    def __init__(self, search_lag: float = 0.0):
+        self.search_lag = search_lag
+        self.lock = threading.RLock()
+        self.objects: Dict[str, Dict[str, Dict[str, Any]]] = {"contacts": {}, "deals": {}}
+        # id -> list of (visible_from, snapshot or None when archived)
+        self.index: Dict[str, Dict[str, List[Tuple[float, Optional[Dict[str, Any]]]]]] = {"contacts": {}, "deals": {}}
+        self.emails: Dict[str, str] = {}
+        # Archived records stay listable with ?archived=true, as in HubSpot
+        self.archived: Dict[str, Dict[str, Dict[str, Any]]] = {"contacts": {}, "deals": {}}
+        self.next_id = 1001
+
+    def _index(self, object_type: str, record: Optional[Dict[str, Any]], object_id: str):
+        visible_from = time.monotonic() + self.search_lag
+        snapshot = json.loads(json.dumps(record)) if record else None
+        versions = self.index[object_type].setdefault(object_id, [])
+        versions.append((visible_from, snapshot))
+        now = time.monotonic()
+        # Keep only the newest version that is already visible plus pending ones
+        while len(versions) > 1 and versions[1][0] <= now:
+            versions.pop(0)
+
+    def find_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        object_id = self.emails.get(email.lower())
+        return self.objects["contacts"].get(object_id) if object_id else None
+
+    def create(self, object_type: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            properties = {key: None if value is None else str(value) for key, value in properties.items()}
+            if object_type == "contacts":
+                email = (properties.get("email") or "").lower()
+                if email:
+                    properties["email"] = email
+                    existing = self.find_by_email(email)
+                    if existing:
+                        raise FakeConflict(f"Contact already exists. Existing ID: {existing['id']}")
+            object_id = str(self.next_id)
+            self.next_id += 1
+            now = _now_iso()
+            properties.update({"createdate": now, LAST_MODIFIED_PROPERTY[object_type]: now, "hs_object_id": object_id})
+            record = {"id": object_id, "properties": properties, "createdAt": now, "updatedAt": now, "archived": False}
+            self.objects[object_type][object_id] = record
+            if object_type == "contacts" and properties.get("email"):
+                self.emails[properties["email"]] = object_id
+            self._index(object_type, record, object_id)
+            return record
+
+    def update(self, object_type: str, record: Dict[str, Any], properties: Dict[str, Any]) -> Dict[str, Any]:
+        with self.lock:
+            properties = {key: None if value is None else str(value) for key, value in properties.items()}
+            if object_type == "contacts" and properties.get("email"):
+                properties["email"] = properties["email"].lower()
+                existing = self.find_by_email(properties["email"])
+                if existing and existing["id"] != record["id"]:
+                    raise FakeConflict(f"Contact already exists. Existing ID: {existing['id']}")
+            if object_type == "contacts" and properties.get("email"):
+                self.emails.pop(record["properties"].get("email") or "", None)
+                self.emails[properties["email"]] = record["id"]
+            now = _now_iso()
+            record["properties"].update(properties)
+            record["properties"][LAST_MODIFIED_PROPERTY[object_type]] = now
+            record["updatedAt"] = now
+            self._index(object_type, record, record["id"])
+            return record
+
+    def archive(self, object_type: str, object_id: str):
+        with self.lock:
+            record = self.objects[object_type].pop(object_id, None)
+            if record is not None:
+                self.archived[object_type][object_id] = dict(record, archived=True, archivedAt=_now_iso())
+                if object_type == "contacts":
+                    self.emails.pop(record["properties"].get("email") or "", None)
+                self._index(object_type, None, object_id)
+
+    def lookup(self, object_type: str, object_id: str, id_property: Optional[str]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            if id_property == "email" and object_type == "contacts":
+                return self.find_by_email(object_id)
+            if id_property and id_property != "hs_object_id":
+                return next((record for record in self.objects[object_type].values()
+                             if record["properties"].get(id_property) == object_id), None)
+            return self.objects[object_type].get(object_id)
+
+    def searchable(self, object_type: str) -> List[Dict[str, Any]]:
+        """Records as the (possibly lagging) search index currently sees them"""
+        now = time.monotonic()
+        with self.lock:
+            visible = []
+            for versions in self.index[object_type].values():
+                current = None
+                for visible_from, snapshot in versions:
+                    if visible_from <= now:
+                        current = (snapshot,)
+                if current and current[0] is not None:
+                    visible.append(current[0])
+            return visible
+
+    def clear(self):
+        with self.lock:
+            for object_type in self.objects:
+                self.objects[object_type].clear()
+                self.archived[object_type].clear()
+                self.index[object_type].clear()
+            self.emails.clear()
+
+
+class FakeConflict(Exception):
+    pass
+
+
+def _compile_filter(filter_spec: Dict[str, Any]) -> Callable[[Dict[str, Any]], bool]:
+    """Build a predicate for one search filter, converting its operand(s) once"""
+    name = filter_spec["propertyName"]
+    operator = filter_spec.get("operator", "EQ")
+    if operator == "HAS_PROPERTY":
+        return lambda record: record["properties"].get(name) not in (None, "")
+    if operator == "NOT_HAS_PROPERTY":
+        return lambda record: record["properties"].get(name) in (None, "")
+    if operator in ("IN", "NOT_IN"):
+        values = {_comparable(item) for item in filter_spec.get("values", [])}
+        wanted = operator == "IN"
+        return lambda record: (_comparable(record["properties"].get(name)) in values) == wanted
+    if operator == "CONTAINS_TOKEN":
+        token = str(filter_spec.get("value", "")).lower().strip('*')
+        return lambda record: token in str(record["properties"].get(name) or "").lower()
+    compare = {
+        "EQ": lambda current, target: current == target,
+        "NEQ": lambda current, target: current != target,
+        "GT": lambda current, target: current > target,
+        "GTE": lambda current, target: current >= target,
+        "LT": lambda current, target: current < target,
+        "LTE": lambda current, target: current <= target,
+    }[operator]
+    target = _comparable(filter_spec.get("value"))
+
+    def predicate(record: Dict[str, Any]) -> bool:
+        value = record["properties"].get(name)
+        if value is None:
+            return operator == "NEQ"
+        try:
+            return compare(_comparable(value), target)
+        except TypeError:
+            return False
+    return predicate
+
+
+class FakeHubSpotHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body go out in separate writes; without this, Nagle plus delayed ACKs add ~40ms per call
+    disable_nagle_algorithm = True
+    server: "FakeHubSpotServer"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def do_PATCH(self):
+        self._dispatch('PATCH')
+
+    def do_DELETE(self):
+        self._dispatch('DELETE')
+
+    def _send(self, status: int, body: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None):
+        payload = json.dumps(body).encode() if body is not None else b''
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _error(self, status: int, message: str, category: str = "VALIDATION_ERROR", **extra):
+        self._send(status, dict({"status": "error", "message": message, "category": category}, **extra))
+
+    def _dispatch(self, method: str):
+        fake = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        length = int(self.headers.get('Content-Length') or 0)
+        raw = self.rfile.read(length) if length else b''
+
+        if url.path == '/__fake__/stats':
+            return self._send(200, fake.get_stats())
+
+        endpoint = re.sub(r'^(/crm/v3/objects/[^/]+/)(?!search$|batch/)[^/]+$', r'\1{id}', url.path)
+        fake.begin_request(f"{method} {endpoint}")
+        try:
+            time.sleep(fake.latency.sample())
+            if not self.headers.get('Authorization', '').startswith('Bearer '):
+                return self._error(401, "Authentication credentials not found", "INVALID_AUTHENTICATION")
+            throttled, retry_after = fake.check_rate_limit()
+            if throttled:
+                return self._send(429, {
+                    "status": "error",
+                    "message": "You have reached your ten_secondly_rolling limit.",
+                    "errorType": "RATE_LIMIT",
+                    "category": "RATE_LIMITS",
+                    "policyName": "TEN_SECONDLY_ROLLING",
+                }, headers={"Retry-After": f"{retry_after:.2f}"})
+            if fake.inject_server_error():
+                return self._error(fake.rng.choice((500, 502, 503)), "Internal error", "INTERNAL_ERROR")
+            try:
+                body = json.loads(raw) if raw else {}
+            except json.JSONDecodeError:
+                return self._error(400, "Invalid input JSON")
+            self._route(method, url.path, query, body)
+        finally:
+            fake.end_request()
+
+    def _route(self, method: str, path: str, query: Dict[str, List[str]], body: Dict[str, Any]):
+        match = re.fullmatch(r'/crm/v3/objects/(contacts|deals)(?:/(.+))?', path)
+        if not match:
+            return self._error(404, f"Unknown endpoint {path}", "OBJECT_NOT_FOUND")
+        object_type, rest = match.group(1), match.group(2)
+        state = self.server.state
+
+        if rest is None:
+            if method == 'POST':
+                return self._create_one(object_type, body)
+            if method == 'GET':
+                return self._list(object_type, query)
+        elif rest == 'search' and method == 'POST':
+            return self._search(object_type, body)
+        elif rest.startswith('batch/') and method == 'POST':
+            return self._batch(object_type, rest[len('batch/'):], body)
+        elif '/' not in rest:
+            object_id = unquote(rest)
+            id_property = (query.get('idProperty') or [None])[0]
+            record = state.lookup(object_type, object_id, id_property)
+            if record is None:
+                if method == 'DELETE':
+                    return self._send(204)
+                return self._error(404, "resource not found", "OBJECT_NOT_FOUND")
+            if method == 'GET':
+                return self._send(200, self._present(object_type, record, self._properties(query)))
+            if method == 'PATCH':
+                try:
+                    record = state.update(object_type, record, body.get('properties', {}))
+                except FakeConflict as e:
+                    return self._error(409, str(e), "CONFLICT")
+                return self._send(200, self._present(object_type, record, list(body.get('properties', {}))))
+            if method == 'DELETE':
+                state.archive(object_type, record["id"])
+                return self._send(204)
+        self._error(405, f"Method {method} not allowed on {path}")
+
+    @staticmethod
+    def _properties(query: Dict[str, List[str]]) -> Optional[List[str]]:
+        values = query.get('properties')
+        if not values:
+            return None
+        return [name for value in values for name in value.split(',') if name]
+
+    @staticmethod
+    def _present(object_type: str, record: Dict[str, Any], properties: Optional[List[str]] = None) -> Dict[str, Any]:
+        names = set(DEFAULT_PROPERTIES[object_type]) | set(properties or [])
+        return {
+            "id": record["id"],
+            "properties": {name: record["properties"].get(name) for name in names},
+            "createdAt": record["createdAt"],
+            "updatedAt": record["updatedAt"],
+            "archived": False,
+        }
+
+    def _create_one(self, object_type: str, body: Dict[str, Any]):
+        try:
+            record = self.server.state.create(object_type, body.get('properties', {}))
+        except FakeConflict as e:
+            return self._error(409, str(e), "CONFLICT")
+        self._send(201, self._present(object_type, record, list(body.get('properties', {}))))
+
+    def _list(self, object_type: str, query: Dict[str, List[str]]):
+        limit = min(int((query.get('limit') or [10])[0]), MAX_PAGE_SIZE)
+        after = int((query.get('after') or [0])[0])
+        archived = (query.get('archived') or ['false'])[0] == 'true'
+        with self.server.state.lock:
+            store = self.server.state.archived if archived else self.server.state.objects
+            records = sorted(store[object_type].values(), key=lambda record: int(record["id"]))
+            page = [record for record in records if int(record["id"]) > after][:limit]
+            more = bool(page) and any(int(record["id"]) > int(page[-1]["id"]) for record in records)
+            results = [self._present(object_type, record, self._properties(query)) for record in page]
+            if archived:
+                for result, record in zip(results, page):
+                    result.update(archived=True, archivedAt=record["archivedAt"])
+        response = {"results": results}
+        if more:
+            response["paging"] = {"next": {"after": page[-1]["id"]}}
+        self._send(200, response)
+
+    def _search(self, object_type: str, body: Dict[str, Any]):
+        filter_groups = body.get('filterGroups', [])
+        if len(filter_groups) > 5:
+            return self._error(400, "Too many filterGroups (max 5)")
+        if sum(len(group.get('filters', [])) for group in filter_groups) > 18:
+            return self._error(400, "Too many filters (max 18)")
+        for group in filter_groups:
+            for filter_spec in group.get('filters', []):
+                if len(filter_spec.get('values', [])) > 100:
+                    return self._error(400, "Too many values in IN filter (max 100)")
+
+        try:
+            groups = [[_compile_filter(spec) for spec in group.get('filters', [])] for group in filter_groups]
+        except KeyError as e:
+            return self._error(400, f"Unsupported filter operator {e}")
+        records = [record for record in self.server.state.searchable(object_type)
+                   if not groups or any(all(predicate(record) for predicate in group) for group in groups)]
+        for sort in reversed(body.get('sorts', [])):
+            name = sort.get('propertyName')
+            records.sort(key=lambda record: (_comparable(record["properties"].get(name)) is None,
+                                             _comparable(record["properties"].get(name)) or 0),
+                         reverse=sort.get('direction') == 'DESCENDING')
+        if not body.get('sorts'):
+            records.sort(key=lambda record: int(record["id"]))
+
+        limit = min(int(body.get('limit', 10)), MAX_PAGE_SIZE)
+        after = int(body.get('after') or 0)
+        if after >= SEARCH_RESULT_CAP:
+            return self._error(400, "Search results are limited to 10,000")
+        page = records[after:after + limit]
+        response = {
+            "total": len(records),
+            "results": [self._present(object_type, record, body.get('properties')) for record in page],
+        }
+        if after + limit < min(len(records), SEARCH_RESULT_CAP):
+            response["paging"] = {"next": {"after": str(after + limit)}}
+        self._send(200, response)
+
+    def _batch(self, object_type: str, action: str, body: Dict[str, Any]):
+        inputs = body.get('inputs', [])
+        if len(inputs) > MAX_BATCH_INPUTS:
+            return self._error(400, f"Batch inputs are limited to {MAX_BATCH_INPUTS}")
+        state = self.server.state
+        if action == 'archive':
+            for item in inputs:
+                state.archive(object_type, str(item.get('id')))
+            return self._send(204)
+
+        results, errors = [], []
+        for item in inputs:
+            trace = item.get('objectWriteTraceId')
+            try:
+                if action == 'create':
+                    record = state.create(object_type, item.get('properties', {}))
+                elif action == 'read':
+                    record = state.lookup(object_type, str(item.get('id')), body.get('idProperty'))
+                    if record is None:
+                        raise KeyError(item.get('id'))
+                elif action in ('update', 'upsert'):
+                    record = state.lookup(object_type, str(item.get('id')), item.get('idProperty'))
+                    if record is None and action == 'upsert':
+                        properties = dict(item.get('properties', {}))
+                        if item.get('idProperty') == 'email':
+                            properties['email'] = item.get('id')
+                        record = state.create(object_type, properties)
+                    elif record is None:
+                        raise KeyError(item.get('id'))
+                    else:
+                        record = state.update(object_type, record, item.get('properties', {}))
+                else:
+                    return self._error(404, f"Unknown batch action {action}", "OBJECT_NOT_FOUND")
+            except FakeConflict as e:
+                errors.append({"status": "error", "category": "CONFLICT", "message": str(e),
+                               "context": {"objectWriteTraceId": [trace]} if trace else {"ids": [str(item.get('id'))]}})
+                continue
+            except KeyError:
+                errors.append({"status": "error", "category": "OBJECT_NOT_FOUND", "message": "Object not found",
+                               "context": {"ids": [str(item.get('id'))]}})
+                continue
+            result = self._present(object_type, record, body.get('properties') or list(item.get('properties', {})))
+            if trace:
+                result["objectWriteTraceId"] = trace
+            results.append(result)
+
+        response = {"status": "COMPLETE", "results": results}
+        if errors:
+            response["errors"] = errors
+            response["numErrors"] = len(errors)
+        self._send(207 if errors else (201 if action == 'create' else 200), response)
+
+
+class FakeHubSpotServer(ThreadingHTTPServer):
+    """Threaded fake HubSpot API; use start()/stop() or as a context manager"""
+
+    daemon_threads = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: Optional[str] = None,
+                 requests_per_10s: Optional[int] = None, throttle_rate: float = 0.0, error_rate: float = 0.0,
+                 search_lag: float = 0.0, retry_after: float = 1.0, seed: int = 0):
+        super().__init__((host, port), FakeHubSpotHandler)
+        self.rng = random.Random(seed)
+        self.latency = LatencyModel(latency, random.Random(seed + 1))
+        self.requests_per_10s = requests_per_10s
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.state = FakeHubSpotState(search_lag)
+        self._lock = threading.Lock()
+        self._window: deque = deque()
+        self._counts: Counter = Counter()
+        self._status = {"throttled": 0, "server_errors": 0}
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeHubSpotServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def begin_request(self, endpoint: str):
+        with self._lock:
+            self._counts[endpoint] += 1
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+    def end_request(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def check_rate_limit(self) -> Tuple[bool, float]:
+        """Return (throttled, retry_after) for a request arriving now"""
+        with self._lock:
+            if self.throttle_rate and self.rng.random() < self.throttle_rate:
+                self._status["throttled"] += 1
+                return True, self.retry_after
+            if self.requests_per_10s is None:
+                return False, 0.0
+            now = time.monotonic()
+            while self._window and self._window[0] <= now - 10:
+                self._window.popleft()
+            if len(self._window) >= self.requests_per_10s:
+                self._status["throttled"] += 1
+                return True, max(self._window[0] + 10 - now, 0.01)
+            self._window.append(now)
+            return False, 0.0
+
+    def inject_server_error(self) -> bool:
+        with self._lock:
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self._status["server_errors"] += 1
+                return True
+            return False
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": sum(self._counts.values()),
+                "by_endpoint": dict(self._counts),
+                "throttled": self._status["throttled"],
+                "server_errors": self._status["server_errors"],
+                "peak_in_flight": self._peak_in_flight,
+                "contacts": len(self.state.objects["contacts"]),
+                "deals": len(self.state.objects["deals"]),
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._counts.clear()
+            self._status = {"throttled": 0, "server_errors": 0}
+            self._peak_in_flight = self._in_flight
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local HubSpot API stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", help="constant:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA (seconds)")
+    parser.add_argument("--rate-limit", type=int, help="requests per rolling 10 seconds before 429s")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="probability of a random 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="probability of a random 5xx")
+    parser.add_argument("--search-lag", type=float, default=0.0, help="seconds before writes show up in search")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    server = FakeHubSpotServer(args.host, args.port, latency=args.latency, requests_per_10s=args.rate_limit,
+                               throttle_rate=args.throttle_rate, error_rate=args.error_rate,
+                               search_lag=args.search_lag, seed=args.seed)
+    print(f"🧪 Fake HubSpot API listening on {server.base_url}")
+    print(f"💡 Set hubspot.base_url to {server.base_url} in config/api_config.json")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
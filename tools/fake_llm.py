@@ -0,0 +1,115 @@
+import re
+import threading
+import time
+from typing import Dict, Any, List, Optional
+
+# First rule whose words appear decides the intent
+INTENT_WORDS = [
+    ('create_deal', ('deal', 'opportunity')),
+    ('delete_contact', ('drop', 'erase', 'forget')),
+    ('search_contact', ('show', 'who is', 'look up', 'details')),
+    ('update_contact', ('set', 'change', 'make')),
+    ('create_contact', ('add', 'new', 'register', 'onboard')),
+]
+_EMAIL = re.compile(r'[\w\.-]+@[\w\.-]+')
+_NUMBER = re.compile(r'(?<!\w)\+?\(?\$?\d[\d\s\-\(\)\.,]*\d|(?<!\w)\$?\d')
+_POSSESSIVE = re.compile(r"\b([A-Z][a-z]+)'s\b")
+_NAMED = re.compile(r'\b(?:named|called)\s+([A-Z][a-z]+)(?:\s+([A-Z][a-z]+))?')
+_DEAL_NAME = re.compile(r'\b(?:for|with)\s+([A-Z][\w]*(?:\s+[A-Z][\w]*)*)')
+_NUMBERED_LINE = re.compile(r'^(\d+)\.\s+(.*)$', re.MULTILINE)
+
+
+class FakeLLM:
+    """Deterministic stand-in for ChatOpenAI structured output, for offline tests and benchmarks.
+
+    Reads a request with a few fixed rules (verbs pick the intent; the first
+    email, number and capitalized name fill the fields) and can sleep to mimic
+    a model round trip. A schema with a "results" array gets one result per
+    numbered line. A prompt containing fail_on raises, as an API error would.
+    """
+
+    def __init__(self, latency: float = 0.0, fail_on: Optional[str] = None):
+        self.latency = latency
+        self.fail_on = fail_on
+        self.calls = 0
+        self.items = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def with_structured_output(self, schema: Dict[str, Any]) -> "FakeStructuredLLM":
+        return FakeStructuredLLM(self, schema)
+
+    def complete(self, prompt: str, batched: bool) -> Dict[str, Any]:
+        """Answer one call; batched prompts are numbered lists"""
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if self.fail_on and self.fail_on in prompt:
+                raise RuntimeError("Fake LLM request failed")
+            if not batched:
+                return self.read(prompt)
+            return {"results": [dict(self.read(text), index=int(number))
+                                for number, text in _NUMBERED_LINE.findall(prompt)]}
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def read(self, text: str) -> Dict[str, Any]:
+        with self._lock:
+            self.items += 1
+        lowered = text.lower()
+        intent = next((name for name, words in INTENT_WORDS
+                       if any(re.search(rf'\b{word}\b', lowered) for word in words)), 'none')
+        email = _EMAIL.search(text)
+        number = _NUMBER.search(_EMAIL.sub(' ', text))
+        response: Dict[str, Any] = {"intent": intent}
+        if intent == 'create_deal':
+            deal_name = _DEAL_NAME.search(text)
+            if deal_name:
+                response["dealname"] = deal_name.group(1)
+            if number:
+                response["amount"] = number.group(0)
+            return response
+        if email and intent != 'update_contact':
+            response["email"] = email.group(0)
+        if number:
+            response["phone"] = number.group(0)
+        named = _NAMED.search(text)
+        possessive = _POSSESSIVE.search(text)
+        if named:
+            response["firstname"] = named.group(1)
+            if named.group(2):
+                response["lastname"] = named.group(2)
+        elif possessive and intent == 'create_contact':
+            response["firstname"] = possessive.group(1)
+        return response
+
+
+class FakeStructuredLLM:
+    def __init__(self, llm: FakeLLM, schema: Dict[str, Any]):
+        self.llm = llm
+        self.schema = schema
+
+    def invoke(self, messages: List[Any]) -> Dict[str, Any]:
+        last = messages[-1]
+        text = last[1] if isinstance(last, tuple) else getattr(last, 'content', str(last))
+        properties = self.schema.get("properties", {})
+        if "results" in properties:
+            item_schema = properties["results"]["items"]
+            response = self.llm.complete(text, batched=True)
+            return {"results": [self._conform(item, item_schema) for item in response["results"]]}
+        return self._conform(self.llm.complete(text, batched=False), self.schema)
+
+    @staticmethod
+    def _conform(response: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
+        """Drop fields and intents the schema doesn't allow, as structured output would"""
+        allowed = schema.get("properties", {})
+        if response["intent"] not in allowed.get("intent", {}).get("enum", [response["intent"]]):
+            response = {key: value for key, value in response.items() if key == "index"}
+            response["intent"] = "none"
+        return {field: value for field, value in response.items() if field in allowed}
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Local SMTP stand-in for offline testing and benchmarking
+
+Speaks just enough SMTP for smtplib (EHLO/HELO, AUTH PLAIN/LOGIN, MAIL,
+RCPT, DATA, RSET, NOOP, QUIT), keeps received messages in memory and can
+add latency per command. It does not offer STARTTLS, so point EmailTools at
+it with email.use_tls set to false:
+
+    python -m tools.fake_smtp --port 8025 --latency 0.01
+"""
+
+import argparse
+import random
+import socketserver
+import threading
+import time
+from collections import Counter
+from typing import Dict, Any, List, Optional
+
+from tools.fake_hubspot import LatencyModel
+
+# Keep only the newest messages so long benchmarks don't grow without bound
+MAX_STORED_MESSAGES = 1000
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+    """One SMTP session per connection"""
+
+    disable_nagle_algorithm = True
+
+    def _reply(self, line: str):
+        self.wfile.write((line + "\r\n").encode('utf-8'))
+        self.wfile.flush()
+
+    def _readline(self) -> Optional[str]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        return line.decode('utf-8', errors='replace').rstrip("\r\n")
+
+    def handle(self):
+        self.server.record_connection()
+        self._reply("220 fake-smtp ESMTP ready")
+        sender, recipients = None, []
+        while True:
+            line = self._readline()
+            if line is None:
+                return
+            verb, _, argument = line.partition(' ')
+            verb = verb.upper()
+            self.server.record_command(verb)
+            delay = self.server.latency.sample()
+            if delay > 0:
+                time.sleep(delay)
+
+            if verb == 'EHLO':
+                self.wfile.write(b"250-fake-smtp\r\n250-AUTH PLAIN LOGIN\r\n250 8BITMIME\r\n")
+                self.wfile.flush()
+            elif verb == 'HELO':
+                self._reply("250 fake-smtp")
+            elif verb == 'AUTH':
+                mechanism, _, initial_response = argument.partition(' ')
+                prompts = []
+                if mechanism.upper() == 'LOGIN':
+                    # Any credentials are accepted; the username may arrive with the command
+                    prompts = ["334 UGFzc3dvcmQ6"] if initial_response else ["334 VXNlcm5hbWU6", "334 UGFzc3dvcmQ6"]
+                elif mechanism.upper() == 'PLAIN' and not initial_response:
+                    prompts = ["334 "]
+                for prompt in prompts:
+                    self._reply(prompt)
+                    if self._readline() is None:
+                        return
+                self._reply("235 Authentication successful")
+            elif verb == 'MAIL':
+                sender, recipients = argument.partition(':')[2].strip(), []
+                self._reply("250 OK")
+            elif verb == 'RCPT':
+                if sender is None:
+                    self._reply("503 Need MAIL command")
+                    continue
+                recipients.append(argument.partition(':')[2].strip().strip('<>'))
+                self._reply("250 OK")
+            elif verb == 'DATA':
+                if not recipients:
+                    self._reply("503 Need RCPT command")
+                    continue
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    data_line = self._readline()
+                    if data_line is None:
+                        return
+                    if data_line == '.':
+                        break
+                    lines.append(data_line[1:] if data_line.startswith('..') else data_line)
+                self.server.store_message(sender, recipients, "\n".join(lines))
+                sender, recipients = None, []
+                self._reply("250 OK: queued")
+            elif verb == 'RSET':
+                sender, recipients = None, []
+                self._reply("250 OK")
+            elif verb == 'NOOP':
+                self._reply("250 OK")
+            elif verb == 'QUIT':
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """Threaded fake SMTP server; use as a context manager or start()/stop()"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: Optional[str] = None, seed: int = 0):
+        super().__init__((host, port), FakeSMTPHandler)
+        self.latency = LatencyModel(latency, random.Random(seed))
+        self.messages: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._commands = Counter()
+        self._connections = 0
+        self._delivered = 0
+        self._thread = None
+
+    @property
+    def host(self) -> str:
+        return self.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "FakeSMTPServer":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def record_connection(self):
+        with self._lock:
+            self._connections += 1
+
+    def record_command(self, verb: str):
+        with self._lock:
+            self._commands[verb] += 1
+
+    def store_message(self, sender: str, recipients: List[str], data: str):
+        with self._lock:
+            self._delivered += 1
+            self.messages.append({"from": sender, "to": recipients, "data": data})
+            if len(self.messages) > MAX_STORED_MESSAGES:
+                del self.messages[:len(self.messages) - MAX_STORED_MESSAGES]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"connections": self._connections, "messages": self._delivered, "commands": dict(self._commands)}
+
+    def reset_stats(self):
+        with self._lock:
+            self._commands.clear()
+            self._connections = 0
+            self._delivered = 0
+            self.messages.clear()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a local SMTP stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency", help="per-command latency: constant:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+    args = parser.parse_args(argv)
+
+    server = FakeSMTPServer(args.host, args.port, latency=args.latency)
+    print(f"🧪 Fake SMTP server listening on {server.host}:{server.port}")
+    print("💡 Set email.smtp_server/smtp_port to it and email.use_tls to false")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stopped")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from typing import Dict, Any, Optional, Tuple, Union
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+class ConnectionStats:
+    """Thread-safe counters of requests sent vs. TCP connections opened"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.new_connections = 0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_new_connection(self):
+        with self._lock:
+            self.new_connections += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return a consistent copy of the counters"""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "new_connections": self.new_connections,
+                "reused_connections": max(self.requests - self.new_connections, 0),
+            }
+
+
+def _counting_pool_classes(stats: ConnectionStats) -> Dict[str, type]:
+    """Build urllib3 pool classes whose connections report every handshake to stats"""
+
+    class CountingHTTPConnection(HTTPConnection):
+        def connect(self):
+            stats.record_new_connection()
+            super().connect()
+
+    class CountingHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            stats.record_new_connection()
+            super().connect()
+
+    class CountingHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = CountingHTTPConnection
+
+    class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = CountingHTTPSConnection
+
+    return {"http": CountingHTTPConnectionPool, "https": CountingHTTPSConnectionPool}
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    def __init__(self, stats: ConnectionStats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _counting_pool_classes(self.stats)
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+class PooledSession:
+    """Keep-alive requests session with a bounded connection pool per host"""
+
+    def __init__(self, pool_size: int = 10):
+        self.pool_size = pool_size
+        self.stats = ConnectionStats()
+        self.session = requests.Session()
+        adapter = _CountingHTTPAdapter(
+            self.stats,
+            pool_connections=pool_size,
+            pool_maxsize=pool_size,
+            pool_block=True
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def request(self, method: str, url: str, timeout: Optional[Timeout] = None, **kwargs) -> requests.Response:
+        """Send a request over a pooled connection"""
+        return self.session.request(method, url, timeout=timeout, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.snapshot()
+        stats["pool_size"] = self.pool_size
+        return stats
+
+    def close(self):
+        self.session.close()
+
+
+_shared_sessions: Dict[int, PooledSession] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_session(pool_size: int = 10) -> PooledSession:
+    """Return the process-wide session for the given pool size, creating it on first use"""
+    with _shared_lock:
+        session = _shared_sessions.get(pool_size)
+        if session is None:
+            session = PooledSession(pool_size)
+            _shared_sessions[pool_size] = session
+        return session
+
+
+def close_shared_sessions():
+    """Close every shared session, e.g. before the process exits"""
+    with _shared_lock:
+        for session in _shared_sessions.values():
+            session.close()
+        _shared_sessions.clear()
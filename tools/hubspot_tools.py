@@ -1,108 +1,587 @@
 import requests
 import json
-from typing import Dict, Any, Optional
-from utils.config_loader import ConfigLoader
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from email.utils import parsedate_to_datetime
+from itertools import islice
+from typing import Dict, Any, Optional, Iterable, Iterator, List, Tuple, Callable
+from urllib.parse import quote
+from utils.config_loader import ConfigLoader, get_shared_config
+from tools.http_pool import get_shared_session, Timeout
+from tools.rate_limiter import get_shared_scheduler
+from tools.contact_cache import get_shared_contact_cache
 
-class HubSpotTools:
-    def __init__(self):
-        self.config = ConfigLoader()
-        self.hubspot_config = self.config.get_hubspot_config()
+IDEMPOTENT_METHODS = ('GET', 'DELETE')
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+BATCH_SIZE = 100
+CONTACT_PROPERTIES = "email,firstname,lastname,phone"
+# HubSpot search limits: filterGroups per request, values per IN filter, results per page
+SEARCH_MAX_FILTER_GROUPS = 5
+SEARCH_IN_MAX_VALUES = 100
+SEARCH_PAGE_SIZE = 100
+
+
+class HubSpotAPIError(Exception):
+    """HubSpot returned a non-2xx response or the request could not be sent"""
+    def __init__(self, message: str, status_code: Optional[int] = None, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date"""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _chunked(items: Iterable[Any], size: int) -> Iterator[List[Tuple[int, Any]]]:
+    """Yield lists of (index, item) pairs without materializing the whole iterable"""
+    iterator = enumerate(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _batch_keys(record: Dict[str, Any]) -> List[str]:
+    """Candidate keys that tie a batch result or error back to its input"""
+    keys = [record.get('objectWriteTraceId'), record.get('id')]
+    keys.append((record.get('properties') or {}).get('email'))
+    return [str(key).lower() for key in keys if key]
+
+
+def _match_batch_response(chunk: List[Tuple[int, Any]], inputs: List[Dict[str, Any]],
+                          response: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Map a (possibly multi-status) batch response back to per-record outcomes"""
+    indices = [index for index, _ in chunk]
+    by_key = {}
+    for index, payload in zip(indices, inputs):
+        for key in _batch_keys(payload):
+            by_key.setdefault(key, index)
+    
+    outcomes: Dict[int, Dict[str, Any]] = {}
+    results = response.get('results')
+    errors = response.get('errors', [])
+    
+    # Archive returns 204 with no body: every record succeeded
+    if results is None and not errors:
+        return [{"index": index, "status": "success", "result": None} for index in indices]
+    
+    unmatched_results = []
+    for result in results or []:
+        index = next((by_key[key] for key in _batch_keys(result)
+                      if key in by_key and by_key[key] not in outcomes), None)
+        if index is None:
+            unmatched_results.append(result)
+        else:
+            outcomes[index] = {"index": index, "status": "success", "result": result}
+    
+    for error in errors:
+        message = error.get('message', 'Batch record failed')
+        for values in (error.get('context') or {}).values():
+            for value in values:
+                index = by_key.get(str(value).lower())
+                if index is not None and index not in outcomes:
+                    outcomes[index] = {"index": index, "status": "error", "error": message,
+                                       "category": error.get('category')}
+    
+    remaining = [index for index in indices if index not in outcomes]
+    if not errors and len(unmatched_results) == len(remaining):
+        for index, result in zip(remaining, unmatched_results):
+            outcomes[index] = {"index": index, "status": "success", "result": result}
+    for index in remaining:
+        outcomes.setdefault(index, {"index": index, "status": "error",
+                                    "error": "No result returned for record"})
+    
+    return [outcomes[index] for index in indices]
+
+
+def is_not_found(outcome: Dict[str, Any]) -> bool:
+    """True if a batch outcome failed only because the record doesn't exist"""
+    return outcome["status"] == "error" and outcome.get("category") == 'OBJECT_NOT_FOUND'
+
+
+def _email_matches(contact: Optional[Dict[str, Any]], email: str) -> bool:
+    """True if contact is the record for email; HubSpot returns "email": null for contacts without one"""
+    return bool(contact) and ((contact.get('properties') or {}).get('email') or '').lower() == email.strip().lower()
+
+
+def _email_search(email: str) -> Dict[str, Any]:
+    """Search body matching one exact email"""
+    return {
+        "filterGroups": [{
+            "filters": [{
+                "propertyName": "email",
+                "operator": "EQ",
+                "value": email
+            }]
+        }]
+    }
+
+
+def _coerce_properties(properties: Any, key: str) -> Dict[str, Any]:
+    """Accept a properties dict, a JSON string, or a bare value for key"""
+    if isinstance(properties, str):
+        try:
+            return json.loads(properties)
+        except json.JSONDecodeError:
+            return {key: properties}
+    return properties
+
+
+def _create_input(index: int, properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"properties": properties, "objectWriteTraceId": f"trace-{index}"}
+
+
+def _update_input(index: int, update: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": str(update['id']), "properties": update['properties']}
+
+
+def _id_input(index: int, object_id: str) -> Dict[str, Any]:
+    return {"id": str(object_id)}
+
+
+def _upsert_input(index: int, properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"idProperty": "email", "id": properties['email'], "properties": properties}
+
+
+# batch/read body addressing contacts by email
+READ_BY_EMAIL_BODY = {"idProperty": "email", "properties": CONTACT_PROPERTIES.split(',')}
+
+
+class HubSpotClientBase:
+    """Settings, response handling and contact-cache bookkeeping shared by HubSpotTools and AsyncHubSpotTools.
+
+    Subclasses add only the transport: how a request is sent and how to wait
+    between retries. Both build the same payloads and read responses the same way.
+    """
+    
+    def _apply_settings(self, hubspot_config: Dict[str, Any]):
+        """Credentials, the portal's shared scheduler and the shared contact id cache"""
+        self.hubspot_config = hubspot_config
         self.base_url = self.hubspot_config.get('base_url', 'https://api.hubapi.com')
         self.api_key = self.hubspot_config.get('api_key')
         self.headers = {
             'Content-Type': 'application/json',
             'Authorization': f'Bearer {self.api_key}'
         }
+        self.pool_size = int(self.hubspot_config.get('pool_size', 10))
+        self.connect_timeout = float(self.hubspot_config.get('connect_timeout', 5))
+        self.read_timeout = float(self.hubspot_config.get('read_timeout', 30))
+        self.scheduler = get_shared_scheduler(
+            f"{self.base_url}|{self.api_key}",
+            requests_per_10s=int(self.hubspot_config.get('requests_per_10s', 100)),
+            daily_limit=int(self.hubspot_config.get('daily_limit', 250000)),
+            max_in_flight=int(self.hubspot_config.get('max_in_flight', 10)),
+            max_retries=int(self.hubspot_config.get('max_retries', 5)),
+            backoff_base=float(self.hubspot_config.get('backoff_base', 0.5)),
+            backoff_max=float(self.hubspot_config.get('backoff_max', 30))
+        )
+        contact_cache_path = self.hubspot_config.get('contact_cache_path')
+        self.contact_cache = get_shared_contact_cache(
+            f"{self.base_url}|{self.api_key}",
+            max_size=int(self.hubspot_config.get('contact_cache_size', 10000)),
+            ttl=float(self.hubspot_config.get('contact_cache_ttl', 3600)),
+            db_path=self.config.resolve_path(contact_cache_path) if contact_cache_path else None
+        )
+    
+    @staticmethod
+    def _request_options(method: str, idempotent: Optional[bool],
+                         idempotency_key: Optional[str]) -> Tuple[str, bool, Dict[str, str]]:
+        """Normalized method, whether failures may be retried, and extra headers"""
+        method = method.upper()
+        if method not in ('GET', 'POST', 'PATCH', 'DELETE'):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        extra_headers = {'Idempotency-Key': idempotency_key} if idempotency_key is not None else {}
+        return method, idempotent or idempotency_key is not None, extra_headers
+    
+    def _parse_response(self, response: Any) -> Dict[str, Any]:
+        """Body of a 2xx response (requests or httpx); otherwise record the failure and raise HubSpotAPIError"""
+        if 200 <= response.status_code < 300:
+            # HubSpot might return empty content for some successful operations
+            if response.content:
+                return response.json()
+            return {"status": "success", "message": "Operation completed successfully"}
+        
+        retry_after = _parse_retry_after(response.headers.get('Retry-After'))
+        if response.status_code == 429:
+            self.scheduler.record_throttle(retry_after)
+        elif response.status_code >= 500:
+            self.scheduler.record_failure("server_errors")
+        raise HubSpotAPIError(f"HTTP {response.status_code}: {response.text}",
+                              status_code=response.status_code, retry_after=retry_after)
+    
+    def _connection_error(self, error: Exception) -> HubSpotAPIError:
+        self.scheduler.record_failure("connection_errors")
+        return HubSpotAPIError(f"HubSpot API error: {str(error)}")
+    
+    def _retry_delay(self, error: HubSpotAPIError, retryable: bool, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if error should be raised"""
+        if error.status_code is not None and error.status_code not in RETRYABLE_STATUS:
+            return None
+        if not retryable or attempt >= self.scheduler.max_retries:
+            if retryable:
+                self.scheduler.record_failure("gave_up")
+            return None
+        self.scheduler.record_retry()
+        return self.scheduler.backoff_delay(attempt, error.retry_after)
+    
+    def get_rate_limit_stats(self) -> Dict[str, Any]:
+        """Return bucket fill, in-flight and retry counters for this portal"""
+        return self.scheduler.get_stats()
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters of the email -> contact id cache"""
+        return self.contact_cache.get_stats()
+    
+    def _remember_contact(self, contact: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Write a contact's email -> id mapping through to the cache"""
+        if contact and contact.get('id'):
+            email = (contact.get('properties') or {}).get('email')
+            if email:
+                self.contact_cache.put(email, contact['id'])
+        return contact
+    
+    def _remember_batch(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        for entry in results:
+            if entry["status"] == "success":
+                self._remember_contact(entry["result"])
+        return results
+    
+    def _first_result(self, response: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        results = response.get('results', [])
+        return self._remember_contact(results[0]) if results else None
+    
+    def _updated_by_email(self, email: str, properties: Dict[str, Any],
+                          result: Dict[str, Any]) -> Dict[str, Any]:
+        """Cache bookkeeping after a PATCH addressed by email (the address itself may have changed)"""
+        if properties.get('email', email).lower() != email.lower():
+            self.contact_cache.invalidate(email)
+        return self._remember_contact(result)
     
-    def _make_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None) -> Dict[str, Any]:
-        """Make API request to HubSpot"""
+    def _invalidating(self, contact_ids: Iterable[str]) -> Iterator[str]:
+        """Pass ids through, dropping each from the cache before it is archived"""
+        for contact_id in contact_ids:
+            self.contact_cache.invalidate_id(contact_id)
+            yield contact_id
+    
+    def _cached_ids(self, emails: Iterable[str]) -> Tuple[Dict[str, Optional[str]], List[str]]:
+        """(lowercased email -> cached id or None, emails that still need a read)"""
+        ids = {email.strip().lower(): None for email in emails}
+        for email in ids:
+            ids[email] = self.contact_cache.get(email)
+        return ids, [email for email, contact_id in ids.items() if contact_id is None]
+    
+    @staticmethod
+    def _fill_ids(ids: Dict[str, Optional[str]], missing: List[str], outcomes: List[Dict[str, Any]],
+                  errors: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        for email, outcome in zip(missing, outcomes):
+            if outcome["status"] == "success":
+                ids[email] = outcome["result"].get('id')
+            elif errors is not None and not is_not_found(outcome):
+                errors[email] = outcome["error"]
+        return ids
+
+
+class HubSpotTools(HubSpotClientBase):
+    def __init__(self, config: Optional[ConfigLoader] = None):
+        self.config = config or get_shared_config()
+        self._apply_config(self.config.get_hubspot_config())
+        self.config.subscribe('hubspot', self._apply_config)
+    
+    def _apply_config(self, hubspot_config: Dict[str, Any]):
+        """(Re)build credentials, pools and limiters from the hubspot config section"""
+        self._apply_settings(hubspot_config)
+        self.session = get_shared_session(self.pool_size)
+        self.timeout = (self.connect_timeout, self.read_timeout)
+    
+    def _make_request(self, endpoint: str, method: str = 'GET', data: Optional[Dict] = None,
+                      timeout: Optional[Timeout] = None, idempotent: Optional[bool] = None,
+                      idempotency_key: Optional[str] = None, params: Optional[Dict] = None) -> Dict[str, Any]:
+        """Make API request to HubSpot under the portal's rate limits.
+        
+        429s, 5xx and connection errors are retried with Retry-After-aware
+        exponential backoff, but only when the call is idempotent (GET/DELETE,
+        idempotent=True) or carries an idempotency key.
+        """
         url = f"{self.base_url}{endpoint}"
+        timeout = timeout if timeout is not None else self.timeout
+        method, retryable, extra_headers = self._request_options(method, idempotent, idempotency_key)
+        headers = dict(self.headers, **extra_headers) if extra_headers else self.headers
         
-        try:
-            if method.upper() == 'GET':
-                response = requests.get(url, headers=self.headers, params=data)
-            elif method.upper() == 'POST':
-                response = requests.post(url, headers=self.headers, json=data)
-            elif method.upper() == 'PATCH':
-                response = requests.patch(url, headers=self.headers, json=data)
-            elif method.upper() == 'DELETE':
-                response = requests.delete(url, headers=self.headers)
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-            
-            # Check if response is successful
-            if response.status_code >= 200 and response.status_code < 300:
-                # HubSpot might return empty content for some successful operations
-                if response.content:
-                    return response.json()
-                else:
-                    return {"status": "success", "message": "Operation completed successfully"}
+        attempt = 0
+        while True:
+            try:
+                with self.scheduler.slot():
+                    if method == 'GET':
+                        response = self.session.request(method, url, headers=headers, params=dict(data or {}, **(params or {})),
+                                                        timeout=timeout)
+                    elif method == 'DELETE':
+                        response = self.session.request(method, url, headers=headers, params=params, timeout=timeout)
+                    else:
+                        response = self.session.request(method, url, headers=headers, json=data, params=params,
+                                                        timeout=timeout)
+            except requests.exceptions.RequestException as e:
+                error = self._connection_error(e)
             else:
-                error_msg = f"HTTP {response.status_code}: {response.text}"
-                raise Exception(error_msg)
+                try:
+                    return self._parse_response(response)
+                except HubSpotAPIError as e:
+                    error = e
             
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"HubSpot API error: {str(e)}")
+            delay = self._retry_delay(error, retryable, attempt)
+            if delay is None:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+    
+    def get_connection_stats(self) -> Dict[str, Any]:
+        """Return new vs. reused connection counts for the shared session"""
+        return self.session.get_stats()
     
     def create_contact(self, properties: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new contact in HubSpot"""
-        # Convert string input to dict if needed
-        if isinstance(properties, str):
-            try:
-                properties = json.loads(properties)
-            except json.JSONDecodeError:
-                # If it's not JSON, assume it's a simple email string
-                properties = {"email": properties}
-        
-        endpoint = "/crm/v3/objects/contacts"
-        data = {"properties": properties}
-        
-        return self._make_request(endpoint, 'POST', data)
+        data = {"properties": _coerce_properties(properties, 'email')}
+        return self._remember_contact(self._make_request("/crm/v3/objects/contacts", 'POST', data))
     
     def update_contact(self, contact_id: str, properties: Dict[str, Any]) -> Dict[str, Any]:
         """Update an existing contact in HubSpot"""
-        if isinstance(properties, str):
-            try:
-                properties = json.loads(properties)
-            except json.JSONDecodeError:
-                properties = {"email": properties}
-                
-        endpoint = f"/crm/v3/objects/contacts/{contact_id}"
-        data = {"properties": properties}
-        
-        return self._make_request(endpoint, 'PATCH', data)
+        properties = _coerce_properties(properties, 'email')
+        if 'email' in properties:
+            self.contact_cache.invalidate_id(contact_id)
+        return self._remember_contact(self._make_request(f"/crm/v3/objects/contacts/{contact_id}", 'PATCH',
+                                                         {"properties": properties}, idempotent=True))
     
     def search_contact(self, email: str) -> Optional[Dict[str, Any]]:
-        """Search for contact by email"""
-        endpoint = "/crm/v3/objects/contacts/search"
-        data = {
-            "filterGroups": [{
-                "filters": [{
-                    "propertyName": "email",
-                    "operator": "EQ",
-                    "value": email
-                }]
-            }]
-        }
+        """Search for contact by email.
         
-        response = self._make_request(endpoint, 'POST', data)
-        results = response.get('results', [])
-        return results[0] if results else None
+        A cached email -> id mapping turns the lookup into a read on the object
+        endpoint, which has a far higher rate limit than /contacts/search.
+        """
+        contact_id = self.contact_cache.get(email)
+        if contact_id:
+            contact = self.get_contact(contact_id)
+            if _email_matches(contact, email):
+                return contact
+            self.contact_cache.invalidate(email)
+        
+        return self._first_result(self._make_request("/crm/v3/objects/contacts/search", 'POST',
+                                                     _email_search(email), idempotent=True))
+    
+    def iter_search(self, object_type: str, filter_groups: List[Dict[str, Any]],
+                    properties: Optional[List[str]] = None, sorts: Optional[List[Dict[str, Any]]] = None,
+                    after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield every search result, fetching the next page only when needed"""
+        endpoint = f"/crm/v3/objects/{object_type}/search"
+        while True:
+            data: Dict[str, Any] = {"filterGroups": filter_groups, "limit": SEARCH_PAGE_SIZE}
+            if properties:
+                data["properties"] = properties
+            if sorts:
+                data["sorts"] = sorts
+            if after:
+                data["after"] = after
+            response = self._make_request(endpoint, 'POST', data, idempotent=True)
+            for result in response.get('results', []):
+                yield result
+            after = ((response.get('paging') or {}).get('next') or {}).get('after')
+            if not after:
+                return
+    
+    def iter_object_pages(self, object_type: str, properties: Optional[List[str]] = None,
+                          after: Optional[str] = None,
+                          archived: bool = False) -> Iterator[Tuple[List[Dict[str, Any]], Optional[str]]]:
+        """Walk /crm/v3/objects/{object_type} page by page, yielding (records, next_after).
+        
+        With archived=True the walk lists archived (deleted) records instead.
+        """
+        endpoint = f"/crm/v3/objects/{object_type}"
+        while True:
+            params: Dict[str, Any] = {"limit": SEARCH_PAGE_SIZE, "archived": "true" if archived else "false"}
+            if properties:
+                params["properties"] = ",".join(properties)
+            if after:
+                params["after"] = after
+            response = self._make_request(endpoint, 'GET', params=params)
+            after = ((response.get('paging') or {}).get('next') or {}).get('after')
+            yield response.get('results', []), after
+            if not after:
+                return
+    
+    def iter_objects(self, object_type: str, properties: Optional[List[str]] = None,
+                     after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Lazily yield every record of an object type"""
+        for records, _ in self.iter_object_pages(object_type, properties, after):
+            yield from records
+    
+    def search_contacts_by_emails(self, emails: Iterable[str],
+                                  properties: Optional[List[str]] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """Resolve many emails with IN filters, 500 emails per search request.
+        
+        Returns a map of every requested (lowercased) email to all matching
+        records; emails with no match map to an empty list.
+        """
+        properties = properties or CONTACT_PROPERTIES.split(',')
+        matches: Dict[str, List[Dict[str, Any]]] = {}
+        for email in emails:
+            matches.setdefault(email.strip().lower(), [])
+        
+        per_request = SEARCH_MAX_FILTER_GROUPS * SEARCH_IN_MAX_VALUES
+        pending = list(matches)
+        for start in range(0, len(pending), per_request):
+            batch = pending[start:start + per_request]
+            filter_groups = [
+                {"filters": [{"propertyName": "email", "operator": "IN",
+                              "values": batch[i:i + SEARCH_IN_MAX_VALUES]}]}
+                for i in range(0, len(batch), SEARCH_IN_MAX_VALUES)
+            ]
+            for record in self.iter_search('contacts', filter_groups, properties=properties):
+                email = ((record.get('properties') or {}).get('email') or '').lower()
+                if email in matches:
+                    matches[email].append(record)
+        
+        for records in matches.values():
+            if len(records) == 1:
+                self._remember_contact(records[0])
+        return matches
+    
+    def get_contact(self, contact_id: str) -> Optional[Dict[str, Any]]:
+        """Read a contact by id; returns None if it does not exist"""
+        endpoint = f"/crm/v3/objects/contacts/{contact_id}"
+        try:
+            return self._make_request(endpoint, 'GET', params={"properties": CONTACT_PROPERTIES})
+        except HubSpotAPIError as e:
+            if e.status_code == 404:
+                return None
+            raise
+    
+    def get_contact_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Read a contact by email from the object store (not the lagging search index)"""
+        endpoint = f"/crm/v3/objects/contacts/{quote(email, safe='')}"
+        params = {"idProperty": "email", "properties": CONTACT_PROPERTIES}
+        try:
+            return self._remember_contact(self._make_request(endpoint, 'GET', params=params))
+        except HubSpotAPIError as e:
+            if e.status_code == 404:
+                self.contact_cache.invalidate(email)
+                return None
+            raise
+    
+    def resolve_contact_id(self, email: str) -> Optional[str]:
+        """Return the contact id for email, from the cache when possible"""
+        contact_id = self.contact_cache.get(email)
+        if contact_id:
+            return contact_id
+        contact = self.get_contact_by_email(email)
+        return contact.get('id') if contact else None
+    
+    def update_contact_by_email(self, email: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Update a contact addressed by email in a single PATCH; raises HubSpotAPIError 404 if missing"""
+        properties = _coerce_properties(properties, 'email')
+        endpoint = f"/crm/v3/objects/contacts/{quote(email, safe='')}"
+        try:
+            result = self._make_request(endpoint, 'PATCH', {"properties": properties}, idempotent=True,
+                                        params={"idProperty": "email"})
+        except HubSpotAPIError as e:
+            if e.status_code == 404:
+                self.contact_cache.invalidate(email)
+            raise
+        return self._updated_by_email(email, properties, result)
+    
+    def upsert_contact(self, email: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+        """Create the contact with this email or update it if it exists, in one request"""
+        results = self.upsert_contacts_batch([dict(properties, email=email)])
+        if results[0]["status"] == "error":
+            raise HubSpotAPIError(results[0]["error"])
+        return results[0]["result"]
     
     def delete_contact(self, contact_id: str) -> Dict[str, Any]:
         """Delete a contact from HubSpot"""
-        endpoint = f"/crm/v3/objects/contacts/{contact_id}"
-        return self._make_request(endpoint, 'DELETE')
+        self.contact_cache.invalidate_id(contact_id)
+        return self._make_request(f"/crm/v3/objects/contacts/{contact_id}", 'DELETE')
     
     def create_deal(self, properties: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new deal in HubSpot"""
-        if isinstance(properties, str):
+        data = {"properties": _coerce_properties(properties, 'dealname')}
+        return self._make_request("/crm/v3/objects/deals", 'POST', data)
+    
+    def _run_batch(self, object_type: str, action: str, items: Iterable[Any],
+                   build_input: Callable[[int, Any], Dict[str, Any]], idempotent: bool,
+                   body: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Send items to /crm/v3/objects/{object_type}/batch/{action} in chunks of BATCH_SIZE.
+        
+        Chunks run concurrently up to the scheduler's in-flight limit. Returns one
+        {"index", "status", "result"|"error"} entry per input, in input order.
+        """
+        endpoint = f"/crm/v3/objects/{object_type}/batch/{action}"
+        
+        def send_chunk(chunk: List[Tuple[int, Any]]) -> List[Dict[str, Any]]:
+            inputs = [build_input(index, item) for index, item in chunk]
             try:
-                properties = json.loads(properties)
-            except json.JSONDecodeError:
-                properties = {"dealname": properties}
-                
-        endpoint = "/crm/v3/objects/deals"
-        data = {"properties": properties}
+                response = self._make_request(endpoint, 'POST', dict(body or {}, inputs=inputs), idempotent=idempotent)
+            except Exception as e:
+                return [{"index": index, "status": "error", "error": str(e)} for index, _ in chunk]
+            return _match_batch_response(chunk, inputs, response)
         
-        return self._make_request(endpoint, 'POST', data)
\ No newline at end of file
+        results: List[Dict[str, Any]] = []
+        max_pending = self.scheduler.max_in_flight * 2
+        with ThreadPoolExecutor(max_workers=self.scheduler.max_in_flight) as pool:
+            pending = set()
+            for chunk in _chunked(items, BATCH_SIZE):
+                pending.add(pool.submit(send_chunk, chunk))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results.extend(future.result())
+            for future in pending:
+                results.extend(future.result())
+        
+        results.sort(key=lambda entry: entry["index"])
+        return results
+    
+    def create_contacts_batch(self, contacts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many contacts via batch/create, 100 per request"""
+        return self._remember_batch(self._run_batch('contacts', 'create', contacts, _create_input, idempotent=False))
+    
+    def update_contacts_batch(self, updates: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Update many contacts via batch/update; each item is {"id": ..., "properties": {...}}"""
+        return self._remember_batch(self._run_batch('contacts', 'update', updates, _update_input, idempotent=True))
+    
+    def archive_contacts_batch(self, contact_ids: Iterable[str]) -> List[Dict[str, Any]]:
+        """Archive (delete) many contacts by id via batch/archive"""
+        return self._run_batch('contacts', 'archive', self._invalidating(contact_ids), _id_input, idempotent=True)
+    
+    def read_contacts_batch_by_email(self, emails: Iterable[str]) -> List[Dict[str, Any]]:
+        """Read many contacts by email via batch/read (the object store, not the lagging search index)"""
+        return self._remember_batch(self._run_batch('contacts', 'read', emails, _id_input, idempotent=True,
+                                                    body=READ_BY_EMAIL_BODY))
+    
+    def resolve_contact_ids(self, emails: Iterable[str],
+                            errors: Optional[Dict[str, str]] = None) -> Dict[str, Optional[str]]:
+        """Map each (lowercased) email to its contact id, reading only cache misses, 100 per request.
+        
+        Ids are None for contacts that don't exist and for failed reads; pass errors
+        to collect the failure message of each read that wasn't a plain "not found".
+        """
+        ids, missing = self._cached_ids(emails)
+        return self._fill_ids(ids, missing, self.read_contacts_batch_by_email(missing) if missing else [], errors)
+    
+    def upsert_contacts_batch(self, contacts: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create-or-update many contacts keyed by their "email" property via batch/upsert"""
+        return self._remember_batch(self._run_batch('contacts', 'upsert', contacts, _upsert_input, idempotent=True))
+    
+    def create_deals_batch(self, deals: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Create many deals via batch/create, 100 per request"""
+        return self._run_batch('deals', 'create', deals, _create_input, idempotent=False)
@@ -0,0 +1,229 @@
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Optional, List, Callable
+
+# Recent delivery latencies kept for the percentile stats
+LATENCY_SAMPLES = 1000
+
+
+class NotificationOutbox:
+    """Durable SQLite outbox drained by background sender threads.
+
+    enqueue() only writes a row, so callers never wait on SMTP. Workers claim
+    due rows, call send(recipient, subject, body) and delete them on success.
+    Failures are retried with jittered exponential backoff; after
+    max_attempts the row is kept with status 'dead' for inspection and
+    retry_dead(). Rows left 'sending' by a crashed process are picked up again
+    on the next start.
+    """
+
+    def __init__(self, db_path: str, send: Callable[[str, str, str], Dict[str, Any]], workers: int = 2,
+                 max_attempts: int = 5, retry_base: float = 2.0, retry_max: float = 300.0,
+                 poll_interval: float = 1.0):
+        self.db_path = db_path
+        self.send = send
+        self.max_attempts = max_attempts
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.poll_interval = poll_interval
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._stopping = False
+        self._in_progress = 0
+        self._latencies = deque(maxlen=LATENCY_SAMPLES)
+        self._stats = {"enqueued": 0, "sent": 0, "retries": 0, "dead_lettered": 0}
+        with self._lock:
+            # WAL keeps each enqueue/claim/ack commit cheap while staying crash-safe
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript("""
+                CREATE TABLE IF NOT EXISTS outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    recipient TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+            """)
+            self._db.execute("UPDATE outbox SET status = 'pending' WHERE status = 'sending'")
+            self._db.commit()
+        self._workers = [
+            threading.Thread(target=self._work, name=f"outbox-sender-{i}", daemon=True) for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def enqueue(self, recipient: str, subject: str, body: str) -> int:
+        """Store a notification for background delivery; returns its outbox id"""
+        now = time.time()
+        with self._wakeup:
+            cursor = self._db.execute(
+                "INSERT INTO outbox (recipient, subject, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+                (recipient, subject, body, now, now)
+            )
+            self._db.commit()
+            self._stats["enqueued"] += 1
+            self._wakeup.notify()
+            return cursor.lastrowid
+
+    def _claim(self) -> Optional[tuple]:
+        """Mark the oldest due row as sending (caller holds the lock)"""
+        row = self._db.execute(
+            "SELECT id, recipient, subject, body, attempts, created_at FROM outbox "
+            "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY next_attempt_at, id LIMIT 1",
+            (time.time(),)
+        ).fetchone()
+        if row:
+            self._db.execute("UPDATE outbox SET status = 'sending' WHERE id = ?", (row[0],))
+            self._db.commit()
+            self._in_progress += 1
+        return row
+
+    def _next_due_in(self) -> float:
+        row = self._db.execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+        ).fetchone()
+        if not row or row[0] is None:
+            return self.poll_interval
+        return min(self.poll_interval, max(row[0] - time.time(), 0.0))
+
+    def _work(self):
+        while True:
+            with self._wakeup:
+                row = None
+                while not self._stopping:
+                    row = self._claim()
+                    if row:
+                        break
+                    self._wakeup.wait(self._next_due_in())
+                if row is None:
+                    return
+            self._deliver(*row)
+
+    def _deliver(self, outbox_id: int, recipient: str, subject: str, body: str, attempts: int, created_at: float):
+        try:
+            result = self.send(recipient, subject, body)
+            error = None if result.get('status') == 'success' else result.get('message', 'Delivery failed')
+        except Exception as e:
+            error = str(e)
+
+        with self._wakeup:
+            self._in_progress -= 1
+            if error is None:
+                self._db.execute("DELETE FROM outbox WHERE id = ?", (outbox_id,))
+                self._stats["sent"] += 1
+                self._latencies.append(time.time() - created_at)
+            elif attempts + 1 >= self.max_attempts:
+                self._db.execute(
+                    "UPDATE outbox SET status = 'dead', attempts = ?, last_error = ? WHERE id = ?",
+                    (attempts + 1, error, outbox_id)
+                )
+                self._stats["dead_lettered"] += 1
+                print(f"☠️ Notification to {recipient} dead-lettered after {attempts + 1} attempts: {error}")
+            else:
+                delay = min(self.retry_max, self.retry_base * (2 ** attempts)) * random.uniform(0.5, 1.0)
+                self._db.execute(
+                    "UPDATE outbox SET status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                    (attempts + 1, time.time() + delay, error, outbox_id)
+                )
+                self._stats["retries"] += 1
+            self._db.commit()
+            self._wakeup.notify_all()
+
+    def wait_until_empty(self, timeout: Optional[float] = None) -> bool:
+        """Block until nothing is pending or sending; False if the timeout ran out first"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._wakeup:
+            while True:
+                depth = self._db.execute(
+                    "SELECT COUNT(*) FROM outbox WHERE status IN ('pending', 'sending')"
+                ).fetchone()[0]
+                if depth == 0 and self._in_progress == 0:
+                    return True
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._wakeup.wait(self.poll_interval if remaining is None else min(remaining, self.poll_interval))
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, recipient, subject, attempts, created_at, last_error FROM outbox "
+                "WHERE status = 'dead' ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [{"id": row[0], "recipient": row[1], "subject": row[2], "attempts": row[3],
+                 "created_at": row[4], "last_error": row[5]} for row in rows]
+
+    def retry_dead(self) -> int:
+        """Put every dead-lettered notification back in the queue"""
+        with self._wakeup:
+            cursor = self._db.execute(
+                "UPDATE outbox SET status = 'pending', attempts = 0, next_attempt_at = ? WHERE status = 'dead'",
+                (time.time(),)
+            )
+            self._db.commit()
+            self._wakeup.notify_all()
+            return cursor.rowcount
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth, oldest pending age, delivery counters and latency percentiles"""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+            oldest = self._db.execute(
+                "SELECT MIN(created_at) FROM outbox WHERE status IN ('pending', 'sending')"
+            ).fetchone()[0]
+            stats = dict(self._stats)
+            latencies = sorted(self._latencies)
+
+        def latency_percentile(fraction: float) -> Optional[float]:
+            if not latencies:
+                return None
+            return round(latencies[min(len(latencies) - 1, int(fraction * len(latencies)))], 3)
+
+        stats.update({
+            "depth": counts.get('pending', 0) + counts.get('sending', 0),
+            "dead": counts.get('dead', 0),
+            "oldest_pending_seconds": None if oldest is None else round(time.time() - oldest, 3),
+            "delivery_latency_p50": latency_percentile(0.50),
+            "delivery_latency_p95": latency_percentile(0.95),
+        })
+        return stats
+
+    def close(self, timeout: float = 5.0):
+        """Stop the workers; anything undelivered stays on disk for the next start"""
+        with self._wakeup:
+            self._stopping = True
+            self._wakeup.notify_all()
+        for worker in self._workers:
+            worker.join(timeout)
+
+
+_shared_outboxes: Dict[str, NotificationOutbox] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_outbox(db_path: str, **settings) -> NotificationOutbox:
+    """Return the process-wide outbox for a database file, starting its workers on first use"""
+    with _shared_lock:
+        outbox = _shared_outboxes.get(db_path)
+        if outbox is None:
+            outbox = NotificationOutbox(db_path, **settings)
+            _shared_outboxes[db_path] = outbox
+        return outbox
+
+
+def close_shared_outboxes(timeout: float = 5.0):
+    """Stop every shared outbox's workers, e.g. before the process exits"""
+    with _shared_lock:
+        for outbox in _shared_outboxes.values():
+            outbox.close(timeout)
+        _shared_outboxes.clear()
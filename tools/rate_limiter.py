@@ -0,0 +1,164 @@
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the daily request budget is exhausted"""
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at capacity/period tokens per second"""
+
+    def __init__(self, capacity: float, period: float):
+        self.capacity = float(capacity)
+        self.period = float(period)
+        self.rate = self.capacity / self.period
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available; otherwise return the seconds until they will be"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, max_wait: Optional[float] = None) -> bool:
+        """Block until tokens are taken, or return False if that would exceed max_wait"""
+        deadline = None if max_wait is None else time.monotonic() + max_wait
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.monotonic() + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def drain(self):
+        """Empty the bucket so callers wait for a full refill interval"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = 0.0
+
+    @property
+    def available(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class RequestScheduler:
+    """Admits requests under a portal's burst and daily limits and computes retry backoff"""
+
+    def __init__(self, requests_per_10s: int = 100, daily_limit: int = 250000, max_in_flight: int = 10,
+                 max_retries: int = 5, backoff_base: float = 0.5, backoff_max: float = 30.0):
+        self.burst_bucket = TokenBucket(requests_per_10s, 10.0)
+        self.daily_bucket = TokenBucket(daily_limit, 86400.0)
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self._in_flight = 0
+        self._stats = {
+            "requests": 0,
+            "retries": 0,
+            "throttled": 0,
+            "server_errors": 0,
+            "connection_errors": 0,
+            "gave_up": 0,
+        }
+
+    @contextmanager
+    def slot(self):
+        """Hold one in-flight slot and one token from each bucket for the duration of a request"""
+        with self._slots:
+            self._wait_for_pause()
+            if self.daily_bucket.try_acquire() > 0:
+                raise RateLimitExceeded("HubSpot daily request limit reached")
+            self.burst_bucket.acquire()
+            self.record_request()
+            self.record_in_flight(1)
+            try:
+                yield
+            finally:
+                self.record_in_flight(-1)
+
+    def _wait_for_pause(self):
+        while True:
+            wait = self.pause_remaining()
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    def pause_remaining(self) -> float:
+        """Seconds left in a Retry-After pause imposed by a 429 (0 when not paused)"""
+        with self._lock:
+            return max(self._paused_until - time.monotonic(), 0.0)
+
+    def record_request(self):
+        with self._lock:
+            self._stats["requests"] += 1
+
+    def record_in_flight(self, delta: int):
+        with self._lock:
+            self._in_flight += delta
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number `attempt` (0-based), honouring Retry-After"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max) + random.uniform(0, self.backoff_base)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def record_throttle(self, retry_after: Optional[float] = None):
+        """Pause every caller after a 429 so one throttle doesn't become a storm"""
+        self.burst_bucket.drain()
+        with self._lock:
+            self._stats["throttled"] += 1
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+
+    def record_failure(self, kind: str):
+        with self._lock:
+            self._stats[kind] += 1
+
+    def record_retry(self):
+        with self._lock:
+            self._stats["retries"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["in_flight"] = self._in_flight
+            stats["max_in_flight"] = self.max_in_flight
+        stats["burst_tokens"] = round(self.burst_bucket.available, 2)
+        stats["burst_capacity"] = self.burst_bucket.capacity
+        stats["daily_tokens"] = round(self.daily_bucket.available, 2)
+        stats["daily_capacity"] = self.daily_bucket.capacity
+        return stats
+
+
+_shared_schedulers: Dict[str, RequestScheduler] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_scheduler(key: str, **settings) -> RequestScheduler:
+    """Return the process-wide scheduler for a portal; settings apply on first creation"""
+    with _shared_lock:
+        scheduler = _shared_schedulers.get(key)
+        if scheduler is None:
+            scheduler = RequestScheduler(**settings)
+            _shared_schedulers[key] = scheduler
+        return scheduler
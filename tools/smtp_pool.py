@@ -0,0 +1,193 @@
+import smtplib
+import threading
+import time
+from collections import deque
+from email.message import EmailMessage
+from typing import Dict, Any, Optional
+
+# The server answered but refused the message; the session itself is still usable
+REFUSALS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPResponseException)
+# Anything else (smtplib errors are OSErrors too) means the connection is unusable
+CONNECTION_ERRORS = (OSError,)
+
+
+class _PooledConnection:
+    def __init__(self, smtp: smtplib.SMTP):
+        self.smtp = smtp
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.messages_sent = 0
+
+
+class SMTPPool:
+    """Reusable, already-authenticated SMTP connections.
+
+    Each connection does EHLO/STARTTLS/login once and then carries many
+    messages. Connections idle longer than health_check_after get a NOOP
+    before reuse; ones idle past idle_timeout or that have sent
+    max_messages_per_connection messages are closed and replaced. A send that
+    hits a dropped connection is retried once on a fresh one.
+    """
+
+    def __init__(self, host: str, port: int = 587, username: Optional[str] = None, password: Optional[str] = None,
+                 use_tls: bool = True, pool_size: int = 2, idle_timeout: float = 60.0,
+                 max_messages_per_connection: int = 100, health_check_after: float = 5.0, timeout: float = 30.0):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.max_messages_per_connection = max_messages_per_connection
+        self.health_check_after = health_check_after
+        self.timeout = timeout
+        self._idle = deque()
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._lock = threading.Lock()
+        self._stats = {
+            "messages_sent": 0,
+            "connections_opened": 0,
+            "logins": 0,
+            "reused": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+            "reconnects": 0,
+            "idle_closed": 0,
+            "recycled": 0,
+        }
+
+    def _count(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def _open(self) -> _PooledConnection:
+        smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            smtp.ehlo()
+            if self.use_tls:
+                smtp.starttls()
+                smtp.ehlo()
+            if self.username and self.password:
+                smtp.login(self.username, self.password)
+                self._count("logins")
+        except Exception:
+            self._discard_smtp(smtp)
+            raise
+        self._count("connections_opened")
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    def _discard_smtp(smtp: smtplib.SMTP):
+        try:
+            smtp.quit()
+        except Exception:
+            smtp.close()
+
+    def _is_healthy(self, connection: _PooledConnection) -> bool:
+        if time.monotonic() - connection.last_used < self.health_check_after:
+            return True
+        self._count("health_checks")
+        try:
+            healthy = connection.smtp.noop()[0] == 250
+        except CONNECTION_ERRORS:
+            healthy = False
+        if not healthy:
+            self._count("health_check_failures")
+        return healthy
+
+    def _checkout(self) -> _PooledConnection:
+        """Take a live idle connection or open a new one (caller holds a slot)"""
+        while True:
+            with self._lock:
+                connection = self._idle.pop() if self._idle else None
+            if connection is None:
+                return self._open()
+            if time.monotonic() - connection.last_used > self.idle_timeout:
+                self._count("idle_closed")
+                self._discard_smtp(connection.smtp)
+            elif self._is_healthy(connection):
+                self._count("reused")
+                return connection
+            else:
+                connection.smtp.close()
+
+    def _checkin(self, connection: _PooledConnection):
+        connection.last_used = time.monotonic()
+        if connection.smtp.sock is None:
+            # smtplib closes the socket itself after a 421 reply
+            return
+        if connection.messages_sent >= self.max_messages_per_connection:
+            self._count("recycled")
+            self._discard_smtp(connection.smtp)
+            return
+        with self._lock:
+            self._idle.append(connection)
+
+    def send_message(self, message: EmailMessage):
+        """Send over a pooled connection, reconnecting once if it turns out to be dead"""
+        with self._slots:
+            connection = self._checkout()
+            try:
+                try:
+                    connection.smtp.send_message(message)
+                except REFUSALS:
+                    raise
+                except CONNECTION_ERRORS:
+                    connection.smtp.close()
+                    self._count("reconnects")
+                    connection = self._open()
+                    connection.smtp.send_message(message)
+            except REFUSALS:
+                self._checkin(connection)
+                raise
+            except CONNECTION_ERRORS:
+                connection.smtp.close()
+                raise
+            connection.messages_sent += 1
+            self._count("messages_sent")
+            self._checkin(connection)
+
+    def close(self):
+        """Quit every idle connection"""
+        with self._lock:
+            idle, self._idle = list(self._idle), deque()
+        for connection in idle:
+            self._discard_smtp(connection.smtp)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["idle_connections"] = len(self._idle)
+        stats["pool_size"] = self.pool_size
+        return stats
+
+
+_shared_pools: Dict[str, SMTPPool] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_smtp_pool(key: str, **settings) -> SMTPPool:
+    """Return the process-wide pool for an SMTP account, creating it on first use.
+
+    If the account's settings changed (new password, TLS, limits), the old
+    pool's idle connections are closed and a new pool replaces it.
+    """
+    with _shared_lock:
+        pool = _shared_pools.get(key)
+        if pool is not None and pool.settings != settings:
+            pool.close()
+            pool = None
+        if pool is None:
+            pool = SMTPPool(**settings)
+            pool.settings = settings
+            _shared_pools[key] = pool
+        return pool
+
+
+def close_shared_smtp_pools():
+    """Quit every shared pool's connections, e.g. before the process exits"""
+    with _shared_lock:
+        for pool in _shared_pools.values():
+            pool.close()
+        _shared_pools.clear()
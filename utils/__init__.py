@@ -1,3 +1,3 @@
-from .config_loader import ConfigLoader
+from .config_loader import ConfigLoader, get_shared_config
 
-__all__ = ['ConfigLoader']
\ No newline at end of file
+__all__ = ['ConfigLoader', 'get_shared_config']
\ No newline at end of file
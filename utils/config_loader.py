@@ -1,27 +1,117 @@
 import json
 import os
-from typing import Dict, Any
+import threading
+import time
+import weakref
+from typing import Dict, Any, Optional, Callable, List, Tuple
+
+DEFAULT_CONFIG_PATH = "config/api_config.json"
+# Points every ConfigLoader() at another file, e.g. a benchmark or test config
+CONFIG_PATH_ENV = "HUBSPOT_AGENT_CONFIG"
+# Seconds between mtime checks, so hot getters don't stat the file on every call
+RELOAD_CHECK_INTERVAL = 1.0
 
 class ConfigLoader:
-    def __init__(self, config_path: str = "config/api_config.json"):
-        self.config_path = config_path
+    def __init__(self, config_path: Optional[str] = None, check_interval: float = RELOAD_CHECK_INTERVAL):
+        self.config_path = config_path or os.environ.get(CONFIG_PATH_ENV, DEFAULT_CONFIG_PATH)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._subscribers: List[Tuple[str, Callable[[], Optional[Callable]]]] = []
+        self._signature = self._file_signature()
+        self._checked_at = time.monotonic()
+        self.loads = 0
         self.config = self._load_config()
     
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+    
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from JSON file"""
         try:
             with open(self.config_path, 'r') as file:
-                return json.load(file)
+                config = json.load(file)
+            self.loads += 1
+            return config
         except FileNotFoundError:
             raise Exception(f"Configuration file not found at {self.config_path}. Please run setup.py first.")
         except json.JSONDecodeError:
             raise Exception("Invalid JSON in configuration file.")
     
+    def refresh(self, force: bool = False) -> List[str]:
+        """Re-read the file if its mtime/size changed; returns the sections that changed"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._checked_at < self.check_interval:
+                return []
+            self._checked_at = now
+            signature = self._file_signature()
+            if signature is None or signature == self._signature:
+                return []
+            try:
+                config = self._load_config()
+            except Exception as e:
+                # Keep serving the last good config while the file is mid-edit or broken
+                print(f"⚠️ Config reload skipped: {e}")
+                return []
+            self._signature = signature
+            old_config, self.config = self.config, config
+            changed = sorted(section for section in set(old_config) | set(config)
+                             if old_config.get(section) != config.get(section))
+            subscribers = list(self._subscribers)
+        
+        for section, reference in subscribers:
+            callback = reference()
+            if callback is not None and section in changed:
+                try:
+                    callback(config.get(section, {}))
+                except Exception as e:
+                    print(f"⚠️ Config subscriber for '{section}' failed: {e}")
+        with self._lock:
+            self._subscribers = [(section, reference) for section, reference in self._subscribers
+                                 if reference() is not None]
+        return changed
+    
+    def subscribe(self, section: str, callback: Callable[[Dict[str, Any]], Any]):
+        """Call callback(new_section) whenever that section changes on disk.
+
+        Bound methods are held weakly, so subscribing doesn't keep a client alive.
+        """
+        reference = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else (lambda: callback)
+        with self._lock:
+            self._subscribers.append((section, reference))
+    
+    def _section(self, name: str) -> Dict[str, Any]:
+        self.refresh()
+        return self.config.get(name, {})
+    
     def get_openai_config(self) -> Dict[str, Any]:
-        return self.config.get('openai', {})
+        return self._section('openai')
     
     def get_hubspot_config(self) -> Dict[str, Any]:
-        return self.config.get('hubspot', {})
+        return self._section('hubspot')
     
     def get_email_config(self) -> Dict[str, Any]:
-        return self.config.get('email', {})
\ No newline at end of file
+        return self._section('email')
+    
+    def resolve_path(self, path: str) -> str:
+        """Resolve a path from the config relative to the config file, not the working directory"""
+        return os.path.join(os.path.dirname(os.path.abspath(self.config_path)), os.path.expanduser(path))
+
+
+_shared_configs: Dict[str, ConfigLoader] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_config(config_path: Optional[str] = None) -> ConfigLoader:
+    """Return the process-wide loader for a config file, parsing it only on first use"""
+    path = os.path.abspath(config_path or os.environ.get(CONFIG_PATH_ENV, DEFAULT_CONFIG_PATH))
+    with _shared_lock:
+        config = _shared_configs.get(path)
+        if config is None:
+            config = ConfigLoader(path)
+            _shared_configs[path] = config
+        return config
@@ -0,0 +1,20 @@
+import threading
+from typing import Dict, Any, Tuple
+
+# langchain_openai pulls in openai and its type tree (~2s cold); it is only imported on first use
+
+_shared_llms: Dict[Tuple[Any, str], Any] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_llm(openai_config: Dict[str, Any]):
+    """Return the process-wide ChatOpenAI client for this key and model, building it on first use"""
+    api_key = openai_config.get('api_key')
+    model = openai_config.get('model', 'gpt-4')
+    with _shared_lock:
+        llm = _shared_llms.get((api_key, model))
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+            llm = ChatOpenAI(api_key=api_key, model=model, temperature=0)
+            _shared_llms[(api_key, model)] = llm
+        return llm